@@ -0,0 +1,199 @@
+"""Benchmark do DockerService contra um daemon Docker falso num socket unix local.
+
+Compara o caminho antigo (um DockerClient por instância de serviço, criado a cada
+requisição, com `containers.get` antes de cada operação) com a camada
+compartilhada: um cliente e um executor por processo, ids de container em cache
+e status respondido pela memória do ContainerStatusService.
+
+    python -m benchmarks.docker_benchmark --operations 200 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import struct
+import tempfile
+import time
+
+import docker
+
+CONTAINER_NAME = "eldoria-server"
+CONTAINER_ID = "f" * 64
+
+
+class FakeDockerDaemon:
+    """Responde ao subconjunto da Engine API usado pelo DockerService, com latência fixa por requisição."""
+
+    def __init__(self, socket_path: str, latency: float = 0.0005):
+        self.socket_path = socket_path
+        self.latency = latency
+        self.server = None
+        self.connections = 0
+        self.requests = {}
+
+    async def start(self):
+        self.server = await asyncio.start_unix_server(self.handle, self.socket_path)
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def container(self) -> dict:
+        return {
+            "Id": CONTAINER_ID,
+            "Name": f"/{CONTAINER_NAME}",
+            "RestartCount": 0,
+            "State": {"Status": "running", "StartedAt": "2024-05-01T12:00:00.000000000Z", "ExitCode": 0},
+        }
+
+    def route(self, method: str, path: str) -> tuple:
+        """(status, body) for a request; body None means the exec output stream."""
+        parts = path.split("?")[0].strip("/").split("/")
+        if parts[0].startswith("v1."):
+            parts = parts[1:]
+        self.requests[(method, parts[0], parts[-1])] = self.requests.get((method, parts[0], parts[-1]), 0) + 1
+
+        if parts == ["version"]:
+            return 200, {"ApiVersion": "1.45", "Version": "fake"}
+        if parts[0] == "containers" and parts[1] not in (CONTAINER_NAME, CONTAINER_ID):
+            return 404, {"message": f"No such container: {parts[1]}"}
+        if parts[0] == "containers" and parts[-1] == "json":
+            return 200, self.container()
+        if parts[0] == "containers" and parts[-1] in ("restart", "start", "stop"):
+            return 204, b""
+        if parts[0] == "containers" and parts[-1] == "exec":
+            return 201, {"Id": "exec"}
+        if parts[0] == "exec" and parts[-1] == "start":
+            return 200, None
+        if parts[0] == "exec" and parts[-1] == "json":
+            return 200, {"ExitCode": 0, "Running": False}
+        return 404, {"message": "not implemented"}
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = lines[0].split(" ", 2)
+                headers = {line.split(":", 1)[0].lower(): line.split(":", 1)[1].strip() for line in lines[1:] if ":" in line}
+                await reader.readexactly(int(headers.get("content-length", 0)))
+
+                await asyncio.sleep(self.latency)
+                status, body = self.route(method, path)
+
+                if body is None:
+                    # exec start sequestra a conexão: saída multiplexada (stdout) até fechar
+                    output = b"Players online: 0\n"
+                    writer.write(b"HTTP/1.1 101 UPGRADED\r\nContent-Type: application/vnd.docker.raw-stream\r\nConnection: Upgrade\r\nUpgrade: tcp\r\n\r\n")
+                    await writer.drain()
+                    # Como no daemon real, a saída chega depois dos cabeçalhos (o cliente lê o socket cru)
+                    await asyncio.sleep(0.002)
+                    writer.write(struct.pack(">BxxxL", 1, len(output)) + output)
+                    await writer.drain()
+                    return
+
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+def legacy_client(socket_path: str) -> docker.DockerClient:
+    # Como antes: cada FilesService/ModsService/McServerService abria o seu
+    return docker.DockerClient(base_url=f"unix://{socket_path}")
+
+
+def legacy_operation(socket_path: str, operation: str):
+    client = legacy_client(socket_path)
+    try:
+        container = client.containers.get(CONTAINER_NAME)
+        if operation == "status":
+            return container.status
+        if operation == "exec":
+            return container.exec_run("rcon-cli list").output
+        return container.restart()
+    finally:
+        client.close()
+
+
+async def run_legacy(socket_path: str, operation: str, operations: int, concurrency: int) -> float:
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await loop.run_in_executor(None, legacy_operation, socket_path, operation)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(operations)))
+    return time.perf_counter() - started
+
+
+async def run_shared(service, status_watcher, operation: str, operations: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            if operation == "status":
+                return status_watcher.get_state()["status"]
+            if operation == "exec":
+                exit_code, output = await service.exec_in_container(CONTAINER_NAME, "rcon-cli list")
+                assert exit_code == 0
+                return output
+            assert await service.restart_container(CONTAINER_NAME)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(operations)))
+    return time.perf_counter() - started
+
+
+async def main(operations: int, concurrency: int):
+    socket_path = os.path.join(tempfile.mkdtemp(), "docker.sock")
+    daemon = FakeDockerDaemon(socket_path)
+    await daemon.start()
+
+    # A camada compartilhada lê DOCKER_HOST na primeira chamada
+    os.environ["DOCKER_HOST"] = f"unix://{socket_path}"
+    from services.docker_s.docker_service import get_docker_service
+    from services.docker_s.container_status_service import ContainerStatusService
+
+    service = get_docker_service()
+    status_watcher = ContainerStatusService(service, CONTAINER_NAME)
+    await status_watcher.refresh()
+
+    try:
+        print(f"operations={operations} concurrency={concurrency}")
+        for operation in ("status", "exec", "restart"):
+            connections_before = daemon.connections
+            legacy = await run_legacy(socket_path, operation, operations, concurrency)
+            legacy_connections = daemon.connections - connections_before
+
+            connections_before = daemon.connections
+            shared = await run_shared(service, status_watcher, operation, operations, concurrency)
+            shared_connections = daemon.connections - connections_before
+
+            print(
+                f"{operation:<8} client per call: {legacy / operations * 1e6:7.0f} us/op ({legacy_connections} connections)"
+                f" | shared layer: {shared / operations * 1e6:7.0f} us/op ({shared_connections} connections)"
+            )
+        print(f"container inspects: {daemon.requests.get(('GET', 'containers', 'json'), 0)}")
+    finally:
+        # Fecha as conexões keep-alive antes de derrubar o daemon
+        service.docker_client.close()
+        await asyncio.sleep(0.05)
+        await daemon.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.operations, args.concurrency))
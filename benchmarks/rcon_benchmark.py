@@ -0,0 +1,137 @@
+"""Benchmark do RconService contra um servidor RCON falso local.
+
+Compara o pool de conexões persistentes com uma conexão + login por comando,
+que é o custo de rede que o caminho `docker exec rcon-cli` paga a cada chamada
+(sem contar o round trip da API do Docker e o processo extra no container).
+
+    python -m benchmarks.rcon_benchmark --commands 500 --concurrency 8
+"""
+import argparse
+import asyncio
+import struct
+import time
+
+from services.rcon.rcon_service import RconConnection, RconService, PACKET_COMMAND, PACKET_LOGIN
+
+PASSWORD = "benchmark"
+CHUNK_SIZE = 4096
+# O servidor vanilla lê até 1460 bytes por vez e espera exatamente um pacote por leitura
+READ_SIZE = 1460
+
+
+class FakeRconServer:
+    """Emula o servidor RCON do Minecraft: um pacote por leitura, respostas longas fragmentadas.
+
+    Como o vanilla, derruba a conexão quando dois pacotes chegam juntos numa leitura.
+    """
+
+    def __init__(self, latency: float = 0.0005):
+        self.latency = latency
+        self.server = None
+        self.port = None
+        self.logins = 0
+        self.joined_packets = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def packet(self, request_id: int, packet_type: int, body: str) -> bytes:
+        payload = body.encode("utf-8") + b"\x00\x00"
+        return struct.pack("<iii", len(payload) + 8, request_id, packet_type) + payload
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                received = await reader.read(READ_SIZE)
+                if not received:
+                    break
+                (length,) = struct.unpack("<i", received[:4])
+                if len(received) != length + 4:
+                    self.joined_packets += 1
+                    break
+                data = received[4:]
+                request_id, packet_type = struct.unpack("<ii", data[:8])
+                body = data[8:-2].decode("utf-8")
+
+                if packet_type == PACKET_LOGIN:
+                    self.logins += 1
+                    writer.write(self.packet(request_id if body == PASSWORD else -1, PACKET_COMMAND, ""))
+                elif packet_type == PACKET_COMMAND:
+                    await asyncio.sleep(self.latency)
+                    response = f"echo: {body}"
+                    if body.startswith("long"):
+                        response = "x" * (CHUNK_SIZE * 3 + 17)
+                    for start in range(0, len(response), CHUNK_SIZE):
+                        writer.write(self.packet(request_id, 0, response[start:start + CHUNK_SIZE]))
+                else:
+                    writer.write(self.packet(request_id, 0, f"Unknown request {packet_type:x}"))
+
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def run_pooled(port: int, commands: int, concurrency: int) -> float:
+    service = RconService(password=PASSWORD, host="127.0.0.1", port=port, pool_size=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await service.send_command(f"say {i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(commands)))
+    elapsed = time.perf_counter() - started
+
+    # Resposta fragmentada precisa voltar inteira
+    assert len(await service.send_command("long")) == CHUNK_SIZE * 3 + 17
+    await service.close()
+    return elapsed
+
+
+async def run_per_command(port: int, commands: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            conn = RconConnection("127.0.0.1", port, PASSWORD)
+            await conn.connect()
+            await conn.send_command(f"say {i}")
+            await conn.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(commands)))
+    return time.perf_counter() - started
+
+
+async def main(commands: int, concurrency: int):
+    server = FakeRconServer()
+    await server.start()
+
+    try:
+        per_command = await run_per_command(server.port, commands, concurrency)
+        logins_before = server.logins
+        pooled = await run_pooled(server.port, commands, concurrency)
+
+        print(f"commands={commands} concurrency={concurrency}")
+        print(f"connect+login per command: {per_command * 1000:.1f} ms total, {per_command / commands * 1e6:.0f} us/cmd")
+        print(f"pooled connections:        {pooled * 1000:.1f} ms total, {pooled / commands * 1e6:.0f} us/cmd")
+        print(f"pool logins: {server.logins - logins_before}")
+        assert server.joined_packets == 0, f"{server.joined_packets} connections dropped for joined packets"
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commands", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.commands, args.concurrency))
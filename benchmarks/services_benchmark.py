@@ -0,0 +1,84 @@
+"""Benchmark do ServiceContainer: tempo de inicialização e alocação por requisição.
+
+Compara o padrão antigo, que criava um `FilesService()` (com StateStore, registro
+de mods e leitores próprios) a cada chamada de `send_rcon_command`,
+`get_commands_history`, `remove_mod` e `search_mod_version_game`, com as
+instâncias compartilhadas do container. O estado vai para um diretório temporário.
+
+    python -m benchmarks.services_benchmark --requests 500
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+
+def use_temp_state():
+    state_dir = tempfile.mkdtemp()
+    os.environ["STATE_DB_PATH"] = os.path.join(state_dir, "state.sqlite3")
+    os.environ["MODS_HASH_CACHE_PATH"] = os.path.join(state_dir, "mods_hash_cache.json")
+    os.environ["MODRINTH_CATALOG_PATH"] = os.path.join(state_dir, "modrinth_catalog.sqlite3")
+    os.environ["LOG_INDEX_PATH"] = os.path.join(state_dir, "log_index.sqlite3")
+
+
+async def measure(request, requests: int) -> tuple:
+    """(us per request, peak KiB allocated per request)."""
+    await request()
+    peaks = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(requests):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await request()
+        peaks += tracemalloc.get_traced_memory()[1] - baseline
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+    return elapsed / requests * 1e6, peaks / requests / 1024
+
+
+async def main(requests: int):
+    use_temp_state()
+
+    started = time.perf_counter()
+    from services.service_container import ServiceContainer
+    import_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    services = ServiceContainer()
+    first_build_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ServiceContainer()
+    build_time = time.perf_counter() - started
+
+    from services.files.files_service import FilesService
+
+    for index in range(50):
+        await services.files_service.save_last_command(f"say {index}")
+
+    async def per_call():
+        # Como antes: um FilesService novo em cada chamada
+        await FilesService().get_sent_commands(20)
+
+    async def shared():
+        await services.mc_server_service.get_commands_history(20)
+
+    print(f"import: {import_time * 1000:.1f} ms")
+    print(f"first ServiceContainer(): {first_build_time * 1000:.1f} ms")
+    print(f"extra ServiceContainer(): {build_time * 1000:.1f} ms")
+    print(f"requests={requests} (commands history, 20 entries)")
+    for label, request in (("FilesService() per call", per_call), ("shared container", shared)):
+        us, kib = await measure(request, requests)
+        print(f"{label:<24} {us:8.0f} us/req {kib:8.1f} KiB peak/req")
+
+    await services.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -1,32 +1,95 @@
-from fastapi import APIRouter, Response
+from typing import Any, Dict
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from services.files.files_service import FilesService
+from services.mc_server.mc_server_service import McServerService
+from services.service_container import get_files_service, get_mc_server_service
+from services.files.mods_archive_service import FORMATS
 
 router = APIRouter(prefix="/files", tags=["files"])
-files_service = FilesService()
+
+
+class ArchiveFileResponse(FileResponse):
+    # Libera o arquivo mesmo se o cliente desconectar no meio (background tasks não rodariam)
+    def __init__(self, *args, on_close, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
 
 @router.get("/server-config")
-async def get_server_config():
-    return await files_service.get_server_config()
+async def get_server_config(
+    typed: bool = Query(False, description="Converte números, booleanos e enums"),
+    files_service: FilesService = Depends(get_files_service)
+):
+    return await files_service.get_server_config(typed)
+
+@router.patch("/server-config")
+async def update_server_config(
+    updates: Dict[str, Any] = Body(..., description="Chaves do server.properties a alterar"),
+    files_service: FilesService = Depends(get_files_service)
+):
+    return await files_service.update_server_config(updates)
 
 @router.get("/server-config-lite")
-async def get_server_config_lite():
-    return await files_service.get_server_config_lite()
+async def get_server_config_lite(
+    typed: bool = Query(False, description="Converte números, booleanos e enums"),
+    files_service: FilesService = Depends(get_files_service)
+):
+    return await files_service.get_server_config_lite(typed)
 
 @router.get("/players-data")
-async def get_players_data():
-    return await files_service.get_ips_banned_whitelist_ops()
+async def get_players_data(
+    detailed: bool = Query(False, description="Registros completos (uuid, nível de op, motivo e expiração do ban)"),
+    online: bool = Query(False, description="Inclui os jogadores online via RCON"),
+    files_service: FilesService = Depends(get_files_service),
+    mc_server_service: McServerService = Depends(get_mc_server_service)
+):
+    data = await files_service.get_ips_banned_whitelist_ops(detailed)
+    if data is not None and online:
+        data = {**data, "online": await mc_server_service.get_online_players()}
+    return data
 
 @router.get("/mods/download-all")
-async def download_all_mods():
-    tar_content = await files_service.download_all_mods()
-    
-    if not tar_content:
+async def download_all_mods(
+    request: Request,
+    format: str = Query("tar.gz", description="Formato do arquivo (tar.gz, zip ou tar.zst)"),
+    level: int = Query(None, description="Nível de compressão", ge=1, le=22),
+    stream: bool = Query(False, description="Gera o arquivo durante o envio em vez de usar o pré-construído"),
+    files_service: FilesService = Depends(get_files_service)
+):
+    if stream:
+        chunks = files_service.stream_mods_archive(format, level)
+        if chunks is None:
+            return {"error": "Failed to download mods"}
+
+        return StreamingResponse(
+            chunks,
+            media_type=FORMATS[format]["media_type"],
+            headers={
+                "Content-Disposition": f"attachment; filename=mods.{FORMATS[format]['extension']}"
+            }
+        )
+
+    archive = await files_service.get_mods_archive(format, level)
+    if not archive:
         return {"error": "Failed to download mods"}
-    
-    return Response(
-        content=tar_content,
-        media_type="application/gzip",
-        headers={
-            "Content-Disposition": "attachment; filename=mods.tar.gz"
-        }
-    )
\ No newline at end of file
+
+    if request.headers.get("if-none-match") == archive["etag"]:
+        files_service.release_mods_archive(archive["path"])
+        return Response(status_code=304, headers={"ETag": archive["etag"]})
+
+    # FileResponse atende Range / If-Range, permitindo retomar o download;
+    # o arquivo fica protegido da limpeza até o envio terminar
+    return ArchiveFileResponse(
+        archive["path"],
+        media_type=archive["media_type"],
+        filename=archive["filename"],
+        headers={"ETag": archive["etag"], "Cache-Control": "no-cache"},
+        on_close=lambda: files_service.release_mods_archive(archive["path"])
+    )
@@ -1,69 +1,122 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
+from services.files.download_service import new_job_id
+from services.mc_server.log_index_service import InvalidCursorError
 from services.mc_server.mc_server_service import McServerService
+from services.service_container import get_mc_server_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/mc-server", tags=["mc_server"])
-mc_server_service = McServerService()
 
 class CommandPayload(BaseModel):
     command: str
 
 @router.get("/mods")
-async def get_installed_mods():
+async def get_installed_mods(mc_server_service: McServerService = Depends(get_mc_server_service)):
     return  await mc_server_service.get_installed_mods()
 
 @router.get("/mods/ready")
-async def get_ready_to_install_mods():
+async def get_ready_to_install_mods(mc_server_service: McServerService = Depends(get_mc_server_service)):
     return await mc_server_service.get_ready_to_install_mods()
 
 @router.post("/mods/install")
-async def install_ready_mods():
-    success = await mc_server_service.install_ready_mods()
-    return {"success": success}
+async def install_ready_mods(
+    job_id: str = Query(None, description="Id para acompanhar em /mods/install-progress (gerado se omitido)"),
+    mc_server_service: McServerService = Depends(get_mc_server_service)
+):
+    job_id = job_id or new_job_id()
+    success = await mc_server_service.install_ready_mods(job_id)
+    return {"success": success, "job_id": job_id}
 
 @router.post("/mods/remove/{mod_id}")
-async def remove_mod(mod_id: str):
+async def remove_mod(mod_id: str, mc_server_service: McServerService = Depends(get_mc_server_service)):
     success = await mc_server_service.remove_mod(mod_id)
     return {"success": success}
 
 @router.post("/mods/ready/remove/{mod_id}")
-async def remove_ready_mod(mod_id: str):
+async def remove_ready_mod(mod_id: str, mc_server_service: McServerService = Depends(get_mc_server_service)):
     success = await mc_server_service.remove_ready_mod(mod_id)
     return {"success": success}
 
 @router.post("/start")
-async def start_server():
+async def start_server(mc_server_service: McServerService = Depends(get_mc_server_service)):
     success = await mc_server_service.start_server()
     return {"success": success}
 
 @router.post("/stop")
-async def stop_server():
+async def stop_server(mc_server_service: McServerService = Depends(get_mc_server_service)):
     success = await mc_server_service.stop_server()
     return {"success": success}
 
 @router.post("/restart")
-async def restart_server():
+async def restart_server(mc_server_service: McServerService = Depends(get_mc_server_service)):
     success = await mc_server_service.restart_server()
     return {"success": success}
 
 @router.get("/status")
-async def get_server_status():
-    return await mc_server_service.get_server_status()
+async def get_server_status(
+    detailed: bool = Query(False, description="Retorna saúde, início, reinícios e código de saída"),
+    mc_server_service: McServerService = Depends(get_mc_server_service)
+):
+    return await mc_server_service.get_server_status(detailed)
+
+@router.websocket("/status/ws")
+async def websocket_status(websocket: WebSocket, mc_server_service: McServerService = Depends(get_mc_server_service)):
+    await websocket.accept()
+    try:
+        await mc_server_service.stream_status(websocket)
+    except WebSocketDisconnect:
+        logger.warning("Client disconnected from status stream")
 
 @router.post("/command")
-async def send_server_command(payload: CommandPayload):
-    response, list_of_commands = await mc_server_service.send_rcon_command(payload.command)
-    return {"response": response, "commands_history": list_of_commands}
+async def send_server_command(payload: CommandPayload, mc_server_service: McServerService = Depends(get_mc_server_service)):
+    response, command = await mc_server_service.send_rcon_command(payload.command)
+    if command is None:
+        return {"error": response or "Failed to send RCON command"}
+    return {"response": response, "command": command}
 
 @router.get("/commands-history")
-async def get_commands_history():
-    list_of_commands = await mc_server_service.get_commands_history()
-    return {"commands_history": list_of_commands}
+async def get_commands_history(
+    q: str = Query(None, description="Trecho do comando"),
+    start: int = Query(None, description="Início do intervalo (timestamp Unix)"),
+    end: int = Query(None, description="Fim do intervalo (timestamp Unix)"),
+    limit: int = Query(50, description="Número de resultados", ge=1, le=500),
+    cursor: int = Query(None, description="Cursor retornado pela página anterior"),
+    mc_server_service: McServerService = Depends(get_mc_server_service)
+):
+    history = await mc_server_service.get_commands_history(limit, cursor, q, start, end)
+    return {"commands_history": history["results"], "next_cursor": history["next_cursor"]}
+
+@router.get("/logs/search")
+async def search_logs(
+    q: str = Query(None, description="Palavra-chave na mensagem"),
+    start: str = Query(None, description="Início do intervalo (YYYY-MM-DD HH:MM:SS)"),
+    end: str = Query(None, description="Fim do intervalo (YYYY-MM-DD HH:MM:SS)"),
+    level: str = Query(None, description="Nível do log (INFO, WARN, ERROR)"),
+    thread: str = Query(None, description="Thread de origem"),
+    player: str = Query(None, description="Nome do jogador"),
+    limit: int = Query(100, description="Número de resultados", ge=1, le=500),
+    cursor: str = Query(None, description="Cursor retornado pela página anterior"),
+    mc_server_service: McServerService = Depends(get_mc_server_service)
+):
+    try:
+        return await mc_server_service.search_logs(q, start, end, level, thread, player, limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.websocket("/logs")
-async def websocket_logs(websocket: WebSocket):
+async def websocket_logs(
+    websocket: WebSocket,
+    batch: bool = Query(False, description="Envia frames JSON com várias linhas"),
+    window_ms: int = Query(100, description="Janela de agrupamento em ms", ge=10, le=5000),
+    max_bytes: int = Query(65536, description="Tamanho máximo de cada frame", ge=1024, le=1048576),
+    compress: bool = Query(False, description="Frames binários comprimidos com deflate"),
+    mc_server_service: McServerService = Depends(get_mc_server_service)
+):
     await websocket.accept()
     try:
-        await mc_server_service.stream_logs(websocket)
+        await mc_server_service.stream_logs(websocket, batch, window_ms, max_bytes, compress)
     except WebSocketDisconnect:
-        print("Client disconnected from logs stream")
\ No newline at end of file
+        logger.warning("Client disconnected from logs stream")
@@ -1,10 +1,13 @@
 
 
-from fastapi import APIRouter, Query
+import logging
+from fastapi import APIRouter, Depends, Query
 from services.modrinth.modrinth_service import ModrinthService
+from services.service_container import get_modrinth_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/modrinth", tags=["modrinth"])
-modrinth_service = ModrinthService()
 
 @router.get("/search/fabric")
 async def search_fabric_mods(
@@ -12,13 +15,34 @@ async def search_fabric_mods(
     index: str = Query("relevance", description="Índice de ordenação"),
     limit: int = Query(24, description="Número de resultados", ge=1, le=100),
     offset: int = Query(0, description="Deslocamento para paginação", ge=0),
-    mc_version: str = Query("1.21.1", description="Versão do Minecraft")
+    mc_version: str = Query("1.21.1", description="Versão do Minecraft"),
+    modrinth_service: ModrinthService = Depends(get_modrinth_service)
 ):
     return await modrinth_service.search_default_mods_fabric(query, index, limit, offset, mc_version)
 
 @router.get("/mod/{project_id}")
-async def get_version_by_id(project_id: str):
+async def get_version_by_id(project_id: str, modrinth_service: ModrinthService = Depends(get_modrinth_service)):
     return await modrinth_service.search_mod_version_game(project_id)
 
-def set_modrinth_authorization(token: str):
-    modrinth_service.set_authorization(token)
\ No newline at end of file
+@router.get("/cache/stats")
+async def get_cache_stats(modrinth_service: ModrinthService = Depends(get_modrinth_service)):
+    return modrinth_service.get_cache_stats()
+
+@router.get("/scheduler/stats")
+async def get_scheduler_stats(modrinth_service: ModrinthService = Depends(get_modrinth_service)):
+    return modrinth_service.get_scheduler_stats()
+
+@router.get("/catalog/status")
+async def get_catalog_status(modrinth_service: ModrinthService = Depends(get_modrinth_service)):
+    return await modrinth_service.get_catalog_status()
+
+@router.post("/catalog/sync")
+async def sync_catalog(
+    full: bool = Query(None, description="Percorre o catálogo inteiro e remove projetos que sumiram do Modrinth"),
+    modrinth_service: ModrinthService = Depends(get_modrinth_service)
+):
+    try:
+        return await modrinth_service.sync_catalog(full)
+    except Exception as e:
+        logger.error(f"Error syncing Modrinth catalog: {e}")
+        return {"error": "Failed to sync Modrinth catalog"}
@@ -1,9 +1,11 @@
-from fastapi import APIRouter
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
+from services.files.download_service import new_job_id
 from services.mods.mods_services import ModsService
+from services.service_container import get_mods_service
 
 router = APIRouter(prefix="/mods", tags=["mods"])
-mods_service = ModsService()
 
 class ModInfo(BaseModel):
     id: str
@@ -13,13 +15,76 @@ class ModInfo(BaseModel):
     download_url: str
     project_id: str
     file_name: str
+    hashes: Optional[dict] = None
 
 @router.post("/install-ready-mods")
-async def install_ready_mods():
-    return await mods_service.install_ready_mods()
+async def install_ready_mods(
+    dry_run: bool = Query(False, description="Apenas retorna o plano de instalação"),
+    job_id: str = Query(None, description="Id para acompanhar em /mods/install-progress (gerado se omitido)"),
+    mods_service: ModsService = Depends(get_mods_service)
+):
+    if dry_run:
+        return await mods_service.plan_install()
+    job_id = job_id or new_job_id()
+    success = await mods_service.install_ready_mods(job_id)
+    return {"success": success, "job_id": job_id}
+
+@router.get("/install-plan")
+async def get_install_plan(mods_service: ModsService = Depends(get_mods_service)):
+    return await mods_service.plan_install()
+
+@router.get("/install-progress")
+async def get_install_progress(
+    job_id: str = Query(None, description="Job de download; sem ele retorna o mais recente e o resumo de todos"),
+    mods_service: ModsService = Depends(get_mods_service)
+):
+    progress = mods_service.get_install_progress(job_id)
+    if progress is None:
+        return {"error": f"Unknown install job: {job_id}"}
+    return progress
+
+@router.post("/scan")
+async def scan_mods_folder(
+    dry_run: bool = Query(False, description="Apenas identifica os jars, sem adotá-los"),
+    mods_service: ModsService = Depends(get_mods_service)
+):
+    return await mods_service.scan_mods_folder(dry_run)
+
+@router.get("/updates")
+async def get_mod_updates(
+    mc_version: str = Query("1.21.1", description="Versão do Minecraft"),
+    mods_service: ModsService = Depends(get_mods_service)
+):
+    return await mods_service.get_mod_updates(mc_version)
+
+@router.post("/updates")
+async def queue_mod_updates(
+    project_ids: Optional[List[str]] = Query(None, description="Projetos a atualizar (todos se omitido)"),
+    mc_version: str = Query("1.21.1", description="Versão do Minecraft"),
+    mods_service: ModsService = Depends(get_mods_service)
+):
+    return await mods_service.queue_mod_updates(project_ids, mc_version)
+
+@router.get("/backups")
+async def list_mods_backups(mods_service: ModsService = Depends(get_mods_service)):
+    return await mods_service.list_mods_backups()
+
+@router.post("/backups")
+async def create_mods_backup(mods_service: ModsService = Depends(get_mods_service)):
+    success = await mods_service.temp_mods_backup()
+    return {"success": success}
+
+@router.post("/backups/{backup_id}/restore")
+async def restore_mods_backup(backup_id: str, mods_service: ModsService = Depends(get_mods_service)):
+    success = await mods_service.restore_mods_backup(backup_id)
+    return {"success": success}
 
 @router.post("/add-new-mod")
-async def add_new_mod(mod: ModInfo):
+async def add_new_mod(
+    mod: ModInfo,
+    force: bool = Query(False, description="Adiciona mesmo com dependências obrigatórias ausentes ou incompatíveis"),
+    mods_service: ModsService = Depends(get_mods_service)
+):
     return await mods_service.add_new_mod(
         mod.id,
         mod.title,
@@ -27,5 +92,7 @@ async def add_new_mod(mod: ModInfo):
         mod.icon_url,
         mod.download_url,
         mod.project_id,
-        mod.file_name
+        mod.file_name,
+        mod.hashes,
+        force
     )
\ No newline at end of file
@@ -1,12 +1,29 @@
-from fastapi import FastAPI, Request, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from controllers.modrinth.modrinth_controller import router as modrinth_router, set_modrinth_authorization
+from controllers.modrinth.modrinth_controller import router as modrinth_router
 from controllers.files.files_controller import router as files_router
 from controllers.mods.mods_controller import router as mods_router
 from controllers.mc_server.mc_server_controller import router as mc_server_router
+from services.service_container import ServiceContainer
+from services.metrics.metrics_service import render_metrics, CONTENT_TYPE
+from services.metrics.request_metrics import RequestMetricsMiddleware
+from services.metrics.structured_logging import configure_logging
 import os
 
-app = FastAPI(title="Minecraft Backend API")
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Criado aqui e não no import: importar o app não abre clientes nem conexões
+    services = ServiceContainer()
+    services.modrinth_service.set_authorization(os.getenv("MODRINTH_AUTHORIZATION", ""))
+    app.state.services = services
+    await services.startup()
+    yield
+    await services.shutdown()
+
+app = FastAPI(title="Minecraft Backend API", lifespan=lifespan)
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:5173").split(",")
 
 @app.middleware("http")
@@ -21,6 +38,9 @@ async def verify_origin(request: Request, call_next):
     
     raise HTTPException(status_code=403, detail="Forbidden: External access not allowed")
 
+# Registrado depois de verify_origin, fica por fora: mede também as requisições recusadas
+app.add_middleware(RequestMetricsMiddleware)
+
 # CORS apenas para frontend
 app.add_middleware(
     CORSMiddleware,
@@ -30,7 +50,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-set_modrinth_authorization(os.getenv("MODRINTH_AUTHORIZATION", ""))
 app.include_router(modrinth_router)
 app.include_router(files_router)
 app.include_router(mc_server_router)
@@ -40,6 +59,10 @@ app.include_router(mods_router)
 async def root():
     return {"message": "Minecraft Backend API"}
 
+@app.get("/metrics")
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
@@ -0,0 +1,213 @@
+import logging
+import time
+import asyncio
+import calendar
+import docker
+from services.docker_s.docker_service import DockerService
+from services.metrics.metrics_service import WEBSOCKET_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+# Eventos do Docker que mudam o estado do container (exec_* do rcon-cli ficam de fora)
+WATCHED_EVENTS = ["create", "start", "restart", "die", "stop", "pause", "unpause", "destroy", "health_status"]
+
+EVENT_STATUS = {
+    "create": "created",
+    "start": "running",
+    "restart": "running",
+    "die": "exited",
+    "stop": "exited",
+    "pause": "paused",
+    "unpause": "running",
+    "destroy": "not_found",
+}
+
+
+def parse_docker_time(value: str) -> int:
+    # "2024-05-01T12:00:00.123456789Z"; o ano 1 indica que o container nunca iniciou
+    if not value or value.startswith("0001-"):
+        return None
+    try:
+        return calendar.timegm(time.strptime(value[:19], "%Y-%m-%dT%H:%M:%S"))
+    except ValueError:
+        return None
+
+
+def state_from_attrs(attrs: dict) -> dict:
+    state = attrs.get("State") or {}
+    health = state.get("Health") or {}
+    return {
+        "status": state.get("Status", "unknown"),
+        "health": health.get("Status"),
+        "started_at": parse_docker_time(state.get("StartedAt")),
+        "restart_count": attrs.get("RestartCount", 0),
+        "exit_code": state.get("ExitCode"),
+    }
+
+
+class StatusSubscription:
+
+    def __init__(self, queue_size: int):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def publish(self, state: dict):
+        # Só o estado mais recente importa: descarta o mais antigo se o cliente atrasar
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(state)
+
+
+class ContainerStatusService:
+    """In-memory container state kept current by the Docker events stream, fanned out to subscribers."""
+
+    def __init__(self, docker_service: DockerService, container_name: str, queue_size: int = 100):
+        self.docker_service = docker_service
+        self.container_name = container_name
+        self.queue_size = queue_size
+        self.state = {"status": "unknown", "health": None, "started_at": None, "restart_count": 0, "exit_code": None}
+        self.updated_at = None
+        # live: o stream de eventos está conectado e o estado em memória é confiável
+        self.live = False
+        self.subscribers = set()
+        self.task = None
+        self.stream = None
+        self.refresh_task = None
+        self.events_received = 0
+
+    def get_state(self) -> dict:
+        return {**self.state, "live": self.live, "updated_at": self.updated_at}
+
+    def publish(self, changes: dict, event: str = None):
+        state = {**self.state, **changes}
+        if state == self.state:
+            return
+        self.state = state
+        self.updated_at = int(time.time())
+
+        message = {**self.get_state(), "event": event}
+        for subscription in self.subscribers:
+            subscription.publish(message)
+
+    def subscribe(self) -> tuple:
+        """Register a subscriber and return it with the current state."""
+        self.start()
+        subscription = StatusSubscription(self.queue_size)
+        self.subscribers.add(subscription)
+        return subscription, self.get_state()
+
+    def unsubscribe(self, subscription: StatusSubscription):
+        self.subscribers.discard(subscription)
+
+    def inspect(self) -> dict:
+        try:
+            attrs = self.docker_service.docker_client.api.inspect_container(self.container_name)
+        except docker.errors.NotFound:
+            return {**self.state, "status": "not_found", "health": None}
+        return state_from_attrs(attrs)
+
+    async def refresh(self) -> dict:
+        """Read the container state directly from Docker (used on (re)connect and when the stream is down)."""
+        loop = asyncio.get_event_loop()
+        try:
+            self.publish(await loop.run_in_executor(self.docker_service.executor, self.inspect), "sync")
+        except Exception as e:
+            logger.error(f"Error inspecting container {self.container_name}: {e}")
+            self.publish({"status": "error"}, "sync")
+        return self.get_state()
+
+    def apply_event(self, event: dict):
+        action = event.get("Action") or event.get("status") or ""
+        attributes = (event.get("Actor") or {}).get("Attributes") or {}
+
+        if action.startswith("health_status"):
+            self.publish({"health": action.split(":", 1)[-1].strip()}, "health_status")
+            return
+
+        changes = {}
+        if action in EVENT_STATUS:
+            changes["status"] = EVENT_STATUS[action]
+        if action == "die" and attributes.get("exitCode") is not None:
+            changes["exit_code"] = int(attributes["exitCode"])
+        if action == "start":
+            changes["started_at"] = event.get("time")
+            changes["health"] = "starting" if self.state["health"] else None
+        self.publish(changes, action)
+
+        if action == "start":
+            # RestartCount só vem no inspect; uma leitura por start é suficiente
+            self.refresh_task = asyncio.create_task(self.refresh())
+
+    def open_stream(self):
+        return self.docker_service.docker_client.events(
+            decode=True,
+            filters={"type": "container", "container": self.container_name, "event": WATCHED_EVENTS}
+        )
+
+    def consume(self, stream, loop):
+        # Thread dedicada: o iterador de eventos do Docker é bloqueante
+        for event in stream:
+            self.events_received += 1
+            loop.call_soon_threadsafe(self.apply_event, event)
+
+    async def watch(self):
+        loop = asyncio.get_event_loop()
+        backoff = 1
+        while True:
+            received = self.events_received
+            try:
+                # Conecta antes de ler o estado para não perder eventos entre os dois
+                self.stream = await loop.run_in_executor(self.docker_service.executor, self.open_stream)
+                self.live = True
+                await self.refresh()
+                await asyncio.to_thread(self.consume, self.stream, loop)
+                logger.warning(f"Docker events stream for {self.container_name} ended, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error watching container {self.container_name}: {e}")
+            finally:
+                self.live = False
+
+            # Stream que entregou eventos estava saudável; um daemon que só fecha a conexão espera cada vez mais
+            if self.events_received > received:
+                backoff = 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.watch())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        if self.stream is not None:
+            # Encerra o iterador bloqueado na thread de consumo
+            try:
+                self.stream.close()
+            except Exception:
+                pass
+            self.stream = None
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+
+container_status_services = {}
+
+
+def get_container_status(docker_service: DockerService, container_name: str) -> ContainerStatusService:
+    service = container_status_services.get(container_name)
+    if service is None:
+        service = ContainerStatusService(docker_service, container_name)
+        container_status_services[container_name] = service
+    return service
+
+
+WEBSOCKET_SUBSCRIBERS.set_function(lambda: sum(len(service.subscribers) for service in container_status_services.values()), "status")
@@ -1,95 +1,138 @@
+import logging
+import os
+import time
 import docker
 import asyncio
+import threading
 from concurrent.futures import ThreadPoolExecutor
+from services.metrics.metrics_service import DOCKER_EXEC_DURATION, DOCKER_OPERATION_DURATION
+
+logger = logging.getLogger(__name__)
+
+# Um cliente, um executor e um cache de ids para o processo inteiro
+DOCKER_EXECUTOR_WORKERS = int(os.getenv("DOCKER_EXECUTOR_WORKERS", "4"))
+executor = ThreadPoolExecutor(max_workers=DOCKER_EXECUTOR_WORKERS, thread_name_prefix="docker")
+client_lock = threading.Lock()
+docker_client = None
+# container_name -> id, para operar pela API de baixo nível sem inspect a cada chamada
+container_handles = {}
+
+
+def get_docker_client() -> docker.DockerClient:
+    global docker_client
+    if docker_client is None:
+        with client_lock:
+            if docker_client is None:
+                # Uma conexão por thread do executor, mais a do stream de eventos
+                docker_client = docker.from_env(max_pool_size=DOCKER_EXECUTOR_WORKERS + 1)
+    return docker_client
+
 
 class DockerService:
-    
+
     def __init__(self):
-        self.docker_client = docker.from_env()
-        self.executor = ThreadPoolExecutor(max_workers=5)
+        self.executor = executor
+
+    @property
+    def docker_client(self) -> docker.DockerClient:
+        return get_docker_client()
+
+    async def run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    def container_id(self, container_name: str) -> str:
+        container_id = container_handles.get(container_name)
+        if container_id is None:
+            container_id = self.docker_client.api.inspect_container(container_name)["Id"]
+            container_handles[container_name] = container_id
+        return container_id
+
+    def call(self, container_name: str, operation):
+        try:
+            return operation(self.container_id(container_name))
+        except docker.errors.NotFound:
+            # Container recriado com outro id: resolve o nome de novo uma vez
+            container_handles.pop(container_name, None)
+            return operation(self.container_id(container_name))
 
     async def get_container(self, container_name):
         try:
-            loop = asyncio.get_event_loop()
-            container = await loop.run_in_executor(
-                self.executor,
-                self.docker_client.containers.get,
-                container_name
-            )
+            container = await self.run(self.docker_client.containers.get, container_name)
+            container_handles[container_name] = container.id
             return container
         except docker.errors.NotFound:
-            print(f"Container {container_name} not found.")
+            logger.warning(f"Container {container_name} not found.")
             return None
         except Exception as e:
-            print(f"Error retrieving container {container_name}: {e}")
+            logger.error(f"Error retrieving container {container_name}: {e}")
             return None
-        
-    async def restart_container(self, container_name):
+
+    async def container_operation(self, container_name: str, action: str) -> bool:
+        started = time.perf_counter()
         try:
-            container = await self.get_container(container_name)
-            if container:
-                loop = asyncio.get_event_loop()
-                await loop.run_in_executor(
-                    self.executor,
-                    container.restart
-                )
-                return True
-            return False
-        
+            operation = getattr(self.docker_client.api, action)
+            await self.run(self.call, container_name, operation)
+            DOCKER_OPERATION_DURATION.labels(action, "success").observe(time.perf_counter() - started)
+            return True
+        except docker.errors.NotFound:
+            logger.warning(f"Container {container_name} not found.")
         except Exception as e:
-            print(f"Error restarting container {container_name}: {e}")
-            return False
-        
+            logger.error(f"Error running {action} on container {container_name}: {e}")
+        DOCKER_OPERATION_DURATION.labels(action, "error").observe(time.perf_counter() - started)
+        return False
+
+    async def restart_container(self, container_name):
+        return await self.container_operation(container_name, "restart")
+
     async def stop_container(self, container_name):
-        try:
-            container = await self.get_container(container_name)
-            if container:
-                loop = asyncio.get_event_loop()
-                await loop.run_in_executor(
-                    self.executor,
-                    container.stop
-                )
-                return True
-            return False
-        
-        except Exception as e:
-            print(f"Error stopping container {container_name}: {e}")
-            return False
-        
+        return await self.container_operation(container_name, "stop")
+
     async def start_container(self, container_name):
-        try:
-            container = await self.get_container(container_name)
-            if container:
-                await container.start()
-                return True
-            return False
-        
-        except Exception as e:
-            print(f"Error starting container {container_name}: {e}")
-            return False
-        
+        return await self.container_operation(container_name, "start")
+
+    def exec_sync(self, container_id: str, command: str) -> tuple:
+        # Mesmo fluxo do exec_run, sem o inspect do containers.get
+        api = self.docker_client.api
+        exec_id = api.exec_create(container_id, command)["Id"]
+        output = api.exec_start(exec_id)
+        return api.exec_inspect(exec_id)["ExitCode"], output
+
     async def exec_in_container(self, container_name: str, command: str, binary: bool = False):
+        started = time.perf_counter()
         try:
-            loop = asyncio.get_event_loop()
-            
-            def _exec():
-                container = self.docker_client.containers.get(container_name)
-                result = container.exec_run(command)
-                return result.exit_code, result.output
-            
-            exit_code, output = await loop.run_in_executor(self.executor, _exec)
-            
+            exit_code, output = await self.run(self.call, container_name, lambda container_id: self.exec_sync(container_id, command))
+            DOCKER_EXEC_DURATION.labels("success" if exit_code == 0 else "failed").observe(time.perf_counter() - started)
+
             if binary:
                 return exit_code, output
-            
+
             if isinstance(output, bytes):
                 output = output.decode('utf-8')
-            
+
             return exit_code, output
         except Exception as e:
-            print(f"Error executing command in container {container_name}: {e}")
+            logger.error(f"Error executing command in container {container_name}: {e}")
+            DOCKER_EXEC_DURATION.labels("error").observe(time.perf_counter() - started)
             return 1, None
-        
+
+    def close(self):
+        global docker_client
+        with client_lock:
+            if docker_client is not None:
+                docker_client.close()
+                docker_client = None
+        container_handles.clear()
+
     async def get_current_timestamp(self):
-        import time
-        return int(time.time())
\ No newline at end of file
+        return int(time.time())
+
+
+docker_service = None
+
+
+def get_docker_service() -> DockerService:
+    global docker_service
+    if docker_service is None:
+        docker_service = DockerService()
+    return docker_service
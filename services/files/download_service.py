@@ -0,0 +1,185 @@
+import logging
+import os
+import time
+import uuid
+import weakref
+import asyncio
+import aiofiles
+import httpx
+from pathlib import Path
+from services.http_s.http_service import http_service
+from services.files.mod_store_service import hash_file
+from services.metrics.metrics_service import MOD_DOWNLOAD_BYTES, MOD_DOWNLOAD_DURATION
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadError(Exception):
+    pass
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class DownloadService:
+    """Concurrent jar downloads streamed to a .part file and renamed atomically."""
+
+    def __init__(self, concurrency: int = None, retries: int = 3, chunk_size: int = 64 * 1024, max_jobs: int = 20):
+        self.concurrency = concurrency or int(os.getenv("MODS_DOWNLOAD_CONCURRENCY", "6"))
+        self.retries = retries
+        self.chunk_size = chunk_size
+        # Progresso por job: instalações simultâneas no serviço compartilhado não se sobrescrevem
+        self.jobs = {}
+        self.max_jobs = max_jobs
+        # Um download por arquivo de destino: jobs simultâneos com o mesmo sha512 usam o mesmo .part
+        self.path_locks = weakref.WeakValueDictionary()
+
+    def part_path(self, file_path: Path) -> Path:
+        # Arquivo temporário oculto e sem .jar, para o servidor nunca carregar um jar incompleto
+        return file_path.with_name(f".{file_path.name}.part")
+
+    async def check_hashes(self, part_path: Path, hashes: dict):
+        algorithm = "sha512" if hashes.get("sha512") else "sha1" if hashes.get("sha1") else None
+        if algorithm is None:
+            return
+
+        digest = await asyncio.to_thread(hash_file, part_path, (algorithm,))
+        if digest[algorithm] != hashes[algorithm].lower():
+            # Conteúdo corrompido não pode ser retomado com Range
+            part_path.unlink(missing_ok=True)
+            raise DownloadError(f"{algorithm} mismatch")
+
+    async def fetch(self, client: httpx.AsyncClient, url: str, file_path: Path, progress: dict, hashes: dict = None):
+        part_path = self.part_path(file_path)
+
+        for attempt in range(1, self.retries + 1):
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            progress["total"] = None
+
+            try:
+                async with client.stream("GET", url, headers=headers) as response:
+                    if response.status_code == 416:
+                        # Range inválido: o .part não corresponde mais ao arquivo remoto
+                        part_path.unlink(missing_ok=True)
+                        raise DownloadError("Range not satisfiable")
+
+                    if response.status_code not in (200, 206):
+                        raise DownloadError(f"HTTP {response.status_code}")
+
+                    # Servidor ignorou o Range: recomeça do zero
+                    if response.status_code == 200:
+                        offset = 0
+
+                    content_length = response.headers.get("content-length")
+                    if content_length is not None:
+                        progress["total"] = offset + int(content_length)
+
+                    progress["downloaded"] = offset
+                    downloaded_bytes = MOD_DOWNLOAD_BYTES.labels()
+                    async with aiofiles.open(part_path, "ab" if offset else "wb") as f:
+                        async for chunk in response.aiter_bytes(self.chunk_size):
+                            await f.write(chunk)
+                            progress["downloaded"] += len(chunk)
+                            downloaded_bytes.inc(len(chunk))
+
+                if progress["total"] and progress["downloaded"] != progress["total"]:
+                    raise DownloadError(f"Incomplete download: {progress['downloaded']}/{progress['total']} bytes")
+
+                await self.check_hashes(part_path, hashes or {})
+                os.replace(part_path, file_path)
+                return
+
+            except (httpx.HTTPError, DownloadError) as e:
+                logger.warning(f"Download of {file_path.name} failed (attempt {attempt}/{self.retries}): {e}")
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(2 ** (attempt - 1))
+
+    async def download(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, item: dict, files: dict) -> bool:
+        progress = {"downloaded": 0, "total": None, "status": "queued"}
+        files[item["name"]] = progress
+        file_path = Path(item["path"])
+
+        lock = self.path_locks.get(str(file_path))
+        if lock is None:
+            lock = asyncio.Lock()
+            self.path_locks[str(file_path)] = lock
+
+        async with lock, semaphore:
+            # Outro job acabou de baixar o mesmo conteúdo (caminho no store é o próprio sha512)
+            if (item.get("hashes") or {}).get("sha512") and file_path.exists():
+                progress["status"] = "done"
+                return True
+
+            progress["status"] = "downloading"
+            started = time.perf_counter()
+            try:
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                await self.fetch(client, item["url"], file_path, progress, item.get("hashes"))
+                progress["status"] = "done"
+                MOD_DOWNLOAD_DURATION.labels("success").observe(time.perf_counter() - started)
+                return True
+            except Exception as e:
+                logger.error(f"Failed to download {item['name']}: {e}")
+                self.part_path(file_path).unlink(missing_ok=True)
+                progress["status"] = "failed"
+                MOD_DOWNLOAD_DURATION.labels("failed").observe(time.perf_counter() - started)
+                return False
+
+    def start_job(self, job_id: str = None) -> dict:
+        job = {"job_id": job_id or new_job_id(), "started_at": int(time.time()), "finished_at": None, "files": {}}
+        self.jobs[job["job_id"]] = job
+
+        # Mantém só os jobs mais recentes; os que ainda estão rodando nunca são descartados
+        finished = [key for key, item in self.jobs.items() if item["finished_at"] is not None]
+        for key in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[key]
+        return job
+
+    async def download_many(self, downloads: list, job_id: str = None) -> dict:
+        """Download [{"name", "url", "path", "hashes"}, ...]; returns {name: success}.
+
+        Progress is tracked under job_id (generated when omitted), see get_progress.
+        """
+        job = self.start_job(job_id)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        client = http_service.get_client()
+        try:
+            results = await asyncio.gather(*(
+                self.download(client, semaphore, item, job["files"])
+                for item in downloads
+            ))
+        finally:
+            job["finished_at"] = int(time.time())
+
+        return {item["name"]: result for item, result in zip(downloads, results)}
+
+    def job_summary(self, job: dict, files: bool = True) -> dict:
+        items = list(job["files"].values())
+        summary = {
+            "job_id": job["job_id"],
+            "status": "running" if job["finished_at"] is None else "finished",
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "total": len(items),
+            "done": sum(1 for item in items if item["status"] == "done"),
+            "failed": sum(1 for item in items if item["status"] == "failed"),
+        }
+        if files:
+            summary["files"] = job["files"]
+        return summary
+
+    def get_progress(self, job_id: str = None) -> dict:
+        """One job by id (None if unknown), or the most recent job plus a summary of every tracked job."""
+        if job_id is not None:
+            job = self.jobs.get(job_id)
+            return self.job_summary(job) if job else None
+
+        jobs = [self.job_summary(job, files=False) for job in self.jobs.values()]
+        if not self.jobs:
+            return {"total": 0, "done": 0, "failed": 0, "files": {}, "jobs": jobs}
+        latest = next(reversed(self.jobs.values()))
+        return {**self.job_summary(latest), "jobs": jobs}
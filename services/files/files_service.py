@@ -1,67 +1,67 @@
-import json
-import aiofiles
-import aiohttp
-import tarfile
+import logging
+import os
 from pathlib import Path
-import shutil
-from services.docker_s.docker_service import DockerService
+from services.docker_s.docker_service import DockerService, get_docker_service
+from services.files.download_service import DownloadService
+from services.files.hash_cache import HashCache
+from services.files.mod_store_service import ModStoreService
+from services.files.mods_archive_service import ModsArchiveService
+from services.files.server_properties_service import get_server_properties
+from services.files.players_data_service import get_players_data, names_only
+from services.files import state_store
+from services.files.state_store import StateStore
+from services.files.mod_registry import get_mod_registry
+from services.modrinth.dependency_resolver import BLOCKING_CONFLICTS
+
+logger = logging.getLogger(__name__)
 
 class FilesService:
     
-    def __init__(self):
-        self.docker_service = DockerService()
+    def __init__(self, docker_service: DockerService = None, modrinth_service=None, hash_cache: HashCache = None):
+        self.docker_service = docker_service or get_docker_service()
+        # Dependência circular com ModrinthService: ligada pelo ServiceContainer ou criada uma vez sob demanda
+        self.modrinth_service = modrinth_service
+        self.download_service = DownloadService()
+        self.mod_store = ModStoreService()
         self.minecraft_server_path = "/minecraft/"
+        self.mods_archive_service = ModsArchiveService(f"{self.minecraft_server_path}mods/", hash_cache=hash_cache)
+        self.server_properties = get_server_properties(f"{self.minecraft_server_path}server.properties")
+        self.players_data = get_players_data(self.minecraft_server_path)
         
         self.minecraft_ready_mods = "config/ready_to_install.json"
         self.minecraft_installed_mods = "config/installed_mods.json"
         self.minecraft_sent_commands = "config/sent_commands.json"
+        # Os arquivos JSON só são lidos na migração inicial para o banco
+        self.state_store = StateStore(legacy_files={
+            "installed": self.minecraft_installed_mods,
+            "ready": self.minecraft_ready_mods,
+            "commands": self.minecraft_sent_commands
+        })
+        self.mod_registry = get_mod_registry(self.state_store)
+        self.commands_history_max_entries = int(os.getenv("COMMANDS_HISTORY_MAX_ENTRIES", "10000"))
+
+    def get_modrinth_service(self):
+        if self.modrinth_service is None:
+            from services.modrinth.modrinth_service import ModrinthService
+            self.modrinth_service = ModrinthService(files_service=self)
+        return self.modrinth_service
 
-    async def get_server_config(self):
+    async def get_server_config(self, typed: bool = False):
         
         try:
-            config_path = Path(f"{self.minecraft_server_path}server.properties")
-            
-            if not config_path.exists():
-                print(f"Config file not found: {config_path}")
-                return None
-            
-            async with aiofiles.open(config_path, 'r') as f:
-                config_content = await f.read()
-            
-            config_lines = config_content.splitlines()
-            config_dict = {}
-            
-            for line in config_lines:
-                if '=' in line and not line.startswith('#'):
-                    key, value = line.split('=', 1)
-                    config_dict[key.strip()] = value.strip()
-            
-            return config_dict
+            return await self.server_properties.get(typed)
         
         except Exception as e:
-            print(f"Error retrieving server config: {e}")
+            logger.error(f"Error retrieving server config: {e}")
             return None
         
-    async def get_server_config_lite(self):
+    async def get_server_config_lite(self, typed: bool = False):
         
         try:
-            config_path = Path(f"{self.minecraft_server_path}server.properties")
-            
-            if not config_path.exists():
-                print(f"Config file not found: {config_path}")
+            config_dict = await self.server_properties.get(typed)
+            if config_dict is None:
                 return None
             
-            async with aiofiles.open(config_path, 'r') as f:
-                config_content = await f.read()
-            
-            config_lines = config_content.splitlines()
-            config_dict = {}
-            
-            for line in config_lines:
-                if '=' in line and not line.startswith('#'):
-                    key, value = line.split('=', 1)
-                    config_dict[key.strip()] = value.strip()
-            
             lite_config = {
                 "difficulty": config_dict.get("difficulty"),
                 "gamemode": config_dict.get("gamemode"),
@@ -84,334 +84,251 @@ class FilesService:
             return lite_config
         
         except Exception as e:
-            print(f"Error retrieving lite server config: {e}")
+            logger.error(f"Error retrieving lite server config: {e}")
             return None
+
+    async def update_server_config(self, updates: dict) -> dict:
+        """Patch keys of server.properties in place; returns {"success", "error"?}."""
+        try:
+            await self.server_properties.patch(updates)
+            return {"success": True}
         
-    async def get_ips_banned_whitelist_ops(self):
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Error updating server config: {e}")
+            return {"success": False, "error": "Failed to update server config"}
+        
+    async def get_ips_banned_whitelist_ops(self, detailed: bool = False):
         try:
-            files = {
-                "banned-ips": Path(f"{self.minecraft_server_path}banned-ips.json"),
-                "banned-players": Path(f"{self.minecraft_server_path}banned-players.json"),
-                "whitelist": Path(f"{self.minecraft_server_path}whitelist.json"),
-                "ops": Path(f"{self.minecraft_server_path}ops.json")
-            }
-            
-            data = {}
-            
-            for key, path in files.items():
-                if not path.exists():
-                    data[key] = []
-                    continue
-                
-                try:
-                    async with aiofiles.open(path, 'r') as f:
-                        content = await f.read()
-                    json_data = json.loads(content)
-                    
-                    if key == "banned-ips":
-                        data[key] = [item["ip"] for item in json_data]
-                    elif key == "banned-players":
-                        data[key] = [item["name"] for item in json_data]
-                    elif key == "whitelist":
-                        data[key] = [item["name"] for item in json_data]
-                    elif key == "ops":
-                        data[key] = [item["name"] for item in json_data]
-                except json.JSONDecodeError:
-                    data[key] = []
-            
-            return data
+            data = await self.players_data.get()
+            # Sem detailed mantém o formato antigo, só nomes (ou IPs)
+            return data if detailed else names_only(data)
         
         except Exception as e:
-            print(f"Error retrieving banned IPs, whitelist, Banned Players and ops: {e}")
+            logger.error(f"Error retrieving banned IPs, whitelist, Banned Players and ops: {e}")
             return None
         
     async def get_installed_mods(self) -> list:
         try:
-            
-            if not self.minecraft_installed_mods:
-                return None
-            
-            async with aiofiles.open(self.minecraft_installed_mods, 'r') as f:
-                content = await f.read()
-                installed_mods = json.loads(content)
-                return installed_mods
+            return await self.mod_registry.get_mods("installed")
             
         except Exception as e:
-            print(f"Error retrieving installed mods: {e}")
+            logger.error(f"Error retrieving installed mods: {e}")
             return None
         
     async def clear_list_after_install(self) -> bool:
         try:
-            async with aiofiles.open(self.minecraft_ready_mods, 'w') as f:
-                await f.write(json.dumps([], indent=4))
+            await self.mod_registry.replace("ready", [])
             return True
         except Exception as e:
-            print(f"Error clearing ready to install mods list: {e}")
+            logger.error(f"Error clearing ready to install mods list: {e}")
             return False
 
     async def get_ready_to_install_mods(self) -> list:
         try:
-            
-            if not self.minecraft_ready_mods:
-                return None
-            
-            async with aiofiles.open(self.minecraft_ready_mods, 'r') as f:
-                content = await f.read()
-                ready_mods = json.loads(content)
-                return ready_mods
+            return await self.mod_registry.get_mods("ready")
             
         except Exception as e:
-            print(f"Error retrieving ready to install mods: {e}")
+            logger.error(f"Error retrieving ready to install mods: {e}")
             return None
         
     async def add_installed_mod(self, mod_info: dict, path: str):
-        try:
-            
-            installed_mods = await self.get_installed_mods()
-            if installed_mods is None:
-                installed_mods = []
+        results = await self.add_installed_mods([mod_info], path)
+        return results.get(mod_info['file_name'], False)
 
-            print(f"Downloading mod {mod_info['title']} from {mod_info['download_url']}...")
-            
-            # Download usando aiohttp diretamente para o volume montado
+    async def fetch_mods(self, mods_info: list, path: str, job_id: str = None) -> dict:
+        """Place the jars of mods_info into path (from the store or downloading concurrently).
+
+        Download progress is tracked under job_id (see DownloadService.get_progress).
+        """
+        try:
             mods_dir = Path(path.rstrip('/'))
-            mods_dir.mkdir(parents=True, exist_ok=True)
-            
-            file_path = mods_dir / mod_info['file_name']
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(mod_info['download_url']) as response:
-                    if response.status == 200:
-                        async with aiofiles.open(file_path, 'wb') as f:
-                            await f.write(await response.read())
-                    else:
-                        print(f"Failed to download mod: HTTP {response.status}")
-                        return False
-            
-            mod_info['installed_at'] = await self.docker_service.get_current_timestamp()
-            installed_mods.append(mod_info)
+            results = {}
+            downloads = []
+
+            for mod_info in mods_info:
+                sha512 = (mod_info.get('hashes') or {}).get('sha512')
+
+                # Versão já vista antes: sem rede e sem cópia
+                if self.mod_store.has(sha512):
+                    results[mod_info['file_name']] = await self.mod_store.materialize(sha512, mods_dir / mod_info['file_name'])
+                    continue
+
+                downloads.append({
+                    "name": mod_info['file_name'],
+                    "url": mod_info['download_url'],
+                    # Com hash conhecido o download vai direto para o store; sem hash, para a pasta de mods
+                    "path": self.mod_store.path_for(sha512) if sha512 else mods_dir / mod_info['file_name'],
+                    "hashes": mod_info.get('hashes')
+                })
+
+            logger.info(f"Downloading {len(downloads)} of {len(mods_info)} mods...")
+            downloaded = await self.download_service.download_many(downloads, job_id)
+            results.update(downloaded)
+
+            for mod_info in mods_info:
+                if not results.get(mod_info['file_name']):
+                    continue
+
+                sha512 = (mod_info.get('hashes') or {}).get('sha512')
+                if sha512:
+                    if mod_info['file_name'] in downloaded:
+                        results[mod_info['file_name']] = await self.mod_store.materialize(sha512, mods_dir / mod_info['file_name'])
+                else:
+                    sha512 = await self.mod_store.adopt(mods_dir / mod_info['file_name'])
+                    if sha512:
+                        mod_info['hashes'] = {**(mod_info.get('hashes') or {}), 'sha512': sha512}
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error fetching mods: {e}")
+            return {}
+
+    async def add_installed_mods(self, mods_info: list, path: str) -> dict:
+        """Download mods concurrently and record the successful ones in a single transaction."""
+        try:
+            results = await self.fetch_mods(mods_info, path)
+
+            timestamp = await self.docker_service.get_current_timestamp()
+            installed = []
+            for mod_info in mods_info:
+                if results.get(mod_info['file_name']):
+                    mod_info['installed_at'] = timestamp
+                    installed.append(mod_info)
             
-            async with aiofiles.open(self.minecraft_installed_mods, 'w') as f:
-                await f.write(json.dumps(installed_mods, indent=4))
+            await self.mod_registry.insert("installed", installed)
+            return results
             
+        except Exception as e:
+            logger.error(f"Error adding installed mods: {e}")
+            return {}
+
+    async def save_installed_mods(self, installed_mods: list) -> bool:
+        try:
+            await self.mod_registry.replace("installed", installed_mods)
             return True
-            
         except Exception as e:
-            print(f"Error adding installed mod: {e}")
+            logger.error(f"Error saving installed mods: {e}")
+            return False
+
+    async def save_ready_to_install_mods(self, ready_mods: list) -> bool:
+        try:
+            await self.mod_registry.replace("ready", ready_mods)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving ready to install mods: {e}")
             return False
         
     async def remove_installed_mod(self, id: str) -> bool:
         try:
-            installed_mods = await self.get_installed_mods()
-            if installed_mods is None:
-                return False
-
-            mod_to_remove = next((mod for mod in installed_mods if mod["id"] == id), None)
-            if not mod_to_remove:
-                print(f"Mod with ID {id} not found in installed mods.")
+            mods_to_remove = await self.mod_registry.remove("installed", id)
+            if not mods_to_remove:
+                logger.warning(f"Mod with ID {id} not found in installed mods.")
                 return False
 
-            dependencies = [mod for mod in installed_mods if id in mod.get("dependency_of", [])]
-            if not dependencies:
-                dependencies = []
-            
-            dependencies_to_remove = []
-            for dep in dependencies:
-                
-                if len(dep.get("dependency_of", [])) > 1:
-                    print(f"Mod {dep['title']} is a dependency for other mods as well. Skipping removal.")
-                    dep["dependency_of"].remove(id)
-                    continue
-
-                dependencies_to_remove.append(dep)
-
-            mods_to_remove = [mod_to_remove] + dependencies_to_remove
             for mod in mods_to_remove:
                 mod_file = Path(f"{self.minecraft_server_path}mods/{mod['file_name']}")
                 
                 if mod_file.exists():
                     mod_file.unlink()
-                    print(f"Removed mod file: {mod['file_name']}")
+                    logger.info(f"Removed mod file: {mod['file_name']}")
                 else:
-                    print(f"Mod file not found: {mod['file_name']}")
+                    logger.warning(f"Mod file not found: {mod['file_name']}")
 
-                installed_mods.remove(mod)
-            
-            async with aiofiles.open(self.minecraft_installed_mods, 'w') as f:            
-                await f.write(json.dumps(installed_mods, indent=4))
-
-            self.docker_service.restart_container("eldoria-server")
+            await self.docker_service.restart_container("eldoria-server")
             return True
         
         except Exception as e:
-            print(f"Error removing installed mod: {e}")
+            logger.error(f"Error removing installed mod: {e}")
             return False
 
-    async def add_ready_to_install_mod(self, mod_info: dict, recursive: bool = True):
-        try:
-            from services.modrinth.modrinth_service import ModrinthService
+    async def add_ready_to_install_mod(self, mod_info: dict, recursive: bool = True, force: bool = False) -> dict:
+        """Queue a mod with its required dependencies; the resolver's conflicts go back to the caller.
 
-            all_mods = await self.get_installed_mods() + await self.get_ready_to_install_mods()
-            
-            for mod in all_mods:
-                if mod["project_id"] == mod_info["project_id"]:
-                    return "One version of this mod is already added"
+        A required dependency that is missing or unsupported rejects the add unless force is set.
+        """
+        try:
+            if await self.mod_registry.has_project(mod_info["project_id"]):
+                return {"error": "One version of this mod is already added"}
 
-            ready_mods = await self.get_ready_to_install_mods()
-            if ready_mods is None:
-                ready_mods = []
-            
+            dependencies = {"mods": [], "existing": {}, "conflicts": []}
             if recursive: 
-                dependencies = await ModrinthService().recursive_dependencies(mod_info["id"])
-
-                for mod_dep in dependencies["mods"]:
-                    if not any(mod["project_id"] == mod_dep["project_id"] for mod in all_mods):
-                        ready_mods.append(mod_dep)
-                    else:
-                        existing = next((m for m in ready_mods if m["project_id"] == mod_dep["project_id"]), None)
-                        if existing:
-                            if "dependency_of" not in existing:
-                                existing["dependency_of"] = []
-                            if mod_info["id"] not in existing["dependency_of"]:
-                                existing["dependency_of"].append(mod_info["id"])
-
-                ready_mods.append(mod_info)
-            else:
-                ready_mods.append(mod_info)
-            
-            async with aiofiles.open(self.minecraft_ready_mods, 'w') as f:
-                await f.write(json.dumps(ready_mods, indent=4))
+                existing_versions = await self.mod_registry.project_versions()
+                dependencies = await self.get_modrinth_service().recursive_dependencies(mod_info["id"], existing=existing_versions)
+
+            conflicts = dependencies["conflicts"]
+            if not force and any(conflict["type"] in BLOCKING_CONFLICTS for conflict in conflicts):
+                return {"error": "Required dependencies are missing or unsupported for this Minecraft version", "conflicts": conflicts}
+
+            # Verificação e inserção na mesma transação: chamadas simultâneas não se sobrescrevem
+            added = await self.mod_registry.add_ready(mod_info, dependencies["mods"], list(dependencies["existing"]))
+            if not added:
+                return {"error": "One version of this mod is already added"}
             
-            return "Mod added to ready to install list"
+            return {"message": "Mod added to ready to install list", "conflicts": conflicts}
             
         except Exception as e:
-            print(f"Error adding ready to install mod: {e}")
-            return "Failed to add mod"
+            logger.error(f"Error adding ready to install mod: {e}")
+            return {"error": "Failed to add mod"}
         
     async def remove_ready_to_install_mod(self, id: str) -> bool:
         try:
-            ready_mods = await self.get_ready_to_install_mods()
-            if ready_mods is None:
-                return False
-
-            mod_to_remove = next((mod for mod in ready_mods if mod["id"] == id), None)
-            if not mod_to_remove:
-                print(f"Mod with ID {id} not found in ready to install mods.")
+            removed = await self.mod_registry.remove("ready", id)
+            if not removed:
+                logger.warning(f"Mod with ID {id} not found in ready to install mods.")
                 return False
 
-            dependencies = [mod for mod in ready_mods if id in mod.get("dependency_of", [])]
-            if not dependencies:
-                dependencies = []
-            
-            dependencies_to_remove = []
-            for dep in dependencies:
-                
-                if len(dep.get("dependency_of", [])) > 1:
-                    print(f"Mod {dep['title']} is a dependency for other mods as well. Skipping removal.")
-                    dep["dependency_of"].remove(id)
-                    continue
-
-                dependencies_to_remove.append(dep)
-
-            mods_to_remove = [mod_to_remove] + dependencies_to_remove
-            for mod in mods_to_remove:
-                ready_mods.remove(mod)
-            
-            async with aiofiles.open(self.minecraft_ready_mods, 'w') as f:            
-                await f.write(json.dumps(ready_mods, indent=4))
-
             return True
         
         except Exception as e:
-            print(f"Error removing ready to install mod: {e}")
+            logger.error(f"Error removing ready to install mod: {e}")
             return False
         
     async def get_files_by_project_id(self, project_id: str) -> tuple:
         try:
-
-            version = None
-            installed = False
-            ready = False
-
-            installed_mods = await self.get_installed_mods()
-            ready_mods = await self.get_ready_to_install_mods()
-
-            for mod in installed_mods:
-                if mod.get("project_id") == project_id:
-                    version = mod.get("id")
-                    installed = True
-                    break
-            
-            if not installed:
-                for mod in ready_mods:
-                    if mod.get("project_id") == project_id:
-                        version = mod.get("id")
-                        ready = True
-                        break
-
-            return version, installed, ready
+            return await self.mod_registry.find_project(project_id)
         
         except Exception as e:
-            print(f"Error getting files by project ID: {e}")
+            logger.error(f"Error getting files by project ID: {e}")
             return None
 
-    async def save_last_command(self, command_info: str) -> bool:
+    async def save_last_command(self, command_info: str) -> dict:
+        """Append a command to the history; returns the new entry (None on failure)."""
         try:
-            commands = []
             timestamp = await self.docker_service.get_current_timestamp()
-            command_info = {"timestamp": timestamp, "command": command_info}
-
-            try:
-                async with aiofiles.open(self.minecraft_sent_commands, 'r') as f:
-                    content = await f.read()
-                    commands = json.loads(content)
-            except FileNotFoundError:
-                commands = []
-            
-            commands.append(command_info)
-            
-            async with aiofiles.open(self.minecraft_sent_commands, 'w') as f:
-                await f.write(json.dumps(commands, indent=4))
-            
-            return True
+            return await self.state_store.run(state_store.add_command, timestamp, command_info, self.commands_history_max_entries)
             
         except Exception as e:
-            print(f"Error saving last command: {e}")
-            return False
+            logger.error(f"Error saving last command: {e}")
+            return None
         
-    async def get_sent_commands(self):
+    async def get_sent_commands(self, limit: int = 50, cursor: int = None, query: str = None, start: int = None, end: int = None) -> dict:
         try:
-            async with aiofiles.open(self.minecraft_sent_commands, 'r') as f:
-                content = await f.read()
-                commands = json.loads(content)
-                return commands
+            return await self.state_store.run(state_store.select_commands, limit, cursor, query, start, end)
         except Exception as e:
-            print(f"Error retrieving sent commands: {e}")
-            return []
+            logger.error(f"Error retrieving sent commands: {e}")
+            return {"results": [], "next_cursor": None}
         
-    async def download_all_mods(self):
+    def stream_mods_archive(self, archive_format: str = "tar.gz", level: int = None):
+        """Generator of archive chunks produced while the response is sent (no temp file)."""
         try:
-            mods_path = Path(f"{self.minecraft_server_path}mods")
-            tar_path = Path(f"{self.minecraft_server_path}mods.tar.gz")
-
-            if not mods_path.exists():
-                print(f"Mods folder not found: {mods_path}")
-                return None
-
-            # Cria arquivo tar.gz com os mods usando tarfile
-            with tarfile.open(tar_path, "w:gz") as tar:
-                for mod_file in mods_path.glob('*.jar'):
-                    tar.add(mod_file, arcname=mod_file.name)
-
-            # Lê o conteúdo do arquivo compactado
-            async with aiofiles.open(tar_path, 'rb') as f:
-                tar_content = await f.read()
-
-            # Limpa o arquivo temporário
-            tar_path.unlink()
+            return self.mods_archive_service.stream(archive_format, level)
+        except Exception as e:
+            logger.error(f"Error streaming mods archive: {e}")
+            return None
 
-            return tar_content  # Retorna bytes do arquivo tar.gz
+    async def get_mods_archive(self, archive_format: str = "tar.gz", level: int = None) -> dict:
+        """Prebuilt archive for the current mod set: {"path", "etag", "media_type", "filename"}.
 
+        Call release_mods_archive(path) once the response is sent.
+        """
+        try:
+            return await self.mods_archive_service.prebuilt(archive_format, level)
         except Exception as e:
-            print(f"Error downloading all mods: {e}")
-            return None
\ No newline at end of file
+            logger.error(f"Error building mods archive: {e}")
+            return None
+
+    def release_mods_archive(self, archive_path):
+        self.mods_archive_service.release(archive_path)
@@ -0,0 +1,96 @@
+import os
+import json
+import asyncio
+import threading
+from pathlib import Path
+from services.files.mod_store_service import hash_file
+
+
+class HashCache:
+    """sha1/sha512 of jars on disk, reused while (path, size, mtime) is unchanged."""
+
+    def __init__(self, cache_path: str = None):
+        self.cache_path = Path(cache_path or os.getenv("MODS_HASH_CACHE_PATH", "config/mods_hash_cache.json"))
+        self.entries = None
+        self.dirty = False
+        # hashes_sync roda em várias threads ao mesmo tempo que save; lock protege entries/dirty
+        self.lock = threading.Lock()
+        # Serializa as gravações para um snapshot antigo não sobrescrever um mais novo
+        self.save_lock = threading.Lock()
+
+    def load(self):
+        if self.entries is not None:
+            return
+        with self.lock:
+            if self.entries is not None:
+                return
+            try:
+                self.entries = json.loads(self.cache_path.read_text())
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.entries = {}
+
+    def save(self):
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                snapshot = dict(self.entries)
+                self.dirty = False
+
+            # Descarta arquivos que não existem mais
+            stale = [path for path in snapshot if not os.path.exists(path)]
+            for path in stale:
+                del snapshot[path]
+            with self.lock:
+                for path in stale:
+                    self.entries.pop(path, None)
+
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = self.cache_path.with_name(f".{self.cache_path.name}.tmp")
+                temp_path.write_text(json.dumps(snapshot))
+                os.replace(temp_path, self.cache_path)
+            except Exception:
+                with self.lock:
+                    self.dirty = True
+                raise
+
+    def cached(self, path: Path):
+        self.load()
+        stat = path.stat()
+        with self.lock:
+            entry = self.entries.get(str(path))
+
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["hashes"]
+        return None
+
+    def cached_many(self, paths: list) -> dict:
+        return {path: self.cached(path) for path in paths}
+
+    def hashes_sync(self, path: Path) -> dict:
+        cached = self.cached(path)
+        if cached is not None:
+            return cached
+
+        stat = path.stat()
+        key = str(path)
+        hashes = hash_file(path, ("sha1", "sha512"))
+        with self.lock:
+            self.entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hashes": hashes}
+            self.dirty = True
+        return hashes
+
+    async def hashes(self, path: Path) -> dict:
+        return await asyncio.to_thread(self.hashes_sync, path)
+
+    async def hash_many(self, paths: list) -> dict:
+        """Hash several files in parallel threads; returns {path: {"sha1", "sha512"}}."""
+        results = await asyncio.to_thread(self.cached_many, paths)
+        misses = [path for path, hashes in results.items() if hashes is None]
+
+        if misses:
+            results.update(zip(misses, await asyncio.gather(*(self.hashes(path) for path in misses))))
+            await asyncio.to_thread(self.save)
+
+        return results
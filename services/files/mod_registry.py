@@ -0,0 +1,123 @@
+import copy
+import asyncio
+from services.files import state_store
+from services.files.state_store import StateStore, LISTS
+
+
+def replace_and_select(conn, list_name: str, mods: list) -> list:
+    state_store.replace_mods(conn, list_name, mods)
+    return state_store.select_mods(conn, list_name)
+
+
+def insert_and_select(conn, list_name: str, mods: list) -> list:
+    state_store.insert_mods(conn, list_name, mods)
+    return state_store.select_mods(conn, list_name)
+
+
+def remove_and_select(conn, list_name: str, mod_id: str) -> tuple:
+    removed = state_store.remove_mod(conn, list_name, mod_id)
+    return removed, state_store.select_mods(conn, list_name)
+
+
+def add_ready_and_select(conn, mod_info: dict, dependencies: list, dependency_of_existing: list) -> tuple:
+    added = state_store.add_ready_mod(conn, mod_info, dependencies, dependency_of_existing)
+    return added, state_store.select_mods(conn, "ready")
+
+
+class ModRegistry:
+    """Process-wide view of the installed/ready mods, indexed in memory and written through to the StateStore."""
+
+    def __init__(self, store: StateStore):
+        self.store = store
+        self.lock = asyncio.Lock()
+        self.loaded = False
+        self.mods = {list_name: {} for list_name in LISTS}
+        self.by_project = {list_name: {} for list_name in LISTS}
+        # mod_id -> ids dos mods que ele requer (inverso de dependency_of)
+        self.requires = {list_name: {} for list_name in LISTS}
+
+    def index(self, list_name: str, mods: list):
+        self.mods[list_name] = {mod["id"]: mod for mod in mods}
+        self.by_project[list_name] = {mod["project_id"]: mod["id"] for mod in mods}
+        requires = {}
+        for mod in mods:
+            for dependent in mod.get("dependency_of", []):
+                requires.setdefault(dependent, []).append(mod["id"])
+        self.requires[list_name] = requires
+
+    async def load(self):
+        if self.loaded:
+            return
+        async with self.lock:
+            if self.loaded:
+                return
+            for list_name in LISTS:
+                self.index(list_name, await self.store.run(state_store.select_mods, list_name))
+            self.loaded = True
+
+    async def get_mods(self, list_name: str) -> list:
+        await self.load()
+        # Cópias: quem chama pode alterar os dicts sem corromper o índice
+        return copy.deepcopy(list(self.mods[list_name].values()))
+
+    async def get_mod(self, list_name: str, mod_id: str) -> dict:
+        await self.load()
+        mod = self.mods[list_name].get(mod_id)
+        return copy.deepcopy(mod) if mod else None
+
+    async def find_project(self, project_id: str) -> tuple:
+        """(version_id, installed, ready) for a project, installed taking precedence."""
+        await self.load()
+        for list_name in LISTS:
+            version_id = self.by_project[list_name].get(project_id)
+            if version_id:
+                return version_id, list_name == "installed", list_name == "ready"
+        return None, False, False
+
+    async def has_project(self, project_id: str) -> bool:
+        await self.load()
+        return any(project_id in self.by_project[list_name] for list_name in LISTS)
+
+    async def project_versions(self) -> dict:
+        """project_id -> version_id across installed and ready (ready wins)."""
+        await self.load()
+        return {**self.by_project["installed"], **self.by_project["ready"]}
+
+    async def required_by(self, list_name: str, mod_id: str) -> list:
+        await self.load()
+        return list(self.requires[list_name].get(mod_id, []))
+
+    async def replace(self, list_name: str, mods: list):
+        await self.load()
+        async with self.lock:
+            self.index(list_name, await self.store.run(replace_and_select, list_name, mods))
+
+    async def insert(self, list_name: str, mods: list):
+        await self.load()
+        async with self.lock:
+            self.index(list_name, await self.store.run(insert_and_select, list_name, mods))
+
+    async def remove(self, list_name: str, mod_id: str) -> list:
+        await self.load()
+        async with self.lock:
+            removed, mods = await self.store.run(remove_and_select, list_name, mod_id)
+            self.index(list_name, mods)
+            return removed
+
+    async def add_ready(self, mod_info: dict, dependencies: list, dependency_of_existing: list) -> bool:
+        await self.load()
+        async with self.lock:
+            added, mods = await self.store.run(add_ready_and_select, mod_info, dependencies, dependency_of_existing)
+            self.index("ready", mods)
+            return added
+
+
+mod_registries = {}
+
+
+def get_mod_registry(store: StateStore) -> ModRegistry:
+    registry = mod_registries.get(store.db_path)
+    if registry is None:
+        registry = ModRegistry(store)
+        mod_registries[store.db_path] = registry
+    return registry
@@ -0,0 +1,105 @@
+import logging
+import os
+import asyncio
+import hashlib
+import shutil
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# ioctl FICLONE do Linux (reflink em btrfs/xfs)
+FICLONE = 0x40049409
+
+
+def hash_file(path: Path, algorithms: tuple = ("sha1", "sha512")) -> dict:
+    hashers = {name: hashlib.new(name) for name in algorithms}
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            for hasher in hashers.values():
+                hasher.update(block)
+    return {name: hasher.hexdigest() for name, hasher in hashers.items()}
+
+
+class ModStoreService:
+    """Content-addressed jar cache keyed by sha512, materialized into the mods folder by link."""
+
+    def __init__(self, store_path: str = None):
+        self.store_path = Path((store_path or os.getenv("MODS_STORE_PATH", "/minecraft/mods_store/")).rstrip('/'))
+
+    def path_for(self, sha512: str) -> Path:
+        return self.store_path / sha512[:2] / f"{sha512}.jar"
+
+    def has(self, sha512: str) -> bool:
+        return bool(sha512) and self.path_for(sha512).exists()
+
+    async def verify(self, path: Path, hashes: dict) -> bool:
+        """Check a file against the Modrinth hashes (sha512 preferred, sha1 otherwise)."""
+        algorithm = "sha512" if hashes.get("sha512") else "sha1" if hashes.get("sha1") else None
+        if algorithm is None:
+            return True
+
+        digest = await asyncio.to_thread(hash_file, path, (algorithm,))
+        return digest[algorithm] == hashes[algorithm].lower()
+
+    def link_or_copy(self, source: Path, target: Path):
+        try:
+            os.link(source, target)
+            return
+        except OSError:
+            pass
+
+        if fcntl is not None:
+            try:
+                with open(source, "rb") as src, open(target, "wb") as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                target.unlink(missing_ok=True)
+
+        shutil.copyfile(source, target)
+
+    def materialize_sync(self, sha512: str, target: Path):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_target = target.with_name(f".{target.name}.link")
+        temp_target.unlink(missing_ok=True)
+
+        self.link_or_copy(self.path_for(sha512), temp_target)
+        os.replace(temp_target, target)
+        # rename entre dois hardlinks do mesmo arquivo não faz nada e mantém a origem
+        temp_target.unlink(missing_ok=True)
+
+    async def materialize(self, sha512: str, target: Path) -> bool:
+        """Place the stored jar at target via hardlink, reflink or copy, atomically."""
+        try:
+            await asyncio.to_thread(self.materialize_sync, sha512, target)
+            return True
+        except Exception as e:
+            logger.error(f"Error materializing {sha512[:12]} into {target}: {e}")
+            return False
+
+    def adopt_sync(self, path: Path, sha512: str = None) -> str:
+        sha512 = sha512 or hash_file(path, ("sha512",))["sha512"]
+        store_file = self.path_for(sha512)
+
+        if not store_file.exists():
+            store_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = store_file.with_name(f".{store_file.name}.link")
+            temp_file.unlink(missing_ok=True)
+            self.link_or_copy(path, temp_file)
+            os.replace(temp_file, store_file)
+            temp_file.unlink(missing_ok=True)
+
+        return sha512
+
+    async def adopt(self, path: Path, sha512: str = None) -> str:
+        """Add an existing jar (e.g. downloaded without known hashes) to the store; returns its sha512."""
+        try:
+            return await asyncio.to_thread(self.adopt_sync, path, sha512)
+        except Exception as e:
+            logger.error(f"Error adding {path} to mod store: {e}")
+            return None
@@ -0,0 +1,220 @@
+import logging
+import os
+import io
+import gzip
+import queue
+import asyncio
+import hashlib
+import tarfile
+import zipfile
+import threading
+from pathlib import Path
+from services.files.hash_cache import HashCache
+from services.metrics.metrics_service import FILES_IO_DURATION
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+FORMATS = {
+    "tar.gz": {"extension": "tar.gz", "media_type": "application/gzip"},
+    "zip": {"extension": "zip", "media_type": "application/zip"},
+    "tar.zst": {"extension": "tar.zst", "media_type": "application/zstd"},
+}
+
+
+class ArchiveCancelled(Exception):
+    pass
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable file that hands fixed-size chunks to a callback."""
+
+    def __init__(self, emit):
+        self.emit = emit
+        self.buffer = bytearray()
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.buffer += data
+        self.position += len(data)
+        while len(self.buffer) >= CHUNK_SIZE:
+            self.emit(bytes(self.buffer[:CHUNK_SIZE]))
+            del self.buffer[:CHUNK_SIZE]
+        return len(data)
+
+    def tell(self) -> int:
+        # zipfile consulta a posição para montar o diretório central
+        return self.position
+
+    def flush(self):
+        if self.buffer:
+            self.emit(bytes(self.buffer))
+            self.buffer.clear()
+
+
+class ModsArchiveService:
+    """Stream the mods folder as tar.gz / zip / tar.zst, or serve a prebuilt archive keyed by the mod set."""
+
+    def __init__(self, mods_path: str, cache_path: str = None, hash_cache: HashCache = None):
+        self.mods_dir = Path(mods_path.rstrip('/'))
+        self.cache_dir = Path((cache_path or os.getenv("MODS_ARCHIVE_CACHE_PATH", "/minecraft/mods_archive_cache/")).rstrip('/'))
+        self.compression_level = int(os.getenv("MODS_ARCHIVE_COMPRESSION_LEVEL", "6"))
+        self.hash_cache = hash_cache or HashCache()
+        self.build_locks = {}
+        # Arquivos com resposta em andamento (path -> quantidade): a limpeza não os apaga
+        self.serving = {}
+
+    def available_formats(self) -> list:
+        return [name for name in FORMATS if name != "tar.zst" or zstandard is not None]
+
+    def jars(self) -> list:
+        return sorted(self.mods_dir.glob('*.jar')) if self.mods_dir.exists() else []
+
+    def write_archive(self, target, archive_format: str, level: int, jars: list):
+        if archive_format == "zip":
+            with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=level) as archive:
+                for jar in jars:
+                    archive.write(jar, arcname=jar.name)
+            return
+
+        if archive_format == "tar.zst":
+            compressor = zstandard.ZstdCompressor(level=level).stream_writer(target, closefd=False)
+            with tarfile.open(fileobj=compressor, mode="w|") as archive:
+                for jar in jars:
+                    archive.add(jar, arcname=jar.name)
+            compressor.close()
+            return
+
+        with gzip.GzipFile(fileobj=target, mode="wb", compresslevel=level) as compressor:
+            with tarfile.open(fileobj=compressor, mode="w|") as archive:
+                for jar in jars:
+                    archive.add(jar, arcname=jar.name)
+
+    def validate(self, archive_format: str, level: int = None) -> int:
+        if archive_format not in self.available_formats():
+            raise ValueError(f"Unsupported archive format: {archive_format}")
+        level = self.compression_level if level is None else level
+        # zstd vai até 22; gzip e zip até 9
+        return max(1, min(level, 22 if archive_format == "tar.zst" else 9))
+
+    def stream(self, archive_format: str = "tar.gz", level: int = None):
+        """Validate the options and return a sync generator of archive chunks."""
+        level = self.validate(archive_format, level)
+        return self.generate(archive_format, level, self.jars())
+
+    def generate(self, archive_format: str, level: int, jars: list):
+        # O arquivo é montado numa thread à medida que os chunks são consumidos
+        chunks = queue.Queue(maxsize=16)
+        cancelled = threading.Event()
+        done = object()
+
+        def emit(chunk: bytes):
+            # Backpressure: o produtor espera o cliente consumir
+            while not cancelled.is_set():
+                try:
+                    chunks.put(chunk, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+            raise ArchiveCancelled()
+
+        def produce():
+            sink = ChunkSink(emit)
+            try:
+                self.write_archive(sink, archive_format, level, jars)
+                sink.flush()
+                emit(done)
+            except ArchiveCancelled:
+                pass
+            except Exception as e:
+                logger.error(f"Error streaming mods archive: {e}")
+                try:
+                    emit(e)
+                except ArchiveCancelled:
+                    pass
+            finally:
+                sink.buffer.clear()
+
+        threading.Thread(target=produce, name="mods-archive", daemon=True).start()
+
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is done:
+                    return
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            cancelled.set()
+
+    async def mod_set_key(self, jars: list) -> str:
+        # Só o conjunto de jars: formato e nível entram no nome do arquivo
+        hashes = await self.hash_cache.hash_many(jars)
+        digest = hashlib.sha256()
+        for jar in jars:
+            digest.update(f"\n{jar.name}:{hashes[jar]['sha512']}".encode())
+        return digest.hexdigest()[:32]
+
+    def build_sync(self, archive_path: Path, archive_format: str, level: int, jars: list):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = archive_path.with_name(f".{archive_path.name}.part")
+        with open(temp_path, "wb") as f:
+            self.write_archive(f, archive_format, level, jars)
+        os.replace(temp_path, archive_path)
+
+    def evict_stale_sync(self, set_key: str):
+        """Remove archives of older mod sets (any format/level), except those still being served."""
+        if not self.cache_dir.exists():
+            return
+        for old in self.cache_dir.glob("mods-*"):
+            if old.name.startswith(f"mods-{set_key}-") or old in self.serving:
+                continue
+            old.unlink(missing_ok=True)
+            logger.info(f"Removed stale mods archive {old.name}")
+
+    def release(self, archive_path: Path):
+        """Called when the response for a prebuilt() archive has been sent."""
+        count = self.serving.get(archive_path, 0) - 1
+        if count > 0:
+            self.serving[archive_path] = count
+        else:
+            self.serving.pop(archive_path, None)
+
+    async def prebuilt(self, archive_format: str = "tar.gz", level: int = None) -> dict:
+        """Path and ETag of the cached archive for the current mod set, building it if needed.
+
+        The path is marked as being served until release(path) is called.
+        """
+        level = self.validate(archive_format, level)
+        jars = self.jars()
+        set_key = await self.mod_set_key(jars)
+        extension = FORMATS[archive_format]["extension"]
+        archive_path = self.cache_dir / f"mods-{set_key}-{level}.{extension}"
+
+        lock = self.build_locks.setdefault(archive_path.name, asyncio.Lock())
+        async with lock:
+            if not archive_path.exists():
+                logger.info(f"Building mods archive {archive_path.name} ({len(jars)} jars)")
+                with FILES_IO_DURATION.labels("mods_archive_build").time():
+                    await asyncio.to_thread(self.build_sync, archive_path, archive_format, level, jars)
+        self.build_locks.pop(archive_path.name, None)
+
+        self.serving[archive_path] = self.serving.get(archive_path, 0) + 1
+        await asyncio.to_thread(self.evict_stale_sync, set_key)
+
+        return {
+            "path": archive_path,
+            "etag": f'"{set_key}-{extension}-{level}"',
+            "media_type": FORMATS[archive_format]["media_type"],
+            "filename": f"mods.{FORMATS[archive_format]['extension']}"
+        }
@@ -0,0 +1,104 @@
+import json
+import asyncio
+from pathlib import Path
+from services.metrics.metrics_service import FILES_IO_DURATION
+
+PLAYER_FILES = {
+    "banned-ips": "banned-ips.json",
+    "banned-players": "banned-players.json",
+    "whitelist": "whitelist.json",
+    "ops": "ops.json",
+}
+
+
+def player_record(key: str, item: dict) -> dict:
+    if key == "banned-ips":
+        return {
+            "ip": item.get("ip"),
+            "reason": item.get("reason"),
+            "source": item.get("source"),
+            "created": item.get("created"),
+            "expires": item.get("expires")
+        }
+    if key == "banned-players":
+        return {
+            "uuid": item.get("uuid"),
+            "name": item.get("name"),
+            "reason": item.get("reason"),
+            "source": item.get("source"),
+            "created": item.get("created"),
+            "expires": item.get("expires")
+        }
+    if key == "ops":
+        return {
+            "uuid": item.get("uuid"),
+            "name": item.get("name"),
+            "level": item.get("level"),
+            "bypasses_player_limit": item.get("bypassesPlayerLimit", False)
+        }
+    return {"uuid": item.get("uuid"), "name": item.get("name")}
+
+
+class PlayersDataService:
+    """Ban lists, whitelist and ops read concurrently and cached until one of the files changes."""
+
+    def __init__(self, server_path: str):
+        self.server_dir = Path(server_path.rstrip('/'))
+        self.file_cache = {}
+        self.combined_key = None
+        self.combined = None
+
+    def stat_key(self, path: Path):
+        try:
+            stat = path.stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            # Arquivo ausente também é um estado estável do cache
+            return ()
+
+    def read_file(self, key: str) -> tuple:
+        path = self.server_dir / PLAYER_FILES[key]
+        stat_key = self.stat_key(path)
+        cached = self.file_cache.get(key)
+        if cached and cached[0] == stat_key:
+            return stat_key, cached[1]
+
+        records = []
+        if stat_key:
+            try:
+                records = [player_record(key, item) for item in json.loads(path.read_text())]
+            except json.JSONDecodeError:
+                # Arquivo sendo reescrito pelo servidor: não guarda em cache
+                return None, []
+
+        self.file_cache[key] = (stat_key, records)
+        return stat_key, records
+
+    async def get(self) -> dict:
+        """{"banned-ips": [...], "banned-players": [...], "whitelist": [...], "ops": [...]} with full records."""
+        with FILES_IO_DURATION.labels("players_data_read").time():
+            results = await asyncio.gather(*(asyncio.to_thread(self.read_file, key) for key in PLAYER_FILES))
+        key = tuple(stat_key for stat_key, _ in results)
+
+        if key != self.combined_key or None in key:
+            self.combined = {name: records for name, (_, records) in zip(PLAYER_FILES, results)}
+            self.combined_key = key
+        return self.combined
+
+
+def names_only(data: dict) -> dict:
+    return {
+        key: [record["ip"] if key == "banned-ips" else record["name"] for record in records]
+        for key, records in data.items()
+    }
+
+
+players_data_services = {}
+
+
+def get_players_data(server_path: str) -> PlayersDataService:
+    service = players_data_services.get(server_path)
+    if service is None:
+        service = PlayersDataService(server_path)
+        players_data_services[server_path] = service
+    return service
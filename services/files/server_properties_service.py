@@ -0,0 +1,273 @@
+import logging
+import os
+import asyncio
+from pathlib import Path
+from services.metrics.metrics_service import FILES_IO_DURATION
+
+logger = logging.getLogger(__name__)
+
+# Tipos das chaves conhecidas do server.properties; as demais ficam como texto
+INT_KEYS = {
+    "server-port", "rcon.port", "query.port", "max-players", "view-distance", "simulation-distance",
+    "max-world-size", "max-tick-time", "spawn-protection", "op-permission-level", "function-permission-level",
+    "network-compression-threshold", "player-idle-timeout", "rate-limit", "entity-broadcast-range-percentage",
+    "max-chained-neighbor-updates", "pause-when-empty-seconds",
+}
+BOOL_KEYS = {
+    "pvp", "hardcore", "white-list", "enforce-whitelist", "enable-rcon", "enable-query", "enable-status",
+    "enable-command-block", "online-mode", "allow-flight", "allow-nether", "spawn-monsters", "spawn-animals",
+    "spawn-npcs", "force-gamemode", "generate-structures", "hide-online-players", "prevent-proxy-connections",
+    "sync-chunk-writes", "use-native-transport", "enable-jmx-monitoring", "broadcast-console-to-ops",
+    "broadcast-rcon-to-ops", "enforce-secure-profile", "require-resource-pack", "log-ips", "accepts-transfers",
+}
+ENUM_KEYS = {
+    "difficulty": ("peaceful", "easy", "normal", "hard"),
+    "gamemode": ("survival", "creative", "adventure", "spectator"),
+}
+# O servidor ainda aceita os ids numéricos antigos (difficulty=2, gamemode=0)
+ENUM_LEGACY_IDS = {key: {str(index): name for index, name in enumerate(names)} for key, names in ENUM_KEYS.items()}
+
+ESCAPES = {"t": "\t", "n": "\n", "r": "\r", "f": "\f"}
+
+
+def unescape(text: str) -> str:
+    result = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char != "\\" or i + 1 == len(text):
+            result.append(char)
+            i += 1
+            continue
+
+        following = text[i + 1]
+        if following == "u" and i + 6 <= len(text):
+            try:
+                result.append(chr(int(text[i + 2:i + 6], 16)))
+                i += 6
+                continue
+            except ValueError:
+                pass
+        result.append(ESCAPES.get(following, following))
+        i += 2
+    # Junta pares substitutos (\uXXXX\uXXXX) em um único caractere
+    return "".join(result).encode("utf-16", "surrogatepass").decode("utf-16")
+
+
+def escape(text: str, is_key: bool = False) -> str:
+    result = []
+    for index, char in enumerate(text):
+        if char == "\\":
+            result.append("\\\\")
+        elif char in "\t\n\r\f":
+            result.append("\\" + {"\t": "t", "\n": "n", "\r": "r", "\f": "f"}[char])
+        elif char in "=:#!" or (char == " " and (is_key or index == 0)):
+            result.append("\\" + char)
+        elif ord(char) > 0xffff:
+            # Fora do BMP: par substituto em UTF-16, como no Java
+            code = ord(char) - 0x10000
+            result.append(f"\\u{0xd800 + (code >> 10):04x}\\u{0xdc00 + (code & 0x3ff):04x}")
+        elif ord(char) > 0x7e:
+            result.append(f"\\u{ord(char):04x}")
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def ends_with_continuation(line: str) -> bool:
+    # Número ímpar de barras no fim: a linha continua na próxima
+    return (len(line) - len(line.rstrip("\\"))) % 2 == 1
+
+
+def split_key_value(logical: str) -> tuple:
+    i = 0
+    while i < len(logical):
+        char = logical[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char in "=: \t\f":
+            break
+        i += 1
+
+    key = logical[:i]
+    rest = logical[i:].lstrip(" \t\f")
+    if rest[:1] in ("=", ":"):
+        rest = rest[1:].lstrip(" \t\f")
+    return unescape(key), unescape(rest)
+
+
+def parse_properties(content: str) -> list:
+    """Logical entries [{"lines": [...physical lines], "key": str|None, "value": str|None}] in file order."""
+    entries = []
+    lines = content.splitlines()
+    i = 0
+    while i < len(lines):
+        physical = [lines[i]]
+        stripped = lines[i].lstrip(" \t\f")
+
+        if not stripped or stripped[0] in "#!":
+            entries.append({"lines": physical, "key": None, "value": None})
+            i += 1
+            continue
+
+        logical = stripped
+        while ends_with_continuation(logical) and i + 1 < len(lines):
+            i += 1
+            physical.append(lines[i])
+            logical = logical[:-1] + lines[i].lstrip(" \t\f")
+
+        key, value = split_key_value(logical)
+        entries.append({"lines": physical, "key": key, "value": value})
+        i += 1
+    return entries
+
+
+def to_typed(key: str, value: str):
+    if key in INT_KEYS:
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    if key in BOOL_KEYS:
+        return value.strip().lower() == "true"
+    if key in ENUM_KEYS:
+        normalized = value.strip().lower()
+        normalized = ENUM_LEGACY_IDS[key].get(normalized, normalized)
+        if normalized not in ENUM_KEYS[key]:
+            raise ValueError(f"{key} must be one of {', '.join(ENUM_KEYS[key])}, got {value!r}")
+        return normalized
+    return value
+
+
+def typed_values(values: dict) -> dict:
+    typed = {}
+    for key, value in values.items():
+        try:
+            typed[key] = to_typed(key, value)
+        except ValueError as e:
+            # Valor que o servidor não reconhece: sinaliza e devolve o texto original
+            logger.warning(f"Invalid value in server.properties: {e}")
+            typed[key] = value
+    return typed
+
+
+def to_text(key: str, value) -> str:
+    """Validate a new value against the known schema and render it as text."""
+    if key in BOOL_KEYS:
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            value = value.lower() == "true"
+        if not isinstance(value, bool):
+            raise ValueError(f"{key} must be a boolean")
+        return "true" if value else "false"
+
+    if key in INT_KEYS:
+        if isinstance(value, bool):
+            raise ValueError(f"{key} must be an integer")
+        try:
+            return str(int(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"{key} must be an integer")
+
+    if key in ENUM_KEYS:
+        if str(value).lower() not in ENUM_KEYS[key]:
+            raise ValueError(f"{key} must be one of {', '.join(ENUM_KEYS[key])}")
+        return str(value).lower()
+
+    if value is None or isinstance(value, (dict, list)):
+        raise ValueError(f"{key} must be a scalar value")
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class ServerPropertiesService:
+    """server.properties reader cached by (mtime, size), with typed values and in-place atomic patches."""
+
+    def __init__(self, properties_path: str):
+        self.properties_path = Path(properties_path)
+        self.cache_key = None
+        self.entries = []
+        self.values = {}
+        self.typed = None
+        self.write_lock = asyncio.Lock()
+
+    def load_sync(self) -> dict:
+        stat = self.properties_path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key != self.cache_key:
+            raw = self.properties_path.read_bytes()
+            try:
+                content = raw.decode("utf-8")
+            except UnicodeDecodeError:
+                content = raw.decode("latin-1")
+
+            entries = parse_properties(content)
+            self.entries = entries
+            self.values = {entry["key"]: entry["value"] for entry in entries if entry["key"] is not None}
+            self.typed = None
+            self.cache_key = key
+        return self.values
+
+    def load_typed_sync(self) -> dict:
+        values = self.load_sync()
+        # Convertido uma vez por versão do arquivo (e os avisos de valor inválido também)
+        if self.typed is None:
+            self.typed = typed_values(values)
+        return self.typed
+
+    async def get(self, typed: bool = False) -> dict:
+        """Parsed properties (None if the file does not exist).
+
+        typed converts ints and booleans and normalises enums (lower case, legacy
+        numeric ids); unknown enum values are logged and returned as text.
+        """
+        if not self.properties_path.exists():
+            logger.warning(f"Config file not found: {self.properties_path}")
+            return None
+
+        with FILES_IO_DURATION.labels("server_properties_read").time():
+            values = await asyncio.to_thread(self.load_typed_sync if typed else self.load_sync)
+        return dict(values)
+
+    def patch_sync(self, updates: dict) -> dict:
+        rendered = {key: to_text(key, value) for key, value in updates.items()}
+        self.load_sync()
+
+        lines = []
+        pending = dict(rendered)
+        for entry in self.entries:
+            if entry["key"] not in rendered:
+                lines.extend(entry["lines"])
+            elif entry["key"] in pending:
+                # Reescreve só a linha da chave, mantendo comentários e ordem (duplicadas são descartadas)
+                lines.append(f"{escape(entry['key'], is_key=True)}={escape(pending.pop(entry['key']))}")
+        for key, value in pending.items():
+            lines.append(f"{escape(key, is_key=True)}={escape(value)}")
+
+        temp_path = self.properties_path.with_name(f".{self.properties_path.name}.tmp")
+        temp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        if self.properties_path.exists():
+            os.chmod(temp_path, self.properties_path.stat().st_mode)
+        os.replace(temp_path, self.properties_path)
+
+        self.cache_key = None
+        return self.load_sync()
+
+    async def patch(self, updates: dict) -> dict:
+        """Set individual keys atomically (temp file + rename); raises ValueError on invalid values."""
+        async with self.write_lock:
+            with FILES_IO_DURATION.labels("server_properties_patch").time():
+                return dict(await asyncio.to_thread(self.patch_sync, updates))
+
+
+server_properties_services = {}
+
+
+def get_server_properties(properties_path: str) -> ServerPropertiesService:
+    # Um leitor por arquivo no processo, para o cache valer entre instâncias de FilesService
+    service = server_properties_services.get(properties_path)
+    if service is None:
+        service = ServerPropertiesService(properties_path)
+        server_properties_services[properties_path] = service
+    return service
@@ -0,0 +1,248 @@
+import logging
+import os
+import json
+import time
+import asyncio
+import sqlite3
+from pathlib import Path
+from services.metrics.metrics_service import STATE_STORE_TRANSACTION_DURATION
+
+logger = logging.getLogger(__name__)
+
+LISTS = ("installed", "ready")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mods (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    list TEXT NOT NULL,
+    id TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    file_name TEXT,
+    data TEXT NOT NULL,
+    UNIQUE (list, id)
+);
+CREATE INDEX IF NOT EXISTS mods_project ON mods (list, project_id);
+CREATE TABLE IF NOT EXISTS dependency_edges (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    list TEXT NOT NULL,
+    mod_id TEXT NOT NULL,
+    dependent_id TEXT NOT NULL,
+    UNIQUE (list, mod_id, dependent_id)
+);
+CREATE INDEX IF NOT EXISTS dependency_edges_dependent ON dependency_edges (list, dependent_id);
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp INTEGER,
+    command TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class StateStore:
+    """SQLite (WAL) store for installed/ready mods, their dependency edges and the command history."""
+
+    def __init__(self, db_path: str = None, legacy_files: dict = None):
+        self.db_path = db_path or os.getenv("STATE_DB_PATH", "config/state.sqlite3")
+        # Arquivos JSON antigos importados uma única vez: {"installed": ..., "ready": ..., "commands": ...}
+        self.legacy_files = legacy_files or {}
+        self.initialized = False
+
+    def connect(self) -> sqlite3.Connection:
+        if not self.initialized:
+            # sqlite3 não cria o diretório: tem que existir antes de abrir o banco
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        if not self.initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self.migrate(conn)
+            self.initialized = True
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def transaction(self, function, *args):
+        """Run function(conn, *args) in one IMMEDIATE transaction (writers are serialized)."""
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = function(conn, *args)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+        finally:
+            conn.close()
+
+    async def run(self, function, *args):
+        started = time.perf_counter()
+        try:
+            return await asyncio.to_thread(self.transaction, function, *args)
+        finally:
+            STATE_STORE_TRANSACTION_DURATION.labels(function.__name__).observe(time.perf_counter() - started)
+
+    def migrate(self, conn: sqlite3.Connection):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT value FROM meta WHERE key = 'migrated'").fetchone():
+                conn.execute("COMMIT")
+                return
+
+            for list_name in LISTS:
+                mods = self.read_legacy(list_name)
+                if mods:
+                    insert_mods(conn, list_name, mods)
+                    logger.info(f"Migrated {len(mods)} {list_name} mods from {self.legacy_files[list_name]}")
+
+            commands = self.read_legacy("commands")
+            if commands:
+                conn.executemany(
+                    "INSERT INTO commands (timestamp, command) VALUES (?, ?)",
+                    [(command.get("timestamp"), command.get("command")) for command in commands]
+                )
+                logger.info(f"Migrated {len(commands)} commands from {self.legacy_files['commands']}")
+
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated', '1')")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def read_legacy(self, name: str) -> list:
+        path = self.legacy_files.get(name)
+        if not path or not os.path.exists(path):
+            return []
+        try:
+            with open(path, 'r') as f:
+                return json.load(f) or []
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping invalid legacy state file {path}: {e}")
+            return []
+
+
+def insert_mods(conn: sqlite3.Connection, list_name: str, mods: list):
+    for mod in mods:
+        data = {key: value for key, value in mod.items() if key != "dependency_of"}
+        conn.execute("DELETE FROM mods WHERE list = ? AND id = ?", (list_name, mod["id"]))
+        conn.execute(
+            "INSERT INTO mods (list, id, project_id, file_name, data) VALUES (?, ?, ?, ?, ?)",
+            (list_name, mod["id"], mod["project_id"], mod.get("file_name"), json.dumps(data))
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO dependency_edges (list, mod_id, dependent_id) VALUES (?, ?, ?)",
+            [(list_name, mod["id"], dependent) for dependent in mod.get("dependency_of") or []]
+        )
+
+
+def select_mods(conn: sqlite3.Connection, list_name: str) -> list:
+    edges = {}
+    for mod_id, dependent_id in conn.execute("SELECT mod_id, dependent_id FROM dependency_edges WHERE list = ? ORDER BY seq", (list_name,)):
+        edges.setdefault(mod_id, []).append(dependent_id)
+
+    mods = []
+    for mod_id, data in conn.execute("SELECT id, data FROM mods WHERE list = ? ORDER BY seq", (list_name,)):
+        mod = json.loads(data)
+        mod["dependency_of"] = edges.get(mod_id, [])
+        mods.append(mod)
+    return mods
+
+
+def replace_mods(conn: sqlite3.Connection, list_name: str, mods: list):
+    conn.execute("DELETE FROM mods WHERE list = ?", (list_name,))
+    conn.execute("DELETE FROM dependency_edges WHERE list = ?", (list_name,))
+    insert_mods(conn, list_name, mods)
+
+
+def project_exists(conn: sqlite3.Connection, project_id: str) -> bool:
+    return conn.execute("SELECT 1 FROM mods WHERE project_id = ? LIMIT 1", (project_id,)).fetchone() is not None
+
+
+def remove_mod(conn: sqlite3.Connection, list_name: str, mod_id: str) -> list:
+    """Remove a mod and the dependencies only it needed; returns the removed mods."""
+    row = conn.execute("SELECT data FROM mods WHERE list = ? AND id = ?", (list_name, mod_id)).fetchone()
+    if row is None:
+        return []
+
+    removed = [json.loads(row[0])]
+    dependencies = [dependency for (dependency,) in conn.execute(
+        "SELECT mod_id FROM dependency_edges WHERE list = ? AND dependent_id = ?", (list_name, mod_id)
+    )]
+    conn.execute("DELETE FROM dependency_edges WHERE list = ? AND dependent_id = ?", (list_name, mod_id))
+
+    for dependency in dependencies:
+        # Ainda é dependência de outro mod: só perde a aresta
+        if conn.execute("SELECT 1 FROM dependency_edges WHERE list = ? AND mod_id = ? LIMIT 1", (list_name, dependency)).fetchone():
+            continue
+        row = conn.execute("SELECT data FROM mods WHERE list = ? AND id = ?", (list_name, dependency)).fetchone()
+        if row:
+            removed.append(json.loads(row[0]))
+
+    for mod in removed:
+        conn.execute("DELETE FROM mods WHERE list = ? AND id = ?", (list_name, mod["id"]))
+        conn.execute("DELETE FROM dependency_edges WHERE list = ? AND mod_id = ?", (list_name, mod["id"]))
+
+    return removed
+
+
+def add_ready_mod(conn: sqlite3.Connection, mod_info: dict, dependencies: list, dependency_of_existing: list) -> bool:
+    """Insert mod_info and its new dependencies in the ready list, unless the project is already present."""
+    if project_exists(conn, mod_info["project_id"]):
+        return False
+
+    insert_mods(conn, "ready", [dependency for dependency in dependencies if not project_exists(conn, dependency["project_id"])])
+
+    # Dependências que já estão na lista de prontos passam a ser dependência deste mod também
+    for project_id in dependency_of_existing:
+        row = conn.execute("SELECT id FROM mods WHERE list = 'ready' AND project_id = ?", (project_id,)).fetchone()
+        if row:
+            conn.execute(
+                "INSERT OR IGNORE INTO dependency_edges (list, mod_id, dependent_id) VALUES ('ready', ?, ?)",
+                (row[0], mod_info["id"])
+            )
+
+    insert_mods(conn, "ready", [mod_info])
+    return True
+
+
+def find_project(conn: sqlite3.Connection, project_id: str) -> tuple:
+    """(version_id, installed, ready) for a project, installed taking precedence."""
+    for list_name in LISTS:
+        row = conn.execute("SELECT id FROM mods WHERE list = ? AND project_id = ? ORDER BY seq LIMIT 1", (list_name, project_id)).fetchone()
+        if row:
+            return row[0], list_name == "installed", list_name == "ready"
+    return None, False, False
+
+
+def add_command(conn: sqlite3.Connection, timestamp: int, command: str, max_entries: int = 0) -> dict:
+    """Append a command; with max_entries, the oldest ones beyond it are dropped."""
+    command_id = conn.execute("INSERT INTO commands (timestamp, command) VALUES (?, ?)", (timestamp, command)).lastrowid
+    if max_entries:
+        conn.execute("DELETE FROM commands WHERE id <= ?", (command_id - max_entries,))
+    return {"id": command_id, "timestamp": timestamp, "command": command}
+
+
+def select_commands(conn: sqlite3.Connection, limit: int = 50, cursor: int = None, query: str = None, start: int = None, end: int = None) -> dict:
+    """Newest first; pass the returned next_cursor to get the next (older) page."""
+    conditions = []
+    params = []
+
+    if cursor is not None:
+        conditions.append("id < ?")
+        params.append(cursor)
+    if query:
+        conditions.append("instr(lower(command), lower(?)) > 0")
+        params.append(query)
+    if start is not None:
+        conditions.append("timestamp >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append("timestamp <= ?")
+        params.append(end)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = conn.execute(f"SELECT id, timestamp, command FROM commands {where} ORDER BY id DESC LIMIT ?", params + [limit + 1]).fetchall()
+
+    results = [{"id": command_id, "timestamp": timestamp, "command": command} for command_id, timestamp, command in rows[:limit]]
+    return {"results": results, "next_cursor": results[-1]["id"] if len(rows) > limit else None}
@@ -0,0 +1,42 @@
+import os
+import importlib.util
+import httpx
+
+
+class HttpService:
+    """App-scoped pooled HTTP client shared by every outbound call (Modrinth API and CDN)."""
+
+    def __init__(self):
+        self.client = None
+        self.http2 = importlib.util.find_spec("h2") is not None
+        self.timeout = httpx.Timeout(
+            float(os.getenv("HTTP_TIMEOUT", "15")),
+            connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+        )
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "50")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+        )
+
+    def get_client(self) -> httpx.AsyncClient:
+        # Criado sob demanda para funcionar também fora do lifespan (scripts, benchmarks)
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=self.limits,
+                follow_redirects=True
+            )
+        return self.client
+
+    async def startup(self):
+        self.get_client()
+
+    async def shutdown(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+http_service = HttpService()
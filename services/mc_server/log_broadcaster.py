@@ -0,0 +1,196 @@
+import logging
+import asyncio
+import os
+import time
+from collections import deque
+from pathlib import Path
+from services.metrics.metrics_service import WEBSOCKET_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+
+class LogSubscription:
+
+    def __init__(self, queue_size: int):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def publish(self, line: str):
+        # Consumidor lento: descarta a linha mais antiga em vez de crescer sem limite
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(line)
+
+    def take_dropped(self) -> int:
+        dropped = self.dropped
+        self.dropped = 0
+        return dropped
+
+    async def next_batch(self, window: float, max_bytes: int) -> list:
+        """Wait for one line, then coalesce more until the time window or byte budget runs out."""
+        line = await self.queue.get()
+        lines = [line]
+        size = len(line)
+        deadline = time.monotonic() + window
+
+        while size < max_bytes:
+            if self.queue.empty():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    line = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                line = self.queue.get_nowait()
+
+            lines.append(line)
+            size += len(line)
+
+        return lines
+
+
+class LogBroadcaster:
+    """One tailer task per log file, fanning lines out to bounded subscriber queues."""
+
+    def __init__(self, log_path: str, backlog_lines: int = 100, queue_size: int = 1000, poll_interval: float = 0.1):
+        self.log_path = Path(log_path)
+        self.backlog = deque(maxlen=backlog_lines)
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.subscribers = set()
+        self.task = None
+        self.file = None
+        self.inode = None
+        self.partial = b""
+
+    def subscribe(self) -> tuple:
+        """Register a subscriber and return it with a snapshot of the last lines."""
+        subscription = LogSubscription(self.queue_size)
+
+        if self.task is None or self.task.done():
+            self.open_log()
+            self.task = asyncio.create_task(self.tail())
+
+        self.subscribers.add(subscription)
+        return subscription, list(self.backlog)
+
+    def unsubscribe(self, subscription: LogSubscription):
+        self.subscribers.discard(subscription)
+
+        if not self.subscribers and self.task:
+            self.task.cancel()
+            self.task = None
+            self.close_log()
+
+    def open_log(self) -> bool:
+        self.reopen_from_start()
+        if self.file is None:
+            return False
+
+        for line in self.read_last_lines(self.backlog.maxlen):
+            self.backlog.append(line)
+
+        self.file.seek(0, os.SEEK_END)
+        return True
+
+    def close_log(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+            self.inode = None
+
+    def read_last_lines(self, count: int, block_size: int = 8192) -> list:
+        """Seek backwards from the end of the file until `count` lines were read."""
+        self.file.seek(0, os.SEEK_END)
+        position = self.file.tell()
+        data = b""
+
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(block_size, position)
+            position -= step
+            self.file.seek(position)
+            data = self.file.read(step) + data
+
+        lines = data.splitlines(keepends=True)
+        if position > 0:
+            # A primeira linha do bloco pode estar cortada
+            lines = lines[1:]
+
+        return [line.decode("utf-8", errors="replace") for line in lines[-count:]]
+
+    def rotated(self) -> bool:
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return False
+
+        # Arquivo substituído no restart (novo inode) ou truncado no lugar
+        return stat.st_ino != self.inode or stat.st_size < self.file.tell()
+
+    def publish(self, line: str):
+        self.backlog.append(line)
+        for subscription in self.subscribers:
+            subscription.publish(line)
+
+    def reopen_from_start(self):
+        self.close_log()
+        try:
+            self.file = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return
+        self.inode = os.fstat(self.file.fileno()).st_ino
+        self.backlog.clear()
+        self.partial = b""
+
+    async def tail(self):
+        while True:
+            try:
+                if self.file is None:
+                    self.reopen_from_start()
+                    if self.file is None:
+                        await asyncio.sleep(1)
+                        continue
+
+                chunk = self.file.read(65536)
+                if chunk:
+                    lines = (self.partial + chunk).split(b"\n")
+                    self.partial = lines.pop()
+                    for line in lines:
+                        self.publish(line.decode("utf-8", errors="replace") + "\n")
+                    # Cede o loop durante rajadas de log
+                    await asyncio.sleep(0)
+                    continue
+
+                if self.rotated():
+                    logger.info(f"Log rotation detected for {self.log_path}, reopening")
+                    self.reopen_from_start()
+                    continue
+
+                await asyncio.sleep(self.poll_interval)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error tailing log file {self.log_path}: {e}")
+                self.close_log()
+                await asyncio.sleep(1)
+
+
+log_broadcasters = {}
+
+
+def get_log_broadcaster(log_path: str) -> LogBroadcaster:
+    broadcaster = log_broadcasters.get(log_path)
+    if broadcaster is None:
+        broadcaster = LogBroadcaster(log_path)
+        log_broadcasters[log_path] = broadcaster
+    return broadcaster
+
+
+WEBSOCKET_SUBSCRIBERS.set_function(lambda: sum(len(broadcaster.subscribers) for broadcaster in log_broadcasters.values()), "logs")
@@ -0,0 +1,285 @@
+import asyncio
+import gzip
+import os
+import re
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+LINE_PATTERN = re.compile(r"^\[(\d{2}):(\d{2}):(\d{2})(?:\.\d+)?\] \[([^\]]*)/(\w+)\]: ?(.*)$")
+ROTATED_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})-\d+\.log\.gz$")
+PLAYER_PATTERNS = [
+    re.compile(r"^(\w{3,16}) (?:joined|left) the game"),
+    re.compile(r"^(\w{3,16}) lost connection"),
+    re.compile(r"^(\w{3,16})\[/[^\]]+\] logged in"),
+    re.compile(r"^UUID of player (\w{3,16}) is"),
+    re.compile(r"^<(\w{3,16})> "),
+    re.compile(r"^\[(\w{3,16}): "),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    inode INTEGER,
+    offset INTEGER NOT NULL,
+    last_ts TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    level TEXT,
+    thread TEXT,
+    player TEXT,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_ts ON entries (ts, id);
+CREATE INDEX IF NOT EXISTS entries_player_ts ON entries (player, ts);
+CREATE INDEX IF NOT EXISTS entries_level_ts ON entries (level, ts);
+CREATE INDEX IF NOT EXISTS entries_file ON entries (file);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5 (message, content='entries', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, message) VALUES (new.id, new.message);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, message) VALUES ('delete', old.id, old.message);
+END;
+"""
+
+
+def extract_player(message: str):
+    for pattern in PLAYER_PATTERNS:
+        match = pattern.match(message)
+        if match:
+            return match.group(1)
+    return None
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def parse_cursor(cursor: str) -> tuple:
+    """"YYYY-MM-DD HH:MM:SS|id" -> (ts, id); InvalidCursorError if it was not produced by search."""
+    cursor_ts, _, cursor_id = cursor.rpartition("|")
+    try:
+        datetime.strptime(cursor_ts, "%Y-%m-%d %H:%M:%S")
+        return cursor_ts, int(cursor_id)
+    except ValueError:
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}")
+
+
+class LogIndexService:
+    """Incremental SQLite index over latest.log and the rotated *.log.gz files."""
+
+    def __init__(self, logs_path: str = "/minecraft/logs/", index_path: str = None):
+        self.logs_path = Path(logs_path.rstrip('/'))
+        self.index_path = index_path or os.getenv("LOG_INDEX_PATH", "config/log_index.sqlite3")
+        self.lock = asyncio.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def parse_lines(self, name: str, lines, current_day: date, last_ts: str = None, last_level: str = None, last_thread: str = None):
+        """Yield entry rows; continuation lines (stack traces) inherit the previous header.
+
+        last_ts/last_level/last_thread carry the previous record over when parsing resumes
+        mid-file (next chunk or next refresh), so a straddling stack trace keeps its header.
+        """
+        previous_seconds = None
+        level, thread = last_level, last_thread
+        ts = last_ts
+
+        if last_ts:
+            last = datetime.fromisoformat(last_ts)
+            previous_seconds = last.hour * 3600 + last.minute * 60 + last.second
+
+        for raw in lines:
+            line = raw.rstrip("\r\n")
+            if not line:
+                continue
+
+            match = LINE_PATTERN.match(line)
+            if match:
+                hours, minutes, seconds, thread, level, message = match.groups()
+                day_seconds = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+                # Horário voltou para trás: o log atravessou a meia-noite
+                if previous_seconds is not None and day_seconds < previous_seconds:
+                    current_day += timedelta(days=1)
+                previous_seconds = day_seconds
+
+                ts = f"{current_day.isoformat()} {hours}:{minutes}:{seconds}"
+                yield (name, ts, level, thread, extract_player(message), message)
+            elif ts:
+                yield (name, ts, level, thread, None, line)
+
+    def count_midnights(self, path: Path) -> int:
+        wraps = 0
+        previous_seconds = None
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                match = LINE_PATTERN.match(line)
+                if not match:
+                    continue
+                hours, minutes, seconds = match.groups()[:3]
+                day_seconds = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+                if previous_seconds is not None and day_seconds < previous_seconds:
+                    wraps += 1
+                previous_seconds = day_seconds
+        return wraps
+
+    def index_rotated(self, conn: sqlite3.Connection, path: Path, day: date):
+        stat = path.stat()
+        row = conn.execute("SELECT size FROM files WHERE name = ?", (path.name,)).fetchone()
+        if row and row[0] == stat.st_size:
+            return
+
+        # Arquivos .gz são imutáveis: são descompactados uma única vez
+        with conn:
+            conn.execute("DELETE FROM entries WHERE file = ?", (path.name,))
+            with gzip.open(path, "rt", encoding="utf-8", errors="replace") as f:
+                conn.executemany(
+                    "INSERT INTO entries (file, ts, level, thread, player, message) VALUES (?, ?, ?, ?, ?, ?)",
+                    self.parse_lines(path.name, f, day)
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO files (name, size, inode, offset, last_ts) VALUES (?, ?, ?, ?, NULL)",
+                (path.name, stat.st_size, stat.st_ino, stat.st_size)
+            )
+
+    def index_latest(self, conn: sqlite3.Connection, path: Path):
+        stat = path.stat()
+        row = conn.execute("SELECT size, inode, offset, last_ts FROM files WHERE name = ?", (path.name,)).fetchone()
+
+        offset, last_ts = 0, None
+        last_level = last_thread = None
+        if row:
+            _, inode, offset, last_ts = row
+            if inode != stat.st_ino or stat.st_size < offset:
+                # latest.log foi rotacionado; o conteúdo antigo agora está em um .gz
+                offset, last_ts = 0, None
+            elif stat.st_size == offset:
+                return
+
+        if offset == 0:
+            modified = datetime.fromtimestamp(stat.st_mtime).date()
+            current_day = modified - timedelta(days=self.count_midnights(path))
+        else:
+            current_day = datetime.fromisoformat(last_ts).date() if last_ts else date.today()
+            previous = conn.execute("SELECT level, thread FROM entries WHERE file = ? ORDER BY id DESC LIMIT 1", (path.name,)).fetchone()
+            if previous:
+                last_level, last_thread = previous
+
+        with conn:
+            if offset == 0:
+                conn.execute("DELETE FROM entries WHERE file = ?", (path.name,))
+
+            with open(path, "rb") as f:
+                f.seek(offset)
+                while True:
+                    data = f.read(4 * 1024 * 1024)
+                    # Só indexa até a última linha completa
+                    end = data.rfind(b"\n") + 1
+                    if end == 0:
+                        break
+
+                    lines = data[:end].decode("utf-8", errors="replace").splitlines()
+                    rows = list(self.parse_lines(path.name, lines, current_day, last_ts, last_level, last_thread))
+                    conn.executemany(
+                        "INSERT INTO entries (file, ts, level, thread, player, message) VALUES (?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+
+                    offset += end
+                    f.seek(offset)
+                    if rows:
+                        _, last_ts, last_level, last_thread = rows[-1][:4]
+                        current_day = datetime.fromisoformat(last_ts).date()
+
+            conn.execute(
+                "INSERT OR REPLACE INTO files (name, size, inode, offset, last_ts) VALUES (?, ?, ?, ?, ?)",
+                (path.name, stat.st_size, stat.st_ino, offset, last_ts)
+            )
+
+    def refresh_sync(self):
+        conn = self.connect()
+        try:
+            if not self.logs_path.exists():
+                return
+
+            for path in sorted(self.logs_path.glob("*.log.gz")):
+                match = ROTATED_PATTERN.match(path.name)
+                day = date.fromisoformat(match.group(1)) if match else datetime.fromtimestamp(path.stat().st_mtime).date()
+                self.index_rotated(conn, path, day)
+
+            latest = self.logs_path / "latest.log"
+            if latest.exists():
+                self.index_latest(conn, latest)
+        finally:
+            conn.close()
+
+    async def refresh(self):
+        async with self.lock:
+            await asyncio.to_thread(self.refresh_sync)
+
+    def search_sync(self, query: str, start: str, end: str, level: str, thread: str, player: str, limit: int, cursor: str) -> dict:
+        conditions = []
+        params = []
+
+        if query:
+            conditions.append("id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)")
+            params.append('"' + query.replace('"', '""') + '"')
+        if start:
+            conditions.append("ts >= ?")
+            params.append(start.replace("T", " "))
+        if end:
+            conditions.append("ts <= ?")
+            params.append(end.replace("T", " "))
+        if level:
+            conditions.append("level = ?")
+            params.append(level.upper())
+        if thread:
+            conditions.append("thread = ?")
+            params.append(thread)
+        if player:
+            conditions.append("player = ?")
+            params.append(player)
+        if cursor:
+            # Paginação por keyset (ts, id), do mais recente para o mais antigo
+            cursor_ts, cursor_id = parse_cursor(cursor)
+            conditions.append("(ts < ? OR (ts = ? AND id < ?))")
+            params.extend([cursor_ts, cursor_ts, cursor_id])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT id, file, ts, level, thread, player, message FROM entries {where} ORDER BY ts DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        conn = self.connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        results = [
+            {"file": file, "timestamp": ts, "level": lvl, "thread": thr, "player": plr, "message": message}
+            for _, file, ts, lvl, thr, plr, message in rows[:limit]
+        ]
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = f"{last[2]}|{last[0]}"
+
+        return {"results": results, "next_cursor": next_cursor}
+
+    async def search(self, query: str = None, start: str = None, end: str = None, level: str = None, thread: str = None, player: str = None, limit: int = 100, cursor: str = None) -> dict:
+        """Raises InvalidCursorError for a malformed cursor."""
+        if cursor:
+            parse_cursor(cursor)
+        await self.refresh()
+        return await asyncio.to_thread(self.search_sync, query, start, end, level, thread, player, limit, cursor)
@@ -1,62 +1,121 @@
+import logging
 import os
+import re
+import json
+import zlib
 import asyncio
 from pathlib import Path
-from services.docker_s.docker_service import DockerService
+from services.docker_s.docker_service import DockerService, get_docker_service
+from services.docker_s.container_status_service import get_container_status
 from services.mods.mods_services import ModsService
+from services.rcon.rcon_service import RconService, RconError, RconConnectError
+from services.mc_server.log_broadcaster import get_log_broadcaster
+from services.mc_server.log_index_service import LogIndexService, InvalidCursorError
+from services.metrics.metrics_service import LOG_STREAM_FRAME_BYTES
+
+logger = logging.getLogger(__name__)
 
 
 class McServerService:
 
-    def __init__(self):
+    def __init__(self, docker_service: DockerService = None, mods_service: ModsService = None):
         self.rcon_password = os.getenv("MINECRAFT_RCON_PASSWORD", "mgmm4103")
-        self.docker_service = DockerService()
-        self.mods_service = ModsService()
+        self.docker_service = docker_service or get_docker_service()
+        self.mods_service = mods_service or ModsService(self.docker_service)
+        self.files_service = self.mods_service.files_service
         self.container_name = "eldoria-server"
+        self.rcon_service = RconService(
+            password=self.rcon_password,
+            port_loader=self.get_rcon_port
+        )
+        self.log_index_service = LogIndexService("/minecraft/logs/")
+        self.status_watcher = get_container_status(self.docker_service, self.container_name)
 
+    async def get_rcon_port(self):
+        config = await self.files_service.get_server_config(typed=True)
+        if not config:
+            return None
+        return config.get("rcon.port")
 
-    async def send_rcon_command(self, command: str) -> str:
+    async def exec_rcon_cli(self, command: str) -> tuple:
         """Envia comando RCON usando rcon-cli via docker exec"""
-        from services.files.files_service import FilesService
-        fs = FilesService()
+        return await self.docker_service.exec_in_container(
+            self.container_name,
+            f'rcon-cli --password "{self.rcon_password}" "{command}"'
+        )
 
+    async def send_rcon_command(self, command: str) -> str:
+        """Envia comando RCON pelo pool de conexões, com fallback para rcon-cli"""
         try:
-            # Usa rcon-cli dentro do container
-            exit_code, output = await self.docker_service.exec_in_container(
-                self.container_name,
-                f'rcon-cli --password "{self.rcon_password}" "{command}"'
-            )
+            try:
+                output = await self.rcon_service.send_command(command)
+                exit_code = 0
+            except RconConnectError as e:
+                # Só repete pelo rcon-cli quando o comando não chegou ao servidor
+                logger.warning(f"Native RCON unavailable, falling back to rcon-cli: {e}")
+                exit_code, output = await self.exec_rcon_cli(command)
+            except RconError as e:
+                # Timeout ou conexão perdida depois da escrita: o comando pode ter rodado, não reexecuta
+                logger.error(f"RCON command may have run but got no response: {e}")
+                return "RCON command sent but no response was received; it was not retried", None
 
             if exit_code == 0:
-                await fs.save_last_command(command)
-                list_of_commands = await fs.get_sent_commands()
-                return output, list_of_commands
+                entry = await self.files_service.save_last_command(command)
+                return output, entry
             else:
-                print(f"RCON command failed: {output}")
-                return "", []
+                logger.warning(f"RCON command failed: {output}")
+                return "", None
 
         except Exception as e:
-            print(f"Failed to send RCON command: {e}")
-            return "", []
+            logger.error(f"Failed to send RCON command: {e}")
+            return "", None
         
+    async def get_online_players(self) -> dict:
+        """Online players from a single RCON "list uuids" (not recorded in the command history)."""
+        try:
+            try:
+                output = await self.rcon_service.send_command("list uuids")
+            except RconConnectError:
+                exit_code, output = await self.exec_rcon_cli("list uuids")
+                if exit_code != 0:
+                    return None
+
+            # "There are 2 of a max of 20 players online: Steve (uuid), Alex (uuid)"
+            match = re.search(r"There are (\d+) of a max of (\d+) players online:?(.*)", output or "", re.S)
+            if not match:
+                return None
+
+            players = []
+            for entry in match.group(3).split(","):
+                player = re.match(r"\s*(\S+)(?:\s+\(([0-9a-f-]{36})\))?", entry)
+                if player and player.group(1):
+                    players.append({"name": player.group(1), "uuid": player.group(2)})
+
+            return {"count": int(match.group(1)), "max": int(match.group(2)), "players": players}
+
+        except Exception as e:
+            logger.error(f"Error listing online players: {e}")
+            return None
+
     async def get_installed_mods(self):
         try:
             return await self.mods_service.get_installed_mods()
         except Exception as e:
-            print(f"Error getting installed mods: {e}")
+            logger.error(f"Error getting installed mods: {e}")
             return []
         
     async def get_ready_to_install_mods(self):
         try:
             return await self.mods_service.get_ready_to_install_mods()
         except Exception as e:
-            print(f"Error getting ready to install mods: {e}")
+            logger.error(f"Error getting ready to install mods: {e}")
             return []
         
-    async def install_ready_mods(self) -> bool:
+    async def install_ready_mods(self, job_id: str = None) -> bool:
         try:
-            return await self.mods_service.install_ready_mods()
+            return await self.mods_service.install_ready_mods(job_id)
         except Exception as e:
-            print(f"Error installing ready mods: {e}")
+            logger.error(f"Error installing ready mods: {e}")
             return False
         
     async def start_server(self) -> bool:
@@ -64,7 +123,7 @@ class McServerService:
             await asyncio.sleep(5)
             return await self.docker_service.start_container("eldoria-server")
         except Exception as e:
-            print(f"Error starting server: {e}")
+            logger.error(f"Error starting server: {e}")
             return False
         
     async def stop_server(self) -> bool:
@@ -79,7 +138,7 @@ class McServerService:
 
             return await self.docker_service.stop_container("eldoria-server")
         except Exception as e:
-            print(f"Error stopping server: {e}")
+            logger.error(f"Error stopping server: {e}")
             return False
         
     async def restart_server(self) -> bool:
@@ -94,21 +153,41 @@ class McServerService:
 
             return await self.docker_service.restart_container("eldoria-server")
         except Exception as e:
-            print(f"Error restarting server: {e}")
+            logger.error(f"Error restarting server: {e}")
             return False
         
-    async def get_server_status(self) -> str:
+    async def get_server_status(self, detailed: bool = False):
+        """Container status from the events-driven cache; reads Docker directly only while the stream is down."""
+        state = self.status_watcher.get_state()
+        if not state["live"]:
+            state = await self.status_watcher.refresh()
+        return state if detailed else state["status"]
+
+    async def stream_status(self, websocket):
+        """Send the current state, then every transition until the client disconnects."""
+        subscription, state = self.status_watcher.subscribe()
+        disconnect = asyncio.create_task(websocket.receive())
         try:
-            container = await self.docker_service.get_container("eldoria-server")
-            if container:
-                return container.status
-            return "not_found"
-        except Exception as e:
-            print(f"Error getting server status: {e}")
-            return "error"
-        
-    async def stream_logs(self, websocket):
-        """Stream server logs via WebSocket"""
+            await websocket.send_json(state)
+            while True:
+                update = asyncio.create_task(subscription.queue.get())
+                done, _ = await asyncio.wait({update, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnect in done:
+                    if disconnect.result()["type"] == "websocket.disconnect":
+                        update.cancel()
+                        return
+                    # Mensagens do cliente são ignoradas
+                    disconnect = asyncio.create_task(websocket.receive())
+                    if update not in done:
+                        update.cancel()
+                        continue
+                await websocket.send_json(update.result())
+        finally:
+            disconnect.cancel()
+            self.status_watcher.unsubscribe(subscription)
+
+    async def stream_logs(self, websocket, batch: bool = False, window_ms: int = 100, max_bytes: int = 65536, compress: bool = False):
+        """Stream server logs via WebSocket, line by line or in coalesced frames"""
         try:
             log_file = Path("/minecraft/logs/latest.log")
             
@@ -124,50 +203,81 @@ class McServerService:
                 await websocket.send_text("Server log file not available.\n")
                 return
             
-            # Lê e envia as últimas 100 linhas primeiro
-            with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
-                lines = f.readlines()
-                for line in lines[-100:]:
+            broadcaster = get_log_broadcaster(str(log_file))
+            subscription, backlog = broadcaster.subscribe()
+
+            try:
+                if batch:
+                    await self.stream_log_batches(websocket, subscription, backlog, window_ms / 1000, max_bytes, compress)
+                    return
+
+                # Envia as últimas linhas do buffer e depois as novas em tempo real
+                frame_bytes = LOG_STREAM_FRAME_BYTES.labels("line")
+                for line in backlog:
                     await websocket.send_text(line)
-            
-            # Continua lendo novas linhas em tempo real
-            with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
-                # Vai para o final do arquivo
-                f.seek(0, 2)
-                
+                    frame_bytes.observe(len(line))
+
                 while True:
-                    line = f.readline()
-                    if line:
-                        await websocket.send_text(line)
-                    else:
-                        # Aguarda por novas linhas
-                        await asyncio.sleep(0.1)
-                    
+                    line = await subscription.queue.get()
+                    await websocket.send_text(line)
+                    frame_bytes.observe(len(line))
+            finally:
+                broadcaster.unsubscribe(subscription)
+
         except Exception as e:
-            print(f"Error streaming logs: {e}")
+            logger.error(f"Error streaming logs: {e}")
             await websocket.close()
 
-    async def get_commands_history(self):
-        from services.files.files_service import FilesService
-        fs = FilesService()
+    async def stream_log_batches(self, websocket, subscription, backlog: list, window: float, max_bytes: int, compress: bool):
+        """Send {"lines": [...], "dropped": n} frames, optionally deflate-compressed as binary frames"""
+
+        frame_bytes = LOG_STREAM_FRAME_BYTES.labels("compressed" if compress else "batch")
+
+        async def send_frame(lines: list):
+            frame = json.dumps({"lines": lines, "dropped": subscription.take_dropped()})
+            if compress:
+                compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+                payload = compressor.compress(frame.encode("utf-8")) + compressor.flush()
+                await websocket.send_bytes(payload)
+                frame_bytes.observe(len(payload))
+            else:
+                await websocket.send_text(frame)
+                frame_bytes.observe(len(frame))
+
+        if backlog:
+            await send_frame(backlog)
+
+        while True:
+            lines = await subscription.next_batch(window, max_bytes)
+            await send_frame(lines)
+
+    async def search_logs(self, query: str = None, start: str = None, end: str = None, level: str = None, thread: str = None, player: str = None, limit: int = 100, cursor: str = None) -> dict:
         try:
-            return await fs.get_sent_commands()
+            return await self.log_index_service.search(query, start, end, level, thread, player, limit, cursor)
+        except InvalidCursorError:
+            # Cursor malformado é erro do cliente: o controller responde 400
+            raise
         except Exception as e:
-            print(f"Error getting commands history: {e}")
-            return []
+            logger.error(f"Error searching logs: {e}")
+            return {"results": [], "next_cursor": None}
+
+    async def get_commands_history(self, limit: int = 50, cursor: int = None, query: str = None, start: int = None, end: int = None) -> dict:
+        try:
+            return await self.files_service.get_sent_commands(limit, cursor, query, start, end)
+        except Exception as e:
+            logger.error(f"Error getting commands history: {e}")
+            return {"results": [], "next_cursor": None}
         
     async def remove_mod(self, mod_id: str) -> bool:
-        from services.files.files_service import FilesService
         try:
-            return await FilesService().remove_installed_mod(id=mod_id)
+            return await self.files_service.remove_installed_mod(id=mod_id)
         except Exception as e:
-            print(f"Error removing mod {mod_id}: {e}")
+            logger.error(f"Error removing mod {mod_id}: {e}")
             return False
         
     async def remove_ready_mod(self, mod_id: str) -> bool:
-        from services.files.files_service import FilesService
         try:
-            return await FilesService().remove_ready_to_install_mod(id=mod_id)
+            return await self.files_service.remove_ready_to_install_mod(id=mod_id)
         except Exception as e:
-            print(f"Error removing ready mod {mod_id}: {e}")
+            logger.error(f"Error removing ready mod {mod_id}: {e}")
             return False
\ No newline at end of file
@@ -0,0 +1,226 @@
+import time
+import bisect
+import threading
+
+# Segundos: de chamadas locais (ms) a downloads e rebuilds longos
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Timer:
+
+    def __init__(self, child):
+        self.child = child
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.started)
+        return False
+
+
+class CounterChild:
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self.lock:
+            self.value += amount
+
+
+class GaugeChild(CounterChild):
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        with self.lock:
+            self.value = value
+
+
+class HistogramChild:
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self) -> Timer:
+        return Timer(self)
+
+
+class Metric:
+    """Prometheus-style metric family; labels(*values) returns the per-series child."""
+
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        self.lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        values = tuple(str(value) for value in values)
+        child = self.children.get(values)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(values, self.new_child())
+        return child
+
+    def samples(self) -> list:
+        return [(self.name, values, child.value) for values, child in list(self.children.items())]
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, values, value in self.samples():
+            lines.append(f"{name}{format_labels(self.labelnames, values)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def new_child(self):
+        return CounterChild()
+
+    def samples(self) -> list:
+        return [(f"{self.name}_total", values, child.value) for values, child in list(self.children.items())]
+
+    def render(self) -> list:
+        lines = super().render()
+        lines[0] = f"# HELP {self.name}_total {self.documentation}"
+        lines[1] = f"# TYPE {self.name}_total counter"
+        return lines
+
+
+class Gauge(Metric):
+    """Gauge set directly, or computed at scrape time by set_function (e.g. subscriber counts)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.functions = {}
+
+    def new_child(self):
+        return GaugeChild()
+
+    def set_function(self, function, *values):
+        self.functions[tuple(str(value) for value in values)] = function
+
+    def samples(self) -> list:
+        samples = super().samples()
+        for values, function in list(self.functions.items()):
+            try:
+                samples.append((self.name, values, function()))
+            except Exception:
+                continue
+        return samples
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def new_child(self):
+        return HistogramChild(self.buckets)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for values, child in list(self.children.items()):
+            with child.lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, values)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, values)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric: Metric):
+        self.metrics.append(metric)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUESTS = Counter("http_requests", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+
+MODRINTH_REQUEST_DURATION = Histogram("modrinth_request_duration_seconds", "Modrinth API round trips by lane and status", ("lane", "status"))
+MODRINTH_QUEUE_WAIT = Histogram("modrinth_queue_wait_seconds", "Time spent waiting for a rate-limit token", ("lane",))
+
+MOD_DOWNLOAD_DURATION = Histogram("mod_download_duration_seconds", "Mod jar downloads by result", ("result",))
+MOD_DOWNLOAD_BYTES = Counter("mod_download_bytes", "Bytes downloaded from the Modrinth CDN")
+
+RCON_COMMAND_DURATION = Histogram("rcon_command_duration_seconds", "Native RCON round trips by result", ("result",))
+DOCKER_EXEC_DURATION = Histogram("docker_exec_duration_seconds", "docker exec calls by result", ("result",))
+DOCKER_OPERATION_DURATION = Histogram("docker_operation_duration_seconds", "Container start/stop/restart calls", ("action", "result"))
+
+STATE_STORE_TRANSACTION_DURATION = Histogram("state_store_transaction_duration_seconds", "SQLite state transactions by operation", ("operation",))
+FILES_IO_DURATION = Histogram("files_io_duration_seconds", "Server files reads and writes by operation", ("operation",))
+
+LOG_STREAM_FRAME_BYTES = Histogram(
+    "log_stream_frame_bytes", "Size of log frames sent over the logs WebSocket", ("mode",),
+    buckets=(128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+)
+WEBSOCKET_SUBSCRIBERS = Gauge("websocket_subscribers", "Connected WebSocket subscribers by stream", ("stream",))
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,47 @@
+import time
+import logging
+from services.metrics.metrics_service import HTTP_REQUESTS, HTTP_REQUEST_DURATION
+from services.metrics.structured_logging import request_id_var, new_request_id
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """Plain ASGI middleware: request id, latency histogram and status counter per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        request_id = new_request_id(incoming)
+        token = request_id_var.set(request_id)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            # Template da rota (/mods/{id}), nunca o caminho cru: cardinalidade limitada
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(scope["method"], path).observe(elapsed)
+            HTTP_REQUESTS.labels(scope["method"], path, status).inc()
+            if status >= 500:
+                logger.warning("Request failed", extra={"method": scope["method"], "path": path, "status": status, "duration_ms": round(elapsed * 1000, 1)})
+            request_id_var.reset(token)
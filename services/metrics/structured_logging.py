@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import contextvars
+
+# Id da requisição atual; asyncio.to_thread copia o contexto, então vale também nas threads
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+
+def new_request_id(incoming: str = None) -> str:
+    # Reaproveita o X-Request-ID do proxy/frontend quando é razoável
+    if incoming and len(incoming) <= 64 and incoming.isprintable():
+        return incoming
+    return uuid.uuid4().hex[:16]
+
+
+class RequestIdFilter(logging.Filter):
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, request_id and any extra= fields."""
+
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "request_id", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in self.RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging():
+    """Root logger to stdout: JSON lines by default, LOG_FORMAT=text for local development."""
+    root = logging.getLogger()
+    if any(getattr(handler, "structured", False) for handler in root.handlers):
+        return
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.structured = True
+    handler.addFilter(RequestIdFilter())
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    else:
+        handler.setFormatter(JsonFormatter())
+
+    root.addHandler(handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    # Uma linha por chamada ao Modrinth/CDN seria ruído; a latência já está nas métricas
+    logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -0,0 +1,307 @@
+import logging
+import os
+import re
+import json
+import time
+import asyncio
+import sqlite3
+from services.modrinth.request_scheduler import modrinth_scheduler, PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_id TEXT PRIMARY KEY,
+    slug TEXT,
+    title TEXT,
+    author TEXT,
+    description TEXT,
+    icon_url TEXT,
+    server_side TEXT,
+    client_side TEXT,
+    categories TEXT,
+    game_versions TEXT,
+    latest_version TEXT,
+    downloads INTEGER,
+    follows INTEGER,
+    date_created TEXT,
+    date_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS projects_downloads ON projects (downloads);
+CREATE INDEX IF NOT EXISTS projects_follows ON projects (follows);
+CREATE INDEX IF NOT EXISTS projects_date_created ON projects (date_created);
+CREATE INDEX IF NOT EXISTS projects_date_modified ON projects (date_modified);
+CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5 (
+    title, description, author, categories,
+    content='projects', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS projects_ai AFTER INSERT ON projects BEGIN
+    INSERT INTO projects_fts (rowid, title, description, author, categories)
+    VALUES (new.rowid, new.title, new.description, new.author, new.categories);
+END;
+CREATE TRIGGER IF NOT EXISTS projects_ad AFTER DELETE ON projects BEGIN
+    INSERT INTO projects_fts (projects_fts, rowid, title, description, author, categories)
+    VALUES ('delete', old.rowid, old.title, old.description, old.author, old.categories);
+END;
+CREATE TRIGGER IF NOT EXISTS projects_au AFTER UPDATE ON projects BEGIN
+    INSERT INTO projects_fts (projects_fts, rowid, title, description, author, categories)
+    VALUES ('delete', old.rowid, old.title, old.description, old.author, old.categories);
+    INSERT INTO projects_fts (rowid, title, description, author, categories)
+    VALUES (new.rowid, new.title, new.description, new.author, new.categories);
+END;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+def default_facets(mc_version: str) -> str:
+    return f'[["categories:fabric"],["versions:{mc_version}"],["project_type:mod"],["server_side:optional","server_side:required"]]'
+
+
+ORDER_BY = {
+    "downloads": "p.downloads DESC",
+    "follows": "p.follows DESC",
+    "newest": "p.date_created DESC",
+    "updated": "p.date_modified DESC",
+}
+
+
+class CatalogService:
+    """Local SQLite/FTS mirror of the Modrinth catalog for one loader and game version."""
+
+    def __init__(self, base_url: str, db_path: str = None, mc_version: str = None, authorization: str = None):
+        self.base_url = base_url
+        self.Authorization = authorization
+        self.db_path = db_path or os.getenv("MODRINTH_CATALOG_PATH", "config/modrinth_catalog.sqlite3")
+        self.mc_version = mc_version or os.getenv("MODRINTH_CATALOG_MC_VERSION", "1.21.1")
+        self.enabled = os.getenv("MODRINTH_CATALOG_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.sync_interval = float(os.getenv("MODRINTH_CATALOG_SYNC_INTERVAL", "3600"))
+        # Sincronização completa periódica: a incremental não enxerga projetos removidos
+        self.full_sync_interval = float(os.getenv("MODRINTH_CATALOG_FULL_SYNC_INTERVAL", "86400"))
+        self.page_size = 100
+        self.sync_lock = asyncio.Lock()
+        self.sync_task = None
+        self.project_count = None
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def get_meta(self, conn: sqlite3.Connection, key: str):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def upsert_hits(self, hits: list):
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO projects (project_id, slug, title, author, description, icon_url, server_side, client_side,
+                                          categories, game_versions, latest_version, downloads, follows, date_created, date_modified)
+                    VALUES (:project_id, :slug, :title, :author, :description, :icon_url, :server_side, :client_side,
+                            :categories, :game_versions, :latest_version, :downloads, :follows, :date_created, :date_modified)
+                    ON CONFLICT (project_id) DO UPDATE SET
+                        slug = excluded.slug, title = excluded.title, author = excluded.author,
+                        description = excluded.description, icon_url = excluded.icon_url,
+                        server_side = excluded.server_side, client_side = excluded.client_side,
+                        categories = excluded.categories, game_versions = excluded.game_versions,
+                        latest_version = excluded.latest_version, downloads = excluded.downloads,
+                        follows = excluded.follows, date_created = excluded.date_created,
+                        date_modified = excluded.date_modified
+                """, [
+                    {
+                        "project_id": hit.get("project_id"),
+                        "slug": hit.get("slug"),
+                        "title": hit.get("title"),
+                        "author": hit.get("author"),
+                        "description": hit.get("description"),
+                        "icon_url": hit.get("icon_url"),
+                        "server_side": hit.get("server_side"),
+                        "client_side": hit.get("client_side"),
+                        "categories": " ".join(hit.get("categories", [])),
+                        "game_versions": json.dumps(hit.get("versions", [])),
+                        "latest_version": hit.get("latest_version"),
+                        "downloads": hit.get("downloads", 0),
+                        "follows": hit.get("follows", 0),
+                        "date_created": hit.get("date_created"),
+                        "date_modified": hit.get("date_modified")
+                    }
+                    for hit in hits
+                ])
+        finally:
+            conn.close()
+
+    def delete_unseen(self, seen: set) -> int:
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen (project_id TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM seen")
+                conn.executemany("INSERT OR IGNORE INTO seen (project_id) VALUES (?)", [(project_id,) for project_id in seen])
+                return conn.execute("DELETE FROM projects WHERE project_id NOT IN (SELECT project_id FROM seen)").rowcount
+        finally:
+            conn.close()
+
+    def read_watermark(self) -> tuple:
+        conn = self.connect()
+        try:
+            return self.get_meta(conn, "watermark"), self.get_meta(conn, "full_synced_at")
+        finally:
+            conn.close()
+
+    def set_watermark(self, watermark: str, full_synced_at: float = None):
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('watermark', ?)", (watermark,))
+                if full_synced_at is not None:
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('full_synced_at', ?)", (str(full_synced_at),))
+            self.project_count = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+        finally:
+            conn.close()
+
+    def read_status(self) -> dict:
+        conn = self.connect()
+        try:
+            self.project_count = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+            return {
+                "enabled": self.enabled,
+                "mc_version": self.mc_version,
+                "projects": self.project_count,
+                "watermark": self.get_meta(conn, "watermark"),
+                "full_synced_at": self.get_meta(conn, "full_synced_at")
+            }
+        finally:
+            conn.close()
+
+    def headers(self) -> dict:
+        return {"Authorization": self.Authorization} if self.Authorization else {}
+
+    async def sync(self, full: bool = None) -> dict:
+        """Pull projects ordered by date_modified until reaching the last synced watermark.
+
+        A full sync (first run, full=True, or every full_sync_interval) walks the whole
+        listing and deletes local projects that Modrinth no longer returns.
+        """
+        async with self.sync_lock:
+            watermark, full_synced_at = await asyncio.to_thread(self.read_watermark)
+            if full is None:
+                full = not watermark or not full_synced_at or time.time() - float(full_synced_at) >= self.full_sync_interval
+            if full:
+                watermark = None
+
+            newest = watermark
+            offset = 0
+            synced = 0
+            seen = set()
+            total_hits = None
+
+            while True:
+                response = await modrinth_scheduler.get(f"{self.base_url}/search", PRIORITY_BACKGROUND, headers=self.headers(), params={
+                    "index": "updated",
+                    "limit": self.page_size,
+                    "offset": offset,
+                    "facets": default_facets(self.mc_version)
+                })
+                response.raise_for_status()
+                data = response.json()
+                hits = data.get("hits", [])
+                total_hits = data.get("total_hits", total_hits)
+                seen.update(hit.get("project_id") for hit in hits)
+                if not hits:
+                    break
+
+                # Ordenado por date_modified decrescente: o que já foi visto encerra a sincronização
+                fresh = [hit for hit in hits if not watermark or (hit.get("date_modified") or "") > watermark]
+                if fresh:
+                    await asyncio.to_thread(self.upsert_hits, fresh)
+                    synced += len(fresh)
+                    newest = max(newest or "", max(hit.get("date_modified") or "" for hit in fresh))
+
+                if len(fresh) < len(hits) or len(hits) < self.page_size:
+                    break
+                offset += self.page_size
+
+            removed = 0
+            completed_at = None
+            if full:
+                # Só apaga se a listagem foi percorrida inteira; um corte no meio apagaria projetos válidos
+                if total_hits is not None and len(seen) >= total_hits:
+                    removed = await asyncio.to_thread(self.delete_unseen, seen)
+                    completed_at = time.time()
+                else:
+                    logger.warning(f"Modrinth catalog full sync saw {len(seen)} of {total_hits} projects, keeping unseen rows")
+
+            if newest:
+                await asyncio.to_thread(self.set_watermark, newest, completed_at)
+
+            logger.info(f"Modrinth catalog sync finished: {synced} projects updated, {removed} removed")
+            return {"synced": synced, "removed": removed, "full": full, "watermark": newest}
+
+    async def periodic_sync(self):
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error syncing Modrinth catalog: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self):
+        if self.enabled and (self.sync_task is None or self.sync_task.done()):
+            self.sync_task = asyncio.create_task(self.periodic_sync())
+
+    async def stop(self):
+        if self.sync_task:
+            self.sync_task.cancel()
+            try:
+                await self.sync_task
+            except asyncio.CancelledError:
+                pass
+            self.sync_task = None
+
+    async def can_answer(self, mc_version: str) -> bool:
+        if not self.enabled or mc_version != self.mc_version:
+            return False
+        if self.project_count is None:
+            await self.status()
+        return self.project_count > 0
+
+    def search_sync(self, query: str, index: str, limit: int, offset: int) -> dict:
+        tokens = re.findall(r"\w+", query or "")
+        conn = self.connect()
+        try:
+            if tokens:
+                match = " ".join(f'"{token}"*' for token in tokens)
+                order = "bm25(projects_fts)" if index == "relevance" else ORDER_BY.get(index, "bm25(projects_fts)")
+                base = "FROM projects_fts JOIN projects p ON p.rowid = projects_fts.rowid WHERE projects_fts MATCH ?"
+                params = [match]
+            else:
+                order = ORDER_BY.get(index, "p.downloads DESC")
+                base = "FROM projects p"
+                params = []
+
+            total = conn.execute(f"SELECT COUNT(*) {base}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT p.project_id, p.author, p.description, p.icon_url, p.title, p.server_side {base} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        finally:
+            conn.close()
+
+        return {
+            "total_hits": total,
+            "limit": limit,
+            "offset": offset,
+            "results": [
+                {"project_id": project_id, "author": author, "description": description, "icon_url": icon_url, "title": title, "server_side": server_side}
+                for project_id, author, description, icon_url, title, server_side in rows
+            ]
+        }
+
+    async def search(self, query: str = None, index: str = "relevance", limit: int = 24, offset: int = 0) -> dict:
+        return await asyncio.to_thread(self.search_sync, query, index, limit, offset)
+
+    async def status(self) -> dict:
+        return await asyncio.to_thread(self.read_status)
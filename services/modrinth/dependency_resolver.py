@@ -0,0 +1,189 @@
+import os
+import json
+import asyncio
+from services.modrinth.request_scheduler import modrinth_scheduler, PRIORITY_BACKGROUND
+
+BULK_CHUNK = 100
+# Dependência obrigatória que não pode ser instalada: o conjunto não funcionaria
+BLOCKING_CONFLICTS = ("missing", "unsupported")
+
+
+class DependencyResolver:
+    """Breadth-first Modrinth dependency resolution with bulk lookups and memoization."""
+
+    def __init__(self, base_url: str, headers: dict = None, loader: str = "fabric", mc_version: str = "1.21.1", concurrency: int = None):
+        self.base_url = base_url
+        self.headers = headers or {}
+        self.loader = loader
+        self.mc_version = mc_version
+        self.concurrency = concurrency or int(os.getenv("MODRINTH_RESOLVER_CONCURRENCY", "8"))
+        self.versions = {}
+        self.projects = {}
+
+    async def get_json(self, url: str, params: dict = None):
+        # Resolução de dependências roda na faixa de baixa prioridade do scheduler
+        response = await modrinth_scheduler.get(url, PRIORITY_BACKGROUND, headers=self.headers, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def load_versions(self, version_ids: list):
+        missing = [version_id for version_id in dict.fromkeys(version_ids) if version_id not in self.versions]
+        for start in range(0, len(missing), BULK_CHUNK):
+            chunk = missing[start:start + BULK_CHUNK]
+            for version in await self.get_json(f"{self.base_url}/versions", {"ids": json.dumps(chunk)}):
+                self.versions[version["id"]] = version
+
+    async def load_projects(self, project_ids: list):
+        missing = [project_id for project_id in dict.fromkeys(project_ids) if project_id not in self.projects]
+        for start in range(0, len(missing), BULK_CHUNK):
+            chunk = missing[start:start + BULK_CHUNK]
+            for project in await self.get_json(f"{self.base_url}/projects", {"ids": json.dumps(chunk)}):
+                self.projects[project["id"]] = project
+
+    async def latest_compatible_version(self, semaphore: asyncio.Semaphore, project_id: str):
+        # Não existe endpoint em lote filtrado por loader/versão do jogo; limitado pelo semáforo
+        async with semaphore:
+            versions = await self.get_json(f"{self.base_url}/project/{project_id}/version", {
+                "loaders": json.dumps([self.loader]),
+                "game_versions": json.dumps([self.mc_version])
+            })
+
+        if not versions:
+            return None
+
+        self.versions.setdefault(versions[0]["id"], versions[0])
+        return versions[0]["id"]
+
+    def compatible(self, version: dict) -> bool:
+        # Versões fixadas pela dependência não passam pelo filtro da busca por versão
+        return self.loader in version.get("loaders", []) and self.mc_version in version.get("game_versions", [])
+
+    def mod_data(self, project_id: str, version: dict, dependency_of: list) -> dict:
+        project = self.projects.get(project_id, {})
+        files = version.get("files", [])
+        primary = next((file for file in files if file.get("primary")), files[0] if files else {})
+
+        return {
+            "id": version.get("id"),
+            "title": project.get("title"),
+            "description": project.get("description"),
+            "icon_url": project.get("icon_url"),
+            "download_url": primary.get("url"),
+            "project_id": project_id,
+            "file_name": primary.get("filename"),
+            "hashes": primary.get("hashes", {}),
+            "dependency_of": dependency_of
+        }
+
+    async def resolve(self, root_version_id: str, existing: dict = None) -> dict:
+        """Resolve required dependencies of a version.
+
+        existing maps project_id -> version_id of mods already installed or ready;
+        those are not descended into and are reported under "existing".
+        Pinned versions that do not support the loader/game version are
+        reported as "unsupported" conflicts instead of being installed.
+        """
+        existing = existing or {}
+        result = {"projects_ids": [], "mods": [], "existing": {}, "conflicts": [], "cycles": []}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        await self.load_versions([root_version_id])
+        root_project_id = self.versions[root_version_id]["project_id"]
+
+        chosen = {root_project_id: root_version_id}
+        pinned_by = {}
+        mods = {}
+        ancestors = {root_version_id: {root_project_id}}
+        frontier = [root_version_id]
+
+        while frontier:
+            requests = {}
+
+            # Dependências sem project_id precisam do projeto da versão fixada
+            await self.load_versions([
+                dependency["version_id"]
+                for version_id in frontier
+                for dependency in self.versions[version_id].get("dependencies", [])
+                if not dependency.get("project_id") and dependency.get("version_id")
+            ])
+
+            for version_id in frontier:
+                version = self.versions[version_id]
+                for dependency in version.get("dependencies", []):
+                    project_id = dependency.get("project_id")
+                    pinned = dependency.get("version_id")
+                    if not project_id and pinned in self.versions:
+                        project_id = self.versions[pinned]["project_id"]
+                    if not project_id:
+                        continue
+
+                    if dependency.get("dependency_type") == "incompatible":
+                        if project_id in chosen or project_id in existing:
+                            result["conflicts"].append({"type": "incompatible", "project_id": project_id, "version_id": version_id})
+                        continue
+
+                    if dependency.get("dependency_type") != "required":
+                        continue
+
+                    if project_id in ancestors[version_id]:
+                        result["cycles"].append({"from": version_id, "to_project": project_id})
+
+                    if pinned:
+                        current = pinned_by.get(project_id) or existing.get(project_id)
+                        if current and current != pinned:
+                            result["conflicts"].append({"type": "version", "project_id": project_id, "versions": [current, pinned], "version_id": version_id})
+                        pinned_by.setdefault(project_id, pinned)
+
+                    if project_id in existing:
+                        dependents = result["existing"].setdefault(project_id, [])
+                        if version_id not in dependents:
+                            dependents.append(version_id)
+                        continue
+
+                    if project_id in mods:
+                        if version_id not in mods[project_id]["dependency_of"]:
+                            mods[project_id]["dependency_of"].append(version_id)
+                        continue
+
+                    if project_id in chosen:
+                        continue
+
+                    request = requests.setdefault(project_id, {"pinned": pinned, "dependents": [], "ancestors": ancestors[version_id]})
+                    # Outro dependente fixou a versão: usa a fixada em vez de buscar a mais recente
+                    if pinned and not request["pinned"]:
+                        request["pinned"] = pinned
+                    if version_id not in request["dependents"]:
+                        request["dependents"].append(version_id)
+
+            if not requests:
+                break
+
+            project_ids = list(requests)
+            unpinned = [project_id for project_id in project_ids if not requests[project_id]["pinned"]]
+            latest = await asyncio.gather(
+                self.load_projects(project_ids),
+                self.load_versions([requests[project_id]["pinned"] for project_id in project_ids if requests[project_id]["pinned"]]),
+                *(self.latest_compatible_version(semaphore, project_id) for project_id in unpinned)
+            )
+            resolved = dict(zip(unpinned, latest[2:]))
+
+            frontier = []
+            for project_id in project_ids:
+                request = requests[project_id]
+                version_id = request["pinned"] or resolved.get(project_id)
+                if not version_id or version_id not in self.versions:
+                    result["conflicts"].append({"type": "missing", "project_id": project_id, "dependency_of": request["dependents"]})
+                    continue
+
+                if request["pinned"] and not self.compatible(self.versions[version_id]):
+                    result["conflicts"].append({"type": "unsupported", "project_id": project_id, "version_id": version_id, "dependency_of": request["dependents"]})
+                    continue
+
+                chosen[project_id] = version_id
+                mods[project_id] = self.mod_data(project_id, self.versions[version_id], request["dependents"])
+                result["projects_ids"].append(project_id)
+                ancestors[version_id] = request["ancestors"] | {project_id}
+                frontier.append(version_id)
+
+        result["mods"] = list(mods.values())
+        return result
@@ -1,36 +1,87 @@
-import httpx
+import logging
+import json
+import asyncio
 import services.files.files_service as files_service
+from services.modrinth.dependency_resolver import DependencyResolver, BULK_CHUNK
+from services.modrinth.response_cache import ResponseCache
+from services.modrinth.catalog_service import CatalogService, default_facets
+from services.modrinth.request_scheduler import modrinth_scheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
 
 class ModrinthService:
 
-    def __init__(self):
+    def __init__(self, files_service=None):
         self.base_url = "https://api.modrinth.com/v2"
+        self.files_service = files_service
         self.Authorization = None
+        self.cache = ResponseCache()
+        self.catalog = CatalogService(self.base_url)
+
 
+    def get_files_service(self):
+        if self.files_service is None:
+            self.files_service = files_service.FilesService(modrinth_service=self)
+        return self.files_service
 
     def set_authorization(self, token: str):
         self.Authorization = token
+        self.catalog.Authorization = token
 
-    async def search_default_mods_fabric(self, query: str = None, index: str = "relevance", limit: int = 24, offset: int = 0, mc_version: str = "1.21.1"):
-        """Search for Fabric mods compatible with Minecraft 1.21.1, including only server-side optional or required mods."""
+    async def cached_get(self, key: tuple, url: str, params: dict = None, priority: int = PRIORITY_INTERACTIVE):
+        """GET through the response cache, revalidating with ETag / Last-Modified."""
         headers = {}
         if self.Authorization:
             headers["Authorization"] = self.Authorization
 
+        async def fetch(etag, last_modified):
+            request_headers = dict(headers)
+            if etag:
+                request_headers["If-None-Match"] = etag
+            if last_modified:
+                request_headers["If-Modified-Since"] = last_modified
+
+            response = await modrinth_scheduler.get(url, priority, headers=request_headers, params=params)
+            if response.status_code == 304:
+                return 304, None, etag, last_modified
+
+            response.raise_for_status()
+            return response.status_code, response.json(), response.headers.get("etag"), response.headers.get("last-modified")
+
+        return await self.cache.get(key, fetch)
+
+    def get_cache_stats(self) -> dict:
+        return self.cache.stats()
+
+    def get_scheduler_stats(self) -> dict:
+        return modrinth_scheduler.stats()
+
+    async def sync_catalog(self, full: bool = None) -> dict:
+        return await self.catalog.sync(full)
+
+    async def get_catalog_status(self) -> dict:
+        return await self.catalog.status()
+
+    async def search_default_mods_fabric(self, query: str = None, index: str = "relevance", limit: int = 24, offset: int = 0, mc_version: str = "1.21.1"):
+        """Search for Fabric mods compatible with Minecraft 1.21.1, including only server-side optional or required mods."""
         url = f"{self.base_url}/search"
+        query = query.strip().lower() if query else None
+        facets = default_facets(mc_version)
+
+        # Com o catálogo local sincronizado a busca não depende do Modrinth
+        if await self.catalog.can_answer(mc_version):
+            return await self.catalog.search(query, index, limit, offset)
 
         params = {
-            "query": query,
             "index": index,
             "limit": limit,
             "offset": offset,
-            "facets": f'[["categories:fabric"],["versions:{mc_version}"],["project_type:mod"],["server_side:optional","server_side:required"]]'
+            "facets": facets
         }
+        if query:
+            params["query"] = query
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            response_formatted = response.json()
+        response_formatted = await self.cached_get(("search", query, index, limit, offset, mc_version, facets), url, params)
 
         mods = []
         for item in response_formatted.get("hits", []):
@@ -55,27 +106,19 @@ class ModrinthService:
         return result
     
     async def search_mod_version_game(self, project_id: str, mc_version: str = "1.21.1"):
-        headers = {}
-        if self.Authorization:
-            headers["Authorization"] = self.Authorization
-
-        async with httpx.AsyncClient() as client:
-            project_url = f"{self.base_url}/project/{project_id}"
-            project_response = await client.get(project_url, headers=headers)
-            project_response.raise_for_status()
-            project_data = project_response.json()
-
-            files_url = f"{self.base_url}/project/{project_id}/version"
-            params = {
-                "loaders": '["fabric"]',
-                "game_versions": f'["{mc_version}"]'
-            }
+        project_url = f"{self.base_url}/project/{project_id}"
+        files_url = f"{self.base_url}/project/{project_id}/version"
+        params = {
+            "loaders": '["fabric"]',
+            "game_versions": f'["{mc_version}"]'
+        }
 
-            files_response = await client.get(files_url, headers=headers, params=params)
-            files_response.raise_for_status()
-            files = files_response.json()
+        project_data, files = await asyncio.gather(
+            self.cached_get(("project", project_id), project_url),
+            self.cached_get(("project_versions", project_id, mc_version), files_url, params)
+        )
         
-        id_file_version, installed, ready = await files_service.FilesService().get_files_by_project_id(project_id=project_id)
+        id_file_version, installed, ready = await self.get_files_service().get_files_by_project_id(project_id=project_id)
     
         result = {
             "project_id": project_data.get("id"),
@@ -99,46 +142,72 @@ class ModrinthService:
 
         return result
     
-    async def recursive_dependencies(self, version_id: str, collected=None):
-        if collected is None:
-            collected = { "projects_ids" : [], "mods": [] }
+    async def get_versions_by_hashes(self, hashes: list, algorithm: str = "sha512") -> dict:
+        """Identify files through POST /version_files; returns {hash: version} for the known ones."""
+        headers = {}
+        if self.Authorization:
+            headers["Authorization"] = self.Authorization
 
-        async with httpx.AsyncClient() as client:
-            version_url = f"{self.base_url}/version/{version_id}"
-            response = await client.get(version_url)
+        versions = {}
+        for start in range(0, len(hashes), BULK_CHUNK):
+            response = await modrinth_scheduler.request("POST", f"{self.base_url}/version_files", PRIORITY_BACKGROUND, headers=headers, json={
+                "hashes": hashes[start:start + BULK_CHUNK],
+                "algorithm": algorithm
+            })
             response.raise_for_status()
-            file = response.json()
-
-        dependencies = file.get("dependencies", [])
-        for dependency in dependencies:
-
-            if dependency.get("dependency_type") == "required":
-                dependency_project_id = dependency.get("project_id")
-                
-                if dependency_project_id:
-                    existing_mod = next((mod for mod in collected["mods"] if mod["project_id"] == dependency_project_id), None)
-                    
-                    if existing_mod:
-                        if version_id not in existing_mod["dependency_of"]:
-                            existing_mod["dependency_of"].append(version_id)
-                    else:
-                        collected["projects_ids"].append(dependency_project_id)
-                        
-                        project = await self.search_mod_version_game(project_id=dependency_project_id)
-                        mod_data = {
-                            "id": project.get("file_versions")[0].get("id"),
-                            "title": project.get("title"),
-                            "description": project.get("description"),
-                            "icon_url": project.get("icon_url"),
-                            "download_url": project.get("file_versions")[0]["files"][0].get("url"),
-                            "project_id": dependency_project_id,
-                            "file_name": project.get("file_versions")[0]["files"][0].get("filename"),
-                            "dependency_of": [version_id]
-                        }
-
-                        collected["mods"].append(mod_data)
-                        await self.recursive_dependencies(version_id=project.get("file_versions")[0].get("id"), collected=collected)
-        
-        return collected
+            versions.update(response.json())
 
-        
+        return versions
+
+    async def get_latest_versions_by_hashes(self, hashes: list, mc_version: str = "1.21.1", loader: str = "fabric") -> dict:
+        """Latest compatible version for each file hash through POST /version_files/update, cached."""
+        headers = {}
+        if self.Authorization:
+            headers["Authorization"] = self.Authorization
+
+        hashes = sorted(set(hashes))
+
+        async def fetch(etag, last_modified):
+            versions = {}
+            for start in range(0, len(hashes), BULK_CHUNK):
+                response = await modrinth_scheduler.request("POST", f"{self.base_url}/version_files/update", PRIORITY_INTERACTIVE, headers=headers, json={
+                    "hashes": hashes[start:start + BULK_CHUNK],
+                    "algorithm": "sha512",
+                    "loaders": [loader],
+                    "game_versions": [mc_version]
+                })
+                response.raise_for_status()
+                versions.update(response.json())
+            return 200, versions, None, None
+
+        return await self.cache.get(("updates", tuple(hashes), mc_version, loader), fetch)
+
+    async def get_projects(self, project_ids: list) -> dict:
+        headers = {}
+        if self.Authorization:
+            headers["Authorization"] = self.Authorization
+
+        projects = {}
+        for start in range(0, len(project_ids), BULK_CHUNK):
+            response = await modrinth_scheduler.get(f"{self.base_url}/projects", PRIORITY_BACKGROUND, headers=headers, params={
+                "ids": json.dumps(project_ids[start:start + BULK_CHUNK])
+            })
+            response.raise_for_status()
+            projects.update({project["id"]: project for project in response.json()})
+
+        return projects
+
+    async def recursive_dependencies(self, version_id: str, existing: dict = None, mc_version: str = "1.21.1"):
+        headers = {}
+        if self.Authorization:
+            headers["Authorization"] = self.Authorization
+
+        resolver = DependencyResolver(self.base_url, headers=headers, mc_version=mc_version)
+        collected = await resolver.resolve(version_id, existing=existing)
+
+        for conflict in collected["conflicts"]:
+            logger.warning(f"Dependency conflict while resolving {version_id}: {conflict}")
+        for cycle in collected["cycles"]:
+            logger.warning(f"Dependency cycle while resolving {version_id}: {cycle}")
+
+        return collected
@@ -0,0 +1,171 @@
+import os
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import httpx
+from services.http_s.http_service import http_service
+from services.metrics.metrics_service import MODRINTH_REQUEST_DURATION, MODRINTH_QUEUE_WAIT
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+LANES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+
+class RequestScheduler:
+    """Token bucket shared by every Modrinth call, driven by the X-Ratelimit-* headers."""
+
+    def __init__(self, rate_limit: int = None, retries: int = 4):
+        self.limit = rate_limit or int(os.getenv("MODRINTH_RATE_LIMIT", "300"))
+        self.tokens = float(self.limit)
+        self.refill_rate = self.limit / 60
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.retries = retries
+
+        self.waiters = []
+        self.sequence = itertools.count()
+        self.dispatcher = None
+        self.wakeup = asyncio.Event()
+
+        self.remaining = None
+        self.counters = {
+            "requests": 0,
+            "throttled": 0,
+            "server_errors": 0,
+            "retries": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0
+        }
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.limit, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    async def dispatch(self):
+        while self.waiters:
+            self.refill()
+            now = time.monotonic()
+
+            if now < self.blocked_until:
+                delay = self.blocked_until - now
+            elif self.tokens >= 1:
+                _, _, future = heapq.heappop(self.waiters)
+                if not future.done():
+                    self.tokens -= 1
+                    future.set_result(None)
+                continue
+            else:
+                delay = (1 - self.tokens) / self.refill_rate
+
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def acquire(self, priority: int):
+        future = asyncio.get_running_loop().create_future()
+        # Menor prioridade sai primeiro; a sequência mantém FIFO dentro da mesma faixa
+        heapq.heappush(self.waiters, (priority, next(self.sequence), future))
+
+        if self.dispatcher is None or self.dispatcher.done():
+            self.dispatcher = asyncio.create_task(self.dispatch())
+        else:
+            self.wakeup.set()
+
+        started = time.monotonic()
+        await future
+        waited = time.monotonic() - started
+        MODRINTH_QUEUE_WAIT.labels(LANES.get(priority, priority)).observe(waited)
+        self.counters["wait_seconds_total"] += waited
+        self.counters["wait_seconds_max"] = max(self.counters["wait_seconds_max"], waited)
+
+    def update_from_headers(self, headers: httpx.Headers):
+        limit = headers.get("x-ratelimit-limit")
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+
+        if limit and limit.isdigit():
+            self.limit = int(limit)
+            self.refill_rate = self.limit / 60
+
+        if remaining and remaining.isdigit():
+            self.remaining = int(remaining)
+            self.refill()
+            # O servidor é a fonte da verdade sobre quanto ainda pode ser gasto
+            self.tokens = min(self.tokens, float(self.remaining))
+            if self.remaining == 0 and reset and reset.isdigit():
+                self.blocked_until = max(self.blocked_until, time.monotonic() + int(reset))
+
+    def backoff(self, attempt: int, response: httpx.Response = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("retry-after") or response.headers.get("x-ratelimit-reset")
+            if retry_after and retry_after.isdigit():
+                return int(retry_after) + random.uniform(0, 0.5)
+
+        # Backoff exponencial com jitter total
+        return random.uniform(0, min(30.0, 0.5 * (2 ** attempt)))
+
+    async def request(self, method: str, url: str, priority: int = PRIORITY_INTERACTIVE, **kwargs) -> httpx.Response:
+        client = http_service.get_client()
+
+        for attempt in range(self.retries + 1):
+            await self.acquire(priority)
+            self.counters["requests"] += 1
+
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                MODRINTH_REQUEST_DURATION.labels(LANES.get(priority, priority), "error").observe(time.perf_counter() - started)
+                if attempt == self.retries:
+                    raise
+                self.counters["retries"] += 1
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+
+            MODRINTH_REQUEST_DURATION.labels(LANES.get(priority, priority), response.status_code).observe(time.perf_counter() - started)
+            self.update_from_headers(response.headers)
+
+            if response.status_code == 429:
+                self.counters["throttled"] += 1
+            elif response.status_code >= 500:
+                self.counters["server_errors"] += 1
+            else:
+                return response
+
+            if attempt == self.retries:
+                return response
+
+            self.counters["retries"] += 1
+            delay = self.backoff(attempt, response if response.status_code == 429 else None)
+            if response.status_code == 429:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            await asyncio.sleep(delay)
+
+        return response
+
+    async def get(self, url: str, priority: int = PRIORITY_INTERACTIVE, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, priority, **kwargs)
+
+    def stats(self) -> dict:
+        self.refill()
+        depth = {name: 0 for name in LANES.values()}
+        for priority, _, future in self.waiters:
+            if not future.done():
+                depth[LANES.get(priority, str(priority))] += 1
+
+        return {
+            **self.counters,
+            "queue_depth": depth,
+            "tokens": round(self.tokens, 2),
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "blocked_for": max(0.0, round(self.blocked_until - time.monotonic(), 2))
+        }
+
+
+modrinth_scheduler = RequestScheduler()
@@ -0,0 +1,117 @@
+import logging
+import os
+import time
+import asyncio
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """LRU + TTL cache with conditional revalidation, stale-while-revalidate and single-flight."""
+
+    def __init__(self, max_entries: int = None, ttl: float = None, stale_ttl: float = None):
+        self.max_entries = max_entries or int(os.getenv("MODRINTH_CACHE_MAX_ENTRIES", "512"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("MODRINTH_CACHE_TTL", "60"))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else float(os.getenv("MODRINTH_CACHE_STALE_TTL", "600"))
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "revalidated": 0,
+            "not_modified": 0,
+            "evictions": 0,
+            "errors": 0
+        }
+
+    async def refresh(self, key, fetch):
+        entry = self.entries.get(key)
+        etag = entry["etag"] if entry else None
+        last_modified = entry["last_modified"] if entry else None
+
+        status, value, etag, last_modified = await fetch(etag, last_modified)
+
+        if status == 304 and entry:
+            self.counters["not_modified"] += 1
+            entry["fetched_at"] = time.monotonic()
+            return entry["value"]
+
+        self.entries[key] = {
+            "value": value,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.monotonic()
+        }
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+        return value
+
+    def start_refresh(self, key, fetch) -> asyncio.Task:
+        # Single-flight: requisições idênticas simultâneas compartilham a mesma busca
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self.refresh(key, fetch))
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        else:
+            self.counters["coalesced"] += 1
+        return task
+
+    def background_refresh(self, key, fetch):
+        task = self.start_refresh(key, fetch)
+
+        def log_error(done: asyncio.Task):
+            if not done.cancelled() and done.exception():
+                self.counters["errors"] += 1
+                logger.error(f"Error revalidating cache entry {key}: {done.exception()}")
+
+        task.add_done_callback(log_error)
+
+    async def get(self, key, fetch):
+        """Return the cached value for key; fetch(etag, last_modified) -> (status, value, etag, last_modified)."""
+        entry = self.entries.get(key)
+
+        if entry:
+            age = time.monotonic() - entry["fetched_at"]
+            if age < self.ttl:
+                self.counters["hits"] += 1
+                self.entries.move_to_end(key)
+                return entry["value"]
+
+            if age < self.ttl + self.stale_ttl:
+                # Stale-while-revalidate: responde com o valor antigo e revalida em segundo plano
+                self.counters["stale_hits"] += 1
+                self.counters["revalidated"] += 1
+                self.entries.move_to_end(key)
+                self.background_refresh(key, fetch)
+                return entry["value"]
+
+        self.counters["misses"] += 1
+        try:
+            return await asyncio.shield(self.start_refresh(key, fetch))
+        except Exception:
+            # Modrinth fora do ar: um valor vencido é melhor que um erro
+            if entry:
+                self.counters["errors"] += 1
+                return entry["value"]
+            raise
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["stale_hits"] + self.counters["misses"]
+        hit_ratio = (self.counters["hits"] + self.counters["stale_hits"]) / lookups if lookups else 0.0
+        return {
+            **self.counters,
+            "entries": len(self.entries),
+            "inflight": len(self.inflight),
+            "hit_ratio": round(hit_ratio, 4)
+        }
+
+    def clear(self):
+        self.entries.clear()
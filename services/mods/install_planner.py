@@ -0,0 +1,73 @@
+from pathlib import Path
+from services.files.hash_cache import HashCache
+
+
+def plan_entry(mod: dict) -> dict:
+    return {
+        "id": mod.get("id"),
+        "project_id": mod.get("project_id"),
+        "title": mod.get("title"),
+        "file_name": mod.get("file_name")
+    }
+
+
+class InstallPlanner:
+    """Diff the desired mod set (installed + ready) against the jars on disk."""
+
+    def __init__(self, mods_path: str, hash_cache: HashCache = None):
+        self.mods_dir = Path(mods_path.rstrip('/'))
+        self.hash_cache = hash_cache or HashCache()
+
+    def desired_mods(self, installed_mods: list, ready_mods: list) -> list:
+        # Mod pronto substitui a versão instalada do mesmo projeto (atualização)
+        desired = {mod["project_id"]: mod for mod in installed_mods or []}
+        for mod in ready_mods or []:
+            desired[mod["project_id"]] = mod
+        return list(desired.values())
+
+    async def plan(self, installed_mods: list, ready_mods: list) -> dict:
+        """add/replace/keep for the desired set; remove only lists jars the backend manages.
+
+        Jars on disk that were never recorded as installed (copied by hand) are reported
+        under "unmanaged" and are never deleted; /mods/scan can adopt them.
+        """
+        desired = self.desired_mods(installed_mods, ready_mods)
+        on_disk = {path.name: path for path in self.mods_dir.glob('*.jar')} if self.mods_dir.exists() else {}
+
+        plan = {"add": [], "replace": [], "remove": [], "keep": [], "unmanaged": [], "desired": desired}
+
+        disk_hashes = await self.hash_cache.hash_many([
+            on_disk[mod["file_name"]] for mod in desired
+            if mod["file_name"] in on_disk and (mod.get("hashes") or {}).get("sha512")
+        ])
+
+        for mod in desired:
+            file_path = on_disk.get(mod["file_name"])
+            if file_path is None:
+                plan["add"].append(mod)
+                continue
+
+            sha512 = (mod.get("hashes") or {}).get("sha512")
+            if sha512 and disk_hashes[file_path]["sha512"] != sha512:
+                plan["replace"].append(mod)
+            else:
+                plan["keep"].append(mod)
+
+        desired_files = {mod["file_name"] for mod in desired}
+        managed_files = {mod["file_name"] for mod in installed_mods or []}
+        leftover = sorted(name for name in on_disk if name not in desired_files)
+        # Só versões antigas de mods instalados por aqui podem ser removidas
+        plan["remove"] = [name for name in leftover if name in managed_files]
+        plan["unmanaged"] = [name for name in leftover if name not in managed_files]
+
+        return plan
+
+    def summary(self, plan: dict) -> dict:
+        return {
+            "add": [plan_entry(mod) for mod in plan["add"]],
+            "replace": [plan_entry(mod) for mod in plan["replace"]],
+            "remove": plan["remove"],
+            "keep": [plan_entry(mod) for mod in plan["keep"]],
+            "unmanaged": plan["unmanaged"],
+            "changes": len(plan["add"]) + len(plan["replace"]) + len(plan["remove"])
+        }
@@ -0,0 +1,142 @@
+import logging
+import os
+import json
+import time
+import shutil
+import asyncio
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ModsBackupService:
+    """Hardlink-based snapshots of the mods folder with a manifest and retention policy."""
+
+    def __init__(self, mods_path: str, backup_path: str, keep: int = None, max_age_days: float = None):
+        self.mods_dir = Path(mods_path.rstrip('/'))
+        self.backup_dir = Path(backup_path.rstrip('/'))
+        self.keep = keep if keep is not None else int(os.getenv("MODS_BACKUP_KEEP", "5"))
+        self.max_age_days = max_age_days if max_age_days is not None else float(os.getenv("MODS_BACKUP_MAX_AGE_DAYS", "0"))
+
+    def link_or_copy(self, source: Path, target: Path):
+        # Jars nunca são alterados no lugar (sempre substituídos por rename), então o hardlink é seguro
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    def read_manifest(self, snapshot_dir: Path) -> dict:
+        manifest_path = snapshot_dir / MANIFEST_NAME
+        if manifest_path.exists():
+            with open(manifest_path, 'r') as f:
+                return json.load(f)
+
+        # Backups antigos (cópias completas) não têm manifesto
+        return {
+            "id": snapshot_dir.name,
+            "created_at": int(snapshot_dir.stat().st_mtime),
+            "files": [{"file_name": jar.name, "size": jar.stat().st_size, "sha512": None} for jar in sorted(snapshot_dir.glob('*.jar'))],
+            "installed_mods": None
+        }
+
+    def create_snapshot_sync(self, installed_mods: list, retain: bool = True) -> dict:
+        timestamp = int(time.time())
+        snapshot_id = f"backup_{timestamp}"
+        snapshot_dir = self.backup_dir / snapshot_id
+        suffix = 1
+        while snapshot_dir.exists():
+            snapshot_id = f"backup_{timestamp}_{suffix}"
+            snapshot_dir = self.backup_dir / snapshot_id
+            suffix += 1
+
+        hashes = {mod.get("file_name"): (mod.get("hashes") or {}).get("sha512") for mod in installed_mods or []}
+        staging_dir = self.backup_dir / f".{snapshot_id}.tmp"
+        staging_dir.mkdir(parents=True, exist_ok=True)
+
+        files = []
+        if self.mods_dir.exists():
+            for jar in sorted(self.mods_dir.glob('*.jar')):
+                self.link_or_copy(jar, staging_dir / jar.name)
+                files.append({"file_name": jar.name, "size": jar.stat().st_size, "sha512": hashes.get(jar.name)})
+
+        manifest = {
+            "id": snapshot_id,
+            "created_at": timestamp,
+            "files": files,
+            "installed_mods": installed_mods
+        }
+        with open(staging_dir / MANIFEST_NAME, 'w') as f:
+            json.dump(manifest, f, indent=4)
+
+        # Snapshot só aparece depois de completo
+        os.rename(staging_dir, snapshot_dir)
+        if retain:
+            self.apply_retention()
+        return manifest
+
+    def list_snapshots_sync(self) -> list:
+        if not self.backup_dir.exists():
+            return []
+
+        snapshots = [
+            self.read_manifest(path)
+            for path in self.backup_dir.iterdir()
+            if path.is_dir() and path.name.startswith("backup_")
+        ]
+        return sorted(snapshots, key=lambda manifest: manifest["created_at"], reverse=True)
+
+    def apply_retention(self):
+        snapshots = self.list_snapshots_sync()
+        now = time.time()
+
+        # O snapshot mais recente é sempre mantido
+        for index, manifest in enumerate(snapshots[1:], start=1):
+            too_many = self.keep > 0 and index >= self.keep
+            too_old = self.max_age_days > 0 and now - manifest["created_at"] > self.max_age_days * 86400
+            if too_many or too_old:
+                shutil.rmtree(self.backup_dir / manifest["id"], ignore_errors=True)
+                logger.info(f"Removed old mods backup: {manifest['id']}")
+
+    def restore_snapshot_sync(self, snapshot_id: str) -> dict:
+        snapshot_dir = self.backup_dir / snapshot_id
+        if not snapshot_id.startswith("backup_") or not snapshot_dir.is_dir():
+            raise FileNotFoundError(f"Backup {snapshot_id} not found")
+
+        manifest = self.read_manifest(snapshot_dir)
+        self.mods_dir.mkdir(parents=True, exist_ok=True)
+
+        # Prepara todos os arquivos antes de tocar na pasta de mods; se algo falhar, nada muda
+        staged = []
+        try:
+            for entry in manifest["files"]:
+                temp_target = self.mods_dir / f".{entry['file_name']}.restore"
+                temp_target.unlink(missing_ok=True)
+                self.link_or_copy(snapshot_dir / entry["file_name"], temp_target)
+                staged.append((temp_target, self.mods_dir / entry["file_name"]))
+        except Exception:
+            for temp_target, _ in staged:
+                temp_target.unlink(missing_ok=True)
+            raise
+
+        for temp_target, target in staged:
+            os.replace(temp_target, target)
+            # rename entre dois hardlinks do mesmo arquivo não faz nada e mantém a origem
+            temp_target.unlink(missing_ok=True)
+
+        restored_files = {entry["file_name"] for entry in manifest["files"]}
+        for jar in self.mods_dir.glob('*.jar'):
+            if jar.name not in restored_files:
+                jar.unlink()
+
+        return manifest
+
+    async def create_snapshot(self, installed_mods: list, retain: bool = True) -> dict:
+        return await asyncio.to_thread(self.create_snapshot_sync, installed_mods, retain)
+
+    async def list_snapshots(self) -> list:
+        return await asyncio.to_thread(self.list_snapshots_sync)
+
+    async def restore_snapshot(self, snapshot_id: str) -> dict:
+        return await asyncio.to_thread(self.restore_snapshot_sync, snapshot_id)
@@ -0,0 +1,67 @@
+from pathlib import Path
+from services.files.hash_cache import HashCache
+from services.modrinth.modrinth_service import ModrinthService
+
+
+class ModsScannerService:
+    """Identify jars dropped into the mods folder by hand through Modrinth's hash lookup."""
+
+    def __init__(self, mods_path: str, hash_cache: HashCache = None, modrinth_service: ModrinthService = None):
+        self.mods_dir = Path(mods_path.rstrip('/'))
+        self.hash_cache = hash_cache or HashCache()
+        self.modrinth_service = modrinth_service or ModrinthService()
+
+    def mod_data(self, file_path: Path, hashes: dict, version: dict, project: dict) -> dict:
+        files = version.get("files", [])
+        matched = next((file for file in files if file.get("hashes", {}).get("sha512") == hashes["sha512"]), files[0] if files else {})
+
+        return {
+            "id": version.get("id"),
+            "title": project.get("title"),
+            "description": project.get("description"),
+            "icon_url": project.get("icon_url"),
+            "download_url": matched.get("url"),
+            "project_id": version.get("project_id"),
+            # Mantém o nome que está em disco, mesmo que tenha sido renomeado
+            "file_name": file_path.name,
+            "hashes": hashes,
+            "dependency_of": []
+        }
+
+    async def scan(self, installed_mods: list) -> dict:
+        """Hash every jar and resolve the ones missing from installed_mods.
+
+        Returns "identified" (mod entries ready to be recorded as installed),
+        "duplicates" (another version of an installed project) and "unknown"
+        (not found on Modrinth).
+        """
+        jars = sorted(self.mods_dir.glob('*.jar')) if self.mods_dir.exists() else []
+        disk_hashes = await self.hash_cache.hash_many(jars)
+
+        managed_files = {mod.get("file_name") for mod in installed_mods}
+        managed_projects = {mod.get("project_id") for mod in installed_mods}
+        unmanaged = [path for path in jars if path.name not in managed_files]
+
+        result = {"managed": len(jars) - len(unmanaged), "identified": [], "duplicates": [], "unknown": []}
+        if not unmanaged:
+            return result
+
+        versions = await self.modrinth_service.get_versions_by_hashes([disk_hashes[path]["sha512"] for path in unmanaged])
+        projects = await self.modrinth_service.get_projects(sorted({version["project_id"] for version in versions.values()}))
+
+        for path in unmanaged:
+            hashes = disk_hashes[path]
+            version = versions.get(hashes["sha512"])
+            if version is None:
+                result["unknown"].append({"file_name": path.name, "hashes": hashes})
+                continue
+
+            mod = self.mod_data(path, hashes, version, projects.get(version["project_id"], {}))
+            if mod["project_id"] in managed_projects:
+                result["duplicates"].append(mod)
+                continue
+
+            managed_projects.add(mod["project_id"])
+            result["identified"].append(mod)
+
+        return result
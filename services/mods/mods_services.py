@@ -1,80 +1,242 @@
+import logging
 from pathlib import Path
-import shutil
 import asyncio
-from services.docker_s.docker_service import DockerService
+from services.docker_s.docker_service import DockerService, get_docker_service
 from services.files.files_service import FilesService
+from services.files.hash_cache import HashCache
+from services.mods.install_planner import InstallPlanner, plan_entry
+from services.mods.mods_backup_service import ModsBackupService
+from services.mods.mods_scanner_service import ModsScannerService
+from services.mods.mods_update_service import ModsUpdateService
+from services.modrinth.modrinth_service import ModrinthService
+
+logger = logging.getLogger(__name__)
 
 class ModsService:
 
-    def __init__(self):
-        self.docker_service = DockerService()
-        self.files_service = FilesService()
+    def __init__(self, docker_service: DockerService = None, files_service: FilesService = None, modrinth_service: ModrinthService = None, hash_cache: HashCache = None):
+        self.docker_service = docker_service or get_docker_service()
+        self.hash_cache = hash_cache or HashCache()
+        self.files_service = files_service or FilesService(self.docker_service, modrinth_service, self.hash_cache)
         self.mods_path = "/minecraft/mods/"
         self.mods_backup_path = "/minecraft/mods_backup/"
+        self.install_planner = InstallPlanner(self.mods_path, self.hash_cache)
+        self.modrinth_service = modrinth_service or self.files_service.get_modrinth_service()
+        self.mods_scanner_service = ModsScannerService(self.mods_path, self.hash_cache, self.modrinth_service)
+        self.mods_update_service = ModsUpdateService(self.mods_path, self.hash_cache, self.modrinth_service)
+        self.mods_backup_service = ModsBackupService(self.mods_path, self.mods_backup_path)
             
-    async def install_ready_mods(self) -> bool:
+    async def plan_install(self) -> dict:
+        """Dry-run: which jars an install would add, replace or remove."""
+        try:
+            installed_mods = await self.files_service.get_installed_mods() or []
+            ready_mods = await self.files_service.get_ready_to_install_mods() or []
+            plan = await self.install_planner.plan(installed_mods, ready_mods)
+            return self.install_planner.summary(plan)
+
+        except Exception as e:
+            logger.error(f"Error planning mods installation: {e}")
+            return None
+
+    async def install_ready_mods(self, job_id: str = None) -> bool:
+        """Install the ready list; downloads report progress under job_id (GET /mods/install-progress)."""
         try:
             
-            mods_already_installed = await self.files_service.get_installed_mods()
-            mods_to_install = await self.files_service.get_ready_to_install_mods()
+            mods_already_installed = await self.files_service.get_installed_mods() or []
+            mods_to_install = await self.files_service.get_ready_to_install_mods() or []
+
+            plan = await self.install_planner.plan(mods_already_installed, mods_to_install)
+            changes = plan["add"] + plan["replace"]
 
-            if not mods_to_install:
-                print("No mods to install.")
+            if not mods_to_install and not changes and not plan["remove"]:
+                logger.info("No mods to install.")
                 return False
 
-            if mods_already_installed and len(mods_already_installed) > 0:
+            if plan["unmanaged"]:
+                logger.warning(f"Leaving unmanaged jars in the mods folder: {', '.join(plan['unmanaged'])}")
+
+            # Backup antes de qualquer arquivo ser sobrescrito ou apagado
+            if plan["replace"] or plan["remove"]:
                 if not await self.temp_mods_backup():
-                    print("Failed to backup mods. Aborting installation.")
+                    logger.error("Failed to backup mods. Aborting installation.")
                     return False
 
-            if not await self.clear_mods_folder():
-                print("Failed to clear mods folder. Aborting installation.")
-                return False
+            results = await self.files_service.fetch_mods(changes, self.mods_path, job_id)
+
+            timestamp = await self.docker_service.get_current_timestamp()
+            ready_ids = {mod["id"] for mod in mods_to_install}
+            installed_by_project = {mod["project_id"]: mod for mod in mods_already_installed}
+            changed_ids = {mod["id"] for mod in changes}
 
-            for mod in mods_to_install:
-                if mods_already_installed and mod["id"] in [installed_mod["id"] for installed_mod in mods_already_installed]:
-                    print(f"Mod {mod['title']} already installed, skipping.")
+            new_installed = []
+            still_ready = []
+            for mod in plan["desired"]:
+                if mod["id"] in changed_ids and not results.get(mod["file_name"]):
+                    logger.error(f"Failed to install mod {mod['title']}.")
+                    if mod["id"] in ready_ids:
+                        still_ready.append(mod)
+                        # Atualização falhou: mantém a versão instalada anterior
+                        previous = installed_by_project.get(mod["project_id"])
+                        if previous:
+                            new_installed.append(previous)
+                    else:
+                        # Mod já instalado que não pôde ser baixado de novo: continua registrado para a próxima instalação
+                        new_installed.append(mod)
                     continue
 
-                if await self.files_service.add_installed_mod(mod_info=mod, path=self.mods_path):
-                    print(f"Mod {mod['title']} installed successfully.")
-                else:
-                    print(f"Failed to install mod {mod['title']}.")
+                if mod["id"] in ready_ids:
+                    mod["installed_at"] = timestamp
+                    logger.info(f"Mod {mod['title']} installed successfully.")
+                new_installed.append(mod)
+
+            # Só apaga jars gerenciados que o plano marcou (versões antigas); cobertos pelo backup acima
+            keep_files = {mod["file_name"] for mod in new_installed}
+            mods_dir = Path(self.mods_path.rstrip('/'))
+            for file_name in sorted(set(plan["remove"]) - keep_files):
+                jar_file = mods_dir / file_name
+                if jar_file.exists():
+                    jar_file.unlink()
+                    logger.info(f"Removed mod file: {jar_file.name}")
+
+            if not await self.files_service.save_installed_mods(new_installed):
+                logger.error("Failed to save installed mods list.")
+                return False
 
-            if not await self.files_service.clear_list_after_install():
-                print("Failed to clear ready to install mods list.")
+            if not await self.files_service.save_ready_to_install_mods(still_ready):
+                logger.error("Failed to clear ready to install mods list.")
                 return False
 
             return True
         
         except Exception as e:
-            print(f"Error installing mods: {e}")
+            logger.error(f"Error installing mods: {e}")
             return False
 
-    async def temp_mods_backup(self) -> bool:
+    async def scan_mods_folder(self, dry_run: bool = False) -> dict:
+        """Identify hand-copied jars and adopt them into the installed mods list."""
         try:
-            timestamp = await self.docker_service.get_current_timestamp()
-            mods_dir = Path(self.mods_path.rstrip('/'))
-            backup_dir = Path(self.mods_backup_path.rstrip('/')) / f"backup_{timestamp}"
+            installed_mods = await self.files_service.get_installed_mods() or []
+            scan = await self.mods_scanner_service.scan(installed_mods)
 
-            # Cria o diretório de backup se não existir
-            backup_dir.mkdir(parents=True, exist_ok=True)
+            if scan["identified"] and not dry_run:
+                timestamp = await self.docker_service.get_current_timestamp()
+                mods_dir = Path(self.mods_path.rstrip('/'))
+                for mod in scan["identified"]:
+                    mod["installed_at"] = timestamp
+                    await self.files_service.mod_store.adopt(mods_dir / mod["file_name"], mod["hashes"]["sha512"])
+                    logger.info(f"Adopted unmanaged mod {mod['title']} ({mod['file_name']})")
 
-            # Copia os mods para o backup usando shutil
-            if mods_dir.exists():
-                for mod_file in mods_dir.glob('*.jar'):
-                    shutil.copy2(mod_file, backup_dir / mod_file.name)
-            
-            print(f"Mods backup created successfully at {backup_dir}")
+                if not await self.files_service.save_installed_mods(installed_mods + scan["identified"]):
+                    logger.error("Failed to save installed mods list.")
+                    return None
+
+            return {
+                "managed": scan["managed"],
+                "adopted": [] if dry_run else [plan_entry(mod) for mod in scan["identified"]],
+                "identified": [plan_entry(mod) for mod in scan["identified"]],
+                "duplicates": [plan_entry(mod) for mod in scan["duplicates"]],
+                "unknown": [mod["file_name"] for mod in scan["unknown"]]
+            }
+
+        except Exception as e:
+            logger.error(f"Error scanning mods folder: {e}")
+            return None
+
+    async def get_mod_updates(self, mc_version: str = "1.21.1") -> list:
+        try:
+            installed_mods = await self.files_service.get_installed_mods() or []
+            updates = await self.mods_update_service.check(installed_mods, mc_version)
+            return [
+                {
+                    "project_id": update["current"]["project_id"],
+                    "title": update["current"].get("title"),
+                    "current": {"id": update["current"]["id"], "file_name": update["current"]["file_name"]},
+                    "latest": {
+                        "id": update["version"].get("id"),
+                        "version_number": update["version"].get("version_number"),
+                        "file_name": update["mod"]["file_name"],
+                        "date_published": update["version"].get("date_published")
+                    }
+                }
+                for update in updates
+            ]
+
+        except Exception as e:
+            logger.error(f"Error checking mod updates: {e}")
+            return None
+
+    async def queue_mod_updates(self, project_ids: list = None, mc_version: str = "1.21.1") -> list:
+        """Put the newer versions (all, or only project_ids) in the ready list, with any new dependencies."""
+        try:
+            installed_mods = await self.files_service.get_installed_mods() or []
+            ready_mods = await self.files_service.get_ready_to_install_mods() or []
+            updates = await self.mods_update_service.check(installed_mods, mc_version)
+            if project_ids:
+                updates = [update for update in updates if update["current"]["project_id"] in project_ids]
+
+            # O planner troca a versão instalada pela pronta do mesmo projeto
+            queued = {update["mod"]["project_id"]: update["mod"] for update in updates}
+            ready_mods = [mod for mod in ready_mods if mod["project_id"] not in queued]
+            ready_mods.extend(queued.values())
+
+            existing = {mod["project_id"]: mod["id"] for mod in installed_mods + ready_mods}
+            for mod in list(queued.values()):
+                dependencies = await self.modrinth_service.recursive_dependencies(mod["id"], existing=existing, mc_version=mc_version)
+                for dependency in dependencies["mods"]:
+                    existing[dependency["project_id"]] = dependency["id"]
+                    ready_mods.append(dependency)
+
+            if not await self.files_service.save_ready_to_install_mods(ready_mods):
+                logger.error("Failed to save ready to install mods list.")
+                return None
+
+            return [plan_entry(mod) for mod in queued.values()]
+
+        except Exception as e:
+            logger.error(f"Error queueing mod updates: {e}")
+            return None
+
+    async def temp_mods_backup(self) -> bool:
+        try:
+            installed_mods = await self.files_service.get_installed_mods()
+            manifest = await self.mods_backup_service.create_snapshot(installed_mods)
+            logger.info(f"Mods backup created successfully: {manifest['id']} ({len(manifest['files'])} files)")
             return True
         
         except Exception as e:
-            print(f"Error creating temporary mods backup: {e}")
+            logger.error(f"Error creating temporary mods backup: {e}")
             return False
-        
-    # Create restore_mods_backup method if needed
 
-    async def add_new_mod(self, id: str, title: str, description: str, icon_url: str, download_url: str, project_id: str, file_name: str):
+    async def list_mods_backups(self) -> list:
+        try:
+            snapshots = await self.mods_backup_service.list_snapshots()
+            return [
+                {"id": manifest["id"], "created_at": manifest["created_at"], "files": len(manifest["files"])}
+                for manifest in snapshots
+            ]
+        except Exception as e:
+            logger.error(f"Error listing mods backups: {e}")
+            return []
+
+    async def restore_mods_backup(self, backup_id: str) -> bool:
+        try:
+            # Estado atual vira um snapshot antes da restauração, para poder desfazer
+            # (sem retenção, para não apagar o próprio backup que será restaurado)
+            installed_mods = await self.files_service.get_installed_mods()
+            await self.mods_backup_service.create_snapshot(installed_mods, retain=False)
+
+            manifest = await self.mods_backup_service.restore_snapshot(backup_id)
+            if manifest.get("installed_mods") is not None:
+                await self.files_service.save_installed_mods(manifest["installed_mods"])
+
+            logger.info(f"Mods backup {backup_id} restored successfully.")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error restoring mods backup {backup_id}: {e}")
+            return False
+
+    async def add_new_mod(self, id: str, title: str, description: str, icon_url: str, download_url: str, project_id: str, file_name: str, hashes: dict = None, force: bool = False):
         try:
             mod_info = {
                 "id": id,
@@ -83,15 +245,16 @@ class ModsService:
                 "icon_url": icon_url,
                 "download_url": download_url,
                 "project_id": project_id,
-                "file_name": file_name
+                "file_name": file_name,
+                "hashes": hashes or {}
             }
 
-            response = await self.files_service.add_ready_to_install_mod(mod_info=mod_info)
+            response = await self.files_service.add_ready_to_install_mod(mod_info=mod_info, force=force)
             return response
         
         except Exception as e:
-            print(f"Error adding new mod: {e}")
-            return False
+            logger.error(f"Error adding new mod: {e}")
+            return {"error": "Failed to add mod"}
         
     async def get_installed_mods(self):
         try:
@@ -99,7 +262,7 @@ class ModsService:
             return installed_mods
         
         except Exception as e:
-            print(f"Error retrieving installed mods: {e}")
+            logger.error(f"Error retrieving installed mods: {e}")
             return []
         
     async def get_ready_to_install_mods(self):
@@ -108,25 +271,28 @@ class ModsService:
             return ready_mods
         
         except Exception as e:
-            print(f"Error retrieving ready to install mods: {e}")
+            logger.error(f"Error retrieving ready to install mods: {e}")
             return []
         
+    def get_install_progress(self, job_id: str = None) -> dict:
+        return self.files_service.download_service.get_progress(job_id)
+
     async def clear_mods_folder(self) -> bool:
         try:
             # Remove todos os arquivos .jar da pasta mods
             mods_dir = Path(self.mods_path.rstrip('/'))
             
             if not mods_dir.exists():
-                print(f"Mods folder does not exist: {mods_dir}")
+                logger.warning(f"Mods folder does not exist: {mods_dir}")
                 return False
             
             jar_files = list(mods_dir.glob('*.jar'))
             for jar_file in jar_files:
                 jar_file.unlink()
             
-            print(f"Mods folder cleared successfully: {len(jar_files)} files removed")
+            logger.info(f"Mods folder cleared successfully: {len(jar_files)} files removed")
             return True
         
         except Exception as e:
-            print(f"Error clearing mods folder: {e}")
+            logger.error(f"Error clearing mods folder: {e}")
             return False
\ No newline at end of file
@@ -0,0 +1,66 @@
+from pathlib import Path
+from services.files.hash_cache import HashCache
+from services.modrinth.modrinth_service import ModrinthService
+
+
+class ModsUpdateService:
+    """Find newer compatible versions of installed mods with one bulk hash lookup."""
+
+    def __init__(self, mods_path: str, hash_cache: HashCache = None, modrinth_service: ModrinthService = None):
+        self.mods_dir = Path(mods_path.rstrip('/'))
+        self.hash_cache = hash_cache or HashCache()
+        self.modrinth_service = modrinth_service or ModrinthService()
+
+    async def installed_hashes(self, installed_mods: list) -> dict:
+        """sha512 of each installed mod: from the installed state, or hashing the jar on disk."""
+        hashes = {}
+        missing = {}
+
+        for mod in installed_mods:
+            sha512 = (mod.get("hashes") or {}).get("sha512")
+            if sha512:
+                hashes[mod["id"]] = sha512
+                continue
+
+            file_path = self.mods_dir / mod["file_name"]
+            if file_path.exists():
+                missing[file_path] = mod["id"]
+
+        for file_path, disk_hashes in (await self.hash_cache.hash_many(list(missing))).items():
+            hashes[missing[file_path]] = disk_hashes["sha512"]
+
+        return hashes
+
+    def mod_data(self, installed: dict, version: dict) -> dict:
+        files = version.get("files", [])
+        primary = next((file for file in files if file.get("primary")), files[0] if files else {})
+
+        return {
+            "id": version.get("id"),
+            "title": installed.get("title"),
+            "description": installed.get("description"),
+            "icon_url": installed.get("icon_url"),
+            "download_url": primary.get("url"),
+            "project_id": installed.get("project_id"),
+            "file_name": primary.get("filename"),
+            "hashes": primary.get("hashes", {}),
+            "dependency_of": installed.get("dependency_of", [])
+        }
+
+    async def check(self, installed_mods: list, mc_version: str = "1.21.1") -> list:
+        """Return [{"current": installed entry, "mod": entry for the newer version, "version": Modrinth version}]."""
+        hashes = await self.installed_hashes(installed_mods)
+        if not hashes:
+            return []
+
+        latest = await self.modrinth_service.get_latest_versions_by_hashes(list(hashes.values()), mc_version)
+
+        updates = []
+        for mod in installed_mods:
+            version = latest.get(hashes.get(mod["id"]))
+            if version is None or version.get("id") == mod["id"]:
+                continue
+
+            updates.append({"current": mod, "mod": self.mod_data(mod, version), "version": version})
+
+        return updates
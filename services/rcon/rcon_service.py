@@ -0,0 +1,287 @@
+import asyncio
+import itertools
+import os
+import struct
+import time
+from services.metrics.metrics_service import RCON_COMMAND_DURATION
+
+# Tipos de pacote do protocolo RCON (Source RCON, usado pelo Minecraft)
+PACKET_RESPONSE = 0
+PACKET_COMMAND = 2
+PACKET_LOGIN = 3
+
+HEADER = struct.Struct("<iii")
+MAX_PACKET_SIZE = 4096 + HEADER.size + 2
+
+
+class RconError(Exception):
+    pass
+
+
+class RconConnectError(RconError):
+    """The command never reached the server (connect, login or write failed): safe to retry elsewhere."""
+    pass
+
+
+class RconAuthError(RconConnectError):
+    pass
+
+
+class RconConnection:
+    """Single authenticated RCON connection running one command at a time.
+
+    The vanilla server reads one packet per socket read and drops the connection
+    when packets arrive joined, so nothing is ever pipelined on the socket.
+    """
+
+    def __init__(self, host: str, port: int, password: str, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+        self.reader_task = None
+        self.pending = {}
+        self.command_lock = asyncio.Lock()
+        self.ids = itertools.count(1)
+
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing() and self.reader_task is not None and not self.reader_task.done()
+
+    def next_id(self) -> int:
+        # -1 é reservado pelo servidor para falha de autenticação
+        return next(self.ids)
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port),
+            timeout=self.timeout
+        )
+
+        # Login é feito de forma síncrona antes de iniciar o leitor de pacotes
+        request_id = self.next_id()
+        await self.write_packet(request_id, PACKET_LOGIN, self.password)
+        response_id, _, _ = await asyncio.wait_for(self.read_packet(), timeout=self.timeout)
+
+        if response_id == -1:
+            await self.close()
+            raise RconAuthError("RCON authentication failed")
+
+        self.reader_task = asyncio.create_task(self.read_loop())
+
+    async def close(self):
+        if self.reader_task:
+            self.reader_task.cancel()
+            self.reader_task = None
+
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+            self.writer = None
+
+        self.fail_pending(RconError("RCON connection closed"))
+
+    def fail_pending(self, error: Exception):
+        for entry in self.pending.values():
+            for future in (entry["first"], entry["future"]):
+                if not future.done():
+                    future.set_exception(error)
+                    # Só uma das duas é aguardada em cada fase; evita o aviso de exceção não lida
+                    future.exception()
+        self.pending.clear()
+
+    async def write_packet(self, request_id: int, packet_type: int, body: str):
+        payload = body.encode("utf-8") + b"\x00\x00"
+        packet = HEADER.pack(len(payload) + 8, request_id, packet_type) + payload
+        self.writer.write(packet)
+        await self.writer.drain()
+
+    async def read_packet(self) -> tuple:
+        length_data = await self.reader.readexactly(4)
+        (length,) = struct.unpack("<i", length_data)
+
+        if length < 10 or length > MAX_PACKET_SIZE:
+            raise RconError(f"Invalid RCON packet length: {length}")
+
+        data = await self.reader.readexactly(length)
+        request_id, packet_type = struct.unpack("<ii", data[:8])
+        body = data[8:-2].decode("utf-8", errors="replace")
+        return request_id, packet_type, body
+
+    async def read_loop(self):
+        try:
+            while True:
+                request_id, _, body = await self.read_packet()
+
+                # Pacotes com o id do comando acumulam o corpo (respostas > 4096 bytes
+                # chegam fragmentadas); o id sentinela marca o fim da resposta
+                for entry in self.pending.values():
+                    if request_id == entry["command_id"]:
+                        entry["chunks"].append(body)
+                        if not entry["first"].done():
+                            entry["first"].set_result(None)
+                        break
+                    if request_id == entry["sentinel_id"]:
+                        if not entry["future"].done():
+                            entry["future"].set_result("".join(entry["chunks"]))
+                        break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.fail_pending(RconError(f"RCON connection lost: {e}"))
+            if self.writer:
+                self.writer.close()
+                self.writer = None
+
+    async def send_command(self, command: str) -> str:
+        async with self.command_lock:
+            if not self.connected:
+                raise RconConnectError("RCON connection is not open")
+
+            command_id = self.next_id()
+            sentinel_id = self.next_id()
+            loop = asyncio.get_running_loop()
+            entry = {
+                "command_id": command_id,
+                "sentinel_id": sentinel_id,
+                "chunks": [],
+                "first": loop.create_future(),
+                "future": loop.create_future()
+            }
+            self.pending[command_id] = entry
+
+            try:
+                try:
+                    await self.write_packet(command_id, PACKET_COMMAND, command)
+                except (OSError, AttributeError) as e:
+                    # Escrita do comando falhou: o servidor não o recebeu
+                    await self.close()
+                    raise RconConnectError(f"Could not write RCON command: {e}")
+
+                deadline = loop.time() + self.timeout
+                # Sentinela só depois do primeiro pacote de resposta, para os dois nunca
+                # chegarem juntos numa leitura do servidor; a resposta a ele (tipo inválido)
+                # só vem depois de todos os fragmentos
+                await asyncio.wait_for(entry["first"], timeout=self.timeout)
+                try:
+                    await self.write_packet(sentinel_id, PACKET_RESPONSE, "")
+                except (OSError, AttributeError) as e:
+                    await self.close()
+                    raise RconError(f"Could not write RCON sentinel after {command}: {e}")
+
+                return await asyncio.wait_for(entry["future"], timeout=max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                # Resposta perdida deixa a conexão em estado incerto
+                await self.close()
+                raise RconError(f"RCON command timed out: {command}")
+            finally:
+                self.pending.pop(command_id, None)
+
+
+class RconService:
+    """Small pool of persistent RCON connections with reconnect backoff.
+
+    Each connection runs one command at a time; callers wait for an idle one.
+    """
+
+    def __init__(self, password: str, host: str = None, port: int = None, port_loader=None, pool_size: int = None, timeout: float = 5.0):
+        self.password = password
+        self.host = host or os.getenv("MINECRAFT_RCON_HOST", "eldoria-server")
+        self.port = port
+        self.port_loader = port_loader
+        self.pool_size = pool_size or int(os.getenv("RCON_POOL_SIZE", "2"))
+        self.timeout = timeout
+
+        self.connections = []
+        self.idle = []
+        self.slots = asyncio.Semaphore(self.pool_size)
+        self.connect_lock = asyncio.Lock()
+        self.failures = 0
+        self.retry_at = 0.0
+        self.backoff_base = 0.5
+        self.backoff_max = 30.0
+
+    async def resolve_port(self) -> int:
+        if self.port:
+            return self.port
+
+        port = None
+        if self.port_loader:
+            port = await self.port_loader()
+
+        return int(port or 25575)
+
+    def register_failure(self):
+        self.failures += 1
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (self.failures - 1)))
+        self.retry_at = time.monotonic() + delay
+
+    async def acquire(self) -> RconConnection:
+        """Wait for a free slot and check out an idle connection (or open one); pair with release()."""
+        await self.slots.acquire()
+        try:
+            return await self.checkout()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def release(self, conn: RconConnection):
+        if conn.connected:
+            self.idle.append(conn)
+        self.slots.release()
+
+    async def checkout(self) -> RconConnection:
+        # Reaproveita uma conexão ociosa antes de abrir outra
+        while self.idle:
+            conn = self.idle.pop()
+            if conn.connected:
+                return conn
+
+        self.connections = [conn for conn in self.connections if conn.connected]
+
+        async with self.connect_lock:
+            if time.monotonic() < self.retry_at:
+                raise RconConnectError("RCON reconnect backoff in progress")
+
+            conn = RconConnection(self.host, await self.resolve_port(), self.password, self.timeout)
+            try:
+                await conn.connect()
+            except Exception as e:
+                self.register_failure()
+                if isinstance(e, RconConnectError):
+                    raise
+                raise RconConnectError(f"Could not connect to RCON at {self.host}: {e}")
+
+            self.failures = 0
+            self.retry_at = 0.0
+            self.connections.append(conn)
+            return conn
+
+    async def send_command(self, command: str) -> str:
+        started = time.perf_counter()
+        try:
+            conn = await self.acquire()
+        except RconError:
+            RCON_COMMAND_DURATION.labels("error").observe(time.perf_counter() - started)
+            raise
+        try:
+            output = await conn.send_command(command)
+        except RconError:
+            RCON_COMMAND_DURATION.labels("error").observe(time.perf_counter() - started)
+            self.register_failure()
+            raise
+        finally:
+            self.release(conn)
+        RCON_COMMAND_DURATION.labels("success").observe(time.perf_counter() - started)
+        return output
+
+    async def close(self):
+        for conn in self.connections:
+            await conn.close()
+        self.connections = []
+        self.idle = []
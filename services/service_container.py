@@ -0,0 +1,58 @@
+from fastapi import Depends
+from starlette.requests import HTTPConnection
+from services.http_s.http_service import http_service
+from services.docker_s.docker_service import get_docker_service
+from services.files.hash_cache import HashCache
+from services.files.files_service import FilesService
+from services.modrinth.modrinth_service import ModrinthService
+from services.mods.mods_services import ModsService
+from services.mc_server.mc_server_service import McServerService
+
+
+class ServiceContainer:
+    """Every application service built once with shared clients and caches; started and stopped by the lifespan."""
+
+    def __init__(self):
+        self.http_service = http_service
+        self.docker_service = get_docker_service()
+        # Um único cache de hashes: duas instâncias no mesmo arquivo sobrescreveriam uma à outra
+        self.hash_cache = HashCache()
+        self.modrinth_service = ModrinthService()
+        self.files_service = FilesService(self.docker_service, self.modrinth_service, self.hash_cache)
+        self.modrinth_service.files_service = self.files_service
+        self.mods_service = ModsService(self.docker_service, self.files_service, self.modrinth_service, self.hash_cache)
+        self.mc_server_service = McServerService(self.docker_service, self.mods_service)
+
+    async def startup(self):
+        await self.http_service.startup()
+        self.modrinth_service.catalog.start()
+        self.mc_server_service.status_watcher.start()
+
+    async def shutdown(self):
+        # Ordem inversa: primeiro as tarefas de fundo, depois os clientes que elas usam
+        await self.mc_server_service.status_watcher.stop()
+        await self.modrinth_service.catalog.stop()
+        await self.mc_server_service.rcon_service.close()
+        await self.http_service.shutdown()
+        self.docker_service.close()
+
+
+# Dependências do FastAPI: o container é criado no lifespan e guardado em app.state
+def get_services(connection: HTTPConnection) -> ServiceContainer:
+    return connection.app.state.services
+
+
+def get_files_service(services: ServiceContainer = Depends(get_services)) -> FilesService:
+    return services.files_service
+
+
+def get_modrinth_service(services: ServiceContainer = Depends(get_services)) -> ModrinthService:
+    return services.modrinth_service
+
+
+def get_mods_service(services: ServiceContainer = Depends(get_services)) -> ModsService:
+    return services.mods_service
+
+
+def get_mc_server_service(services: ServiceContainer = Depends(get_services)) -> McServerService:
+    return services.mc_server_service
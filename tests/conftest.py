@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+# Os testes importam os pacotes a partir da raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Estado em diretório temporário: nenhum teste toca nos arquivos do servidor
+state_dir = tempfile.mkdtemp(prefix="mc-api-tests-")
+os.environ.setdefault("STATE_DB_PATH", os.path.join(state_dir, "state.sqlite3"))
+os.environ.setdefault("MODS_HASH_CACHE_PATH", os.path.join(state_dir, "mods_hash_cache.json"))
+os.environ.setdefault("MODRINTH_CATALOG_PATH", os.path.join(state_dir, "modrinth_catalog.sqlite3"))
+os.environ.setdefault("LOG_INDEX_PATH", os.path.join(state_dir, "log_index.sqlite3"))
@@ -0,0 +1,289 @@
+import json
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import pytest
+from services.http_s.http_service import http_service
+from services.modrinth import dependency_resolver
+from services.modrinth.dependency_resolver import DependencyResolver, BULK_CHUNK
+from services.modrinth.request_scheduler import RequestScheduler
+
+
+def version(version_id: str, project_id: str, dependencies: list = None, loaders: list = None, game_versions: list = None) -> dict:
+    return {
+        "id": version_id,
+        "project_id": project_id,
+        "loaders": loaders or ["fabric"],
+        "game_versions": game_versions or ["1.21.1"],
+        "dependencies": dependencies or [],
+        "files": [{"url": f"https://cdn.test/{version_id}.jar", "filename": f"{version_id}.jar", "primary": True, "hashes": {"sha1": version_id}}]
+    }
+
+
+def dependency(project_id: str = None, dependency_type: str = "required", version_id: str = None) -> dict:
+    return {"project_id": project_id, "version_id": version_id, "dependency_type": dependency_type}
+
+
+class FakeModrinth:
+    """Local HTTP server with the three Modrinth endpoints DependencyResolver calls."""
+
+    def __init__(self):
+        self.versions = {}
+        self.calls = []
+        self.server = None
+
+    def add(self, *versions):
+        for item in versions:
+            self.versions[item["id"]] = item
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}/v2"
+
+    def calls_to(self, path: str) -> list:
+        return [params for called, params in self.calls if called == path]
+
+    def respond(self, path: str, params: dict):
+        if path == "/v2/versions":
+            return [self.versions[version_id] for version_id in json.loads(params["ids"]) if version_id in self.versions]
+
+        if path == "/v2/projects":
+            return [{"id": project_id, "title": project_id.title()} for project_id in json.loads(params["ids"])]
+
+        if path.startswith("/v2/project/") and path.endswith("/version"):
+            project_id = path.split("/")[3]
+            loaders = json.loads(params["loaders"])
+            game_versions = json.loads(params["game_versions"])
+            # Mais recente primeiro, como na API
+            return [
+                item for item in reversed(list(self.versions.values()))
+                if item["project_id"] == project_id
+                and set(item["loaders"]) & set(loaders)
+                and set(item["game_versions"]) & set(game_versions)
+            ]
+        return None
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                fake.calls.append((url.path, params))
+                data = fake.respond(url.path, params)
+                body = json.dumps(data).encode()
+                self.send_response(404 if data is None else 200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def modrinth(monkeypatch):
+    fake = FakeModrinth()
+    fake.start()
+    # Scheduler novo por teste: o global fica preso ao event loop do primeiro asyncio.run
+    monkeypatch.setattr(dependency_resolver, "modrinth_scheduler", RequestScheduler())
+    yield fake
+    fake.stop()
+
+
+def resolve(modrinth: FakeModrinth, root_version_id: str, existing: dict = None) -> dict:
+    async def run():
+        resolver = DependencyResolver(modrinth.base_url, loader="fabric", mc_version="1.21.1")
+        try:
+            return await resolver.resolve(root_version_id, existing=existing)
+        finally:
+            # Cliente HTTP compartilhado pertence ao loop deste teste
+            await http_service.shutdown()
+
+    return asyncio.run(run())
+
+
+def test_resolves_required_dependencies_transitively(modrinth):
+    modrinth.add(
+        version("root-1", "root", [dependency("api"), dependency("lib", "optional")]),
+        version("api-1", "api", [dependency("core")]),
+        version("core-1", "core"),
+        version("lib-1", "lib"),
+    )
+
+    result = resolve(modrinth, "root-1")
+
+    assert result["projects_ids"] == ["api", "core"]
+    mods = {mod["project_id"]: mod for mod in result["mods"]}
+    assert mods["api"]["id"] == "api-1"
+    assert mods["api"]["dependency_of"] == ["root-1"]
+    assert mods["core"]["dependency_of"] == ["api-1"]
+    assert mods["core"]["file_name"] == "core-1.jar"
+    assert result["conflicts"] == []
+
+
+def test_optional_dependencies_are_not_installed(modrinth):
+    modrinth.add(
+        version("root-1", "root", [dependency("lib", "optional"), dependency("extra", "embedded")]),
+        version("lib-1", "lib"),
+    )
+
+    result = resolve(modrinth, "root-1")
+
+    assert result["mods"] == []
+    assert modrinth.calls_to("/v2/project/lib/version") == []
+
+
+def test_incompatible_dependency_conflicts_only_when_present(modrinth):
+    modrinth.add(version("root-1", "root", [dependency("sodium", "incompatible")]))
+
+    assert resolve(modrinth, "root-1")["conflicts"] == []
+
+    result = resolve(modrinth, "root-1", existing={"sodium": "sodium-1"})
+    assert result["conflicts"] == [{"type": "incompatible", "project_id": "sodium", "version_id": "root-1"}]
+    assert result["mods"] == []
+
+
+def test_cycles_are_reported_and_terminate(modrinth):
+    modrinth.add(
+        version("root-1", "root", [dependency("a")]),
+        version("a-1", "a", [dependency("b")]),
+        version("b-1", "b", [dependency("a")]),
+    )
+
+    result = resolve(modrinth, "root-1")
+
+    assert result["projects_ids"] == ["a", "b"]
+    assert result["cycles"] == [{"from": "b-1", "to_project": "a"}]
+
+
+def test_existing_mods_are_not_descended_into(modrinth):
+    modrinth.add(
+        version("root-1", "root", [dependency("api")]),
+        version("api-1", "api", [dependency("core")]),
+        version("core-1", "core"),
+    )
+
+    result = resolve(modrinth, "root-1", existing={"api": "api-1"})
+
+    assert result["mods"] == []
+    assert result["existing"] == {"api": ["root-1"]}
+
+
+def test_pin_conflicting_with_existing_version(modrinth):
+    modrinth.add(
+        version("root-1", "root", [dependency("api", version_id="api-2")]),
+        version("api-1", "api"),
+        version("api-2", "api"),
+    )
+
+    result = resolve(modrinth, "root-1", existing={"api": "api-1"})
+
+    assert result["conflicts"] == [{"type": "version", "project_id": "api", "versions": ["api-1", "api-2"], "version_id": "root-1"}]
+    assert result["mods"] == []
+    assert result["existing"] == {"api": ["root-1"]}
+
+
+def test_pin_matching_existing_version_is_not_a_conflict(modrinth):
+    modrinth.add(version("root-1", "root", [dependency("api", version_id="api-1")]), version("api-1", "api"))
+
+    result = resolve(modrinth, "root-1", existing={"api": "api-1"})
+
+    assert result["conflicts"] == []
+
+
+def test_dependency_pinned_by_version_only(modrinth):
+    modrinth.add(version("root-1", "root", [dependency(version_id="api-1")]), version("api-1", "api"))
+
+    result = resolve(modrinth, "root-1")
+
+    assert result["projects_ids"] == ["api"]
+    assert result["mods"][0]["id"] == "api-1"
+
+
+def test_latest_version_is_filtered_by_loader_and_game_version(modrinth):
+    modrinth.add(
+        version("root-1", "root", [dependency("api")]),
+        version("api-fabric", "api"),
+        version("api-old", "api", game_versions=["1.20.4"]),
+        version("api-forge", "api", loaders=["forge"]),
+    )
+
+    result = resolve(modrinth, "root-1")
+
+    assert result["mods"][0]["id"] == "api-fabric"
+
+
+def test_no_compatible_version_is_missing(modrinth):
+    modrinth.add(version("root-1", "root", [dependency("api")]), version("api-forge", "api", loaders=["forge"]))
+
+    result = resolve(modrinth, "root-1")
+
+    assert result["mods"] == []
+    assert result["conflicts"] == [{"type": "missing", "project_id": "api", "dependency_of": ["root-1"]}]
+
+
+@pytest.mark.parametrize("pinned", [
+    version("api-forge", "api", loaders=["forge"]),
+    version("api-old", "api", game_versions=["1.20.4"]),
+])
+def test_pinned_version_must_match_loader_and_game_version(modrinth, pinned):
+    modrinth.add(version("root-1", "root", [dependency("api", version_id=pinned["id"])]), pinned)
+
+    result = resolve(modrinth, "root-1")
+
+    assert result["mods"] == []
+    assert result["conflicts"] == [{"type": "unsupported", "project_id": "api", "version_id": pinned["id"], "dependency_of": ["root-1"]}]
+
+
+def test_pinned_versions_are_loaded_in_bulk_chunks(modrinth):
+    count = BULK_CHUNK + 1
+    modrinth.add(
+        version("root-1", "root", [dependency(f"p{index}", version_id=f"p{index}-1") for index in range(count)]),
+        *(version(f"p{index}-1", f"p{index}") for index in range(count))
+    )
+
+    result = resolve(modrinth, "root-1")
+
+    assert len(result["mods"]) == count
+    # root + 2 lotes de versões fixadas; nenhuma busca por projeto
+    batches = [json.loads(params["ids"]) for params in modrinth.calls_to("/v2/versions")]
+    assert [len(batch) for batch in batches] == [1, BULK_CHUNK, 1]
+    assert not any(path.startswith("/v2/project/") for path, _ in modrinth.calls)
+
+
+def test_diamond_dependencies_are_fetched_once(modrinth):
+    # root -> a, b; a -> c, d; b -> c, d (pinado); c -> core; d -> core
+    modrinth.add(
+        version("root-1", "root", [dependency("a"), dependency("b")]),
+        version("a-1", "a", [dependency("c"), dependency("d")]),
+        version("b-1", "b", [dependency("c"), dependency("d", version_id="d-1")]),
+        version("c-1", "c", [dependency("core")]),
+        version("d-1", "d", [dependency("core")]),
+        version("core-1", "core"),
+    )
+
+    result = resolve(modrinth, "root-1")
+
+    assert sorted(result["projects_ids"]) == ["a", "b", "c", "core", "d"]
+    mods = {mod["project_id"]: mod for mod in result["mods"]}
+    assert mods["c"]["dependency_of"] == ["a-1", "b-1"]
+    assert mods["core"]["dependency_of"] == ["c-1", "d-1"]
+
+    version_ids = [version_id for params in modrinth.calls_to("/v2/versions") for version_id in json.loads(params["ids"])]
+    project_ids = [project_id for params in modrinth.calls_to("/v2/projects") for project_id in json.loads(params["ids"])]
+    latest_lookups = [path for path, _ in modrinth.calls if path.startswith("/v2/project/")]
+    assert len(version_ids) == len(set(version_ids))
+    assert sorted(project_ids) == ["a", "b", "c", "core", "d"]
+    assert len(latest_lookups) == len(set(latest_lookups))
+    assert "/v2/project/d/version" not in latest_lookups